@@ -1,6 +1,40 @@
 """
 groupenc: Group Encryption Utilities
 """
-from .identity import Identity
-from .vault import Vault
-from .__main__ import main
+import importlib
+import sys
+
+# Importing pycryptodome is most of the cost of starting up, so the public names are only
+# imported when they are first used.
+_LAZY_NAMES = {
+    'Identity': '.identity',
+    'Vault': '.vault',
+    'CachedVault': '.cache',
+    'AsyncIdentity': '.asyncvault',
+    'AsyncVault': '.asyncvault',
+    'main': '.__main__',
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_NAMES:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module(_LAZY_NAMES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES))
+
+
+if sys.version_info < (3, 7):
+    from .identity import Identity
+    from .vault import Vault
+    from .cache import CachedVault
+
+    try:
+        from .asyncvault import AsyncIdentity, AsyncVault
+    except (ImportError, SyntaxError):
+        pass
+    from .__main__ import main
@@ -3,12 +3,22 @@
 from __future__ import print_function
 
 import argparse
+import errno
+import json
 import os
 import sys
-
-from .config import DEFAULT_PUBLIC_KEY, DEFAULT_PRIVATE_KEY, DEFAULT_VAULT_FILE
-from .identity import Identity
-from .vault import Vault
+import time
+
+from .config import DEFAULT_PUBLIC_KEY, DEFAULT_PRIVATE_KEY, DEFAULT_VAULT_FILE, DEFAULT_WORKERS, \
+    DEFAULT_AGENT_SOCKET, DEFAULT_AGENT_TTL, DEFAULT_COMPACT, VAULT_FORMAT_JSON, \
+    VAULT_FORMAT_BINARY, DEFAULT_KEY_TYPE, DEFAULT_KEYGEN_WORKERS, DEFAULT_KEY_POOL, KEY_TYPE_RSA, \
+    KEY_TYPE_X25519, DEFAULT_STREAM_THRESHOLD, DEFAULT_CODEC, DEFAULT_BENCH_REPEAT, \
+    DEFAULT_BENCH_TOLERANCE, DEFAULT_NAMESPACE
+from .compression import CODECS, CODEC_NONE
+from .formats import EXPORT_FORMATS, FORMAT_DOTENV, FORMAT_JSON, FORMAT_DIRECTORY, IMPORT_FORMATS, \
+    formatSecrets, listTemplateSecrets, renderTemplate, makeEnvironment, parseDotenv, parseJson, \
+    listDirectory, guessImportFormat, directoryPathOf, formatJson, isGlob
+from .stats import getStats, formatStats
 
 try:
     import colorama
@@ -27,6 +37,9 @@ S_YELLOW = '\033[33m'
 S_WHITE = '\033[37m'
 S_RESET = '\033[0m'
 
+PEM_PUBLIC_KEY_BEGIN = '-----BEGIN PUBLIC KEY-----'
+PEM_PUBLIC_KEY_END = '-----END PUBLIC KEY-----'
+
 
 def _coloredPrint(message, color, file_=sys.stdout):
     output_color = False
@@ -67,19 +80,133 @@ def _valueOrContentsOf(value):
     return value
 
 
+# Modules needing pycryptodome are imported by the Commands that use them, so that help and
+# Commands that do not need them start quickly.
+
+
+def _openIdentity(args):
+    from .identity import Identity
+
+    _debugMessage('Bootstrapping Identity, this will take some time ...')
+    return Identity(args.private_key_file, args.public_key_file, keyType=args.key_type)
+
+
+def _openVault(args):
+    from .agent import AgentClient
+    from .vault import Vault
+
+    identity = _openIdentity(args)
+    agent = None
+    if args.agent_socket:
+        agent = AgentClient(args.agent_socket)
+    _debugMessage('Opening or Bootstrapping Vault ...')
+    return Vault(identity=identity, vaultFile=args.vault_file, agent=agent, compact=args.compact,
+                 namespace=args.namespace)
+
+
+def _openExistingVault(args):
+    """
+    Open the Vault without Bootstrapping it or the Identity, exiting with an Error if either is
+    missing.
+    """
+    for requiredFile in (args.vault_file, args.private_key_file, args.public_key_file):
+        if not requiredFile or not os.path.exists(requiredFile):
+            _printError('{} does not Exist; Bootstrap first.'.format(
+                requiredFile or 'Vault or Identity'))
+            sys.exit(1)
+    return _openVault(args)
+
+
+def _writeOutput(content, outputFile=None):
+    if not outputFile or outputFile == '-':
+        sys.stdout.write(content)
+        sys.stdout.flush()
+        return
+    fd = os.open(outputFile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as outputStream:
+        outputStream.write(content)
+
+
+def _openBinaryOutput(outputFile=None):
+    if not outputFile or outputFile == '-':
+        return os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    fd = os.open(outputFile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    return os.fdopen(fd, "wb")
+
+
+def _isStreamValue(value, stream=False):
+    if not value or not value.startswith("@"):
+        return False
+    valueFile = value.lstrip("@")
+    if not os.path.isfile(valueFile):
+        return False
+    return stream or os.path.getsize(valueFile) >= DEFAULT_STREAM_THRESHOLD
+
+
+def _selectSecrets(vault, keys=None, prefixes=None):
+    """
+    Names of Secrets given exactly or as Globs in keys, or starting with one of prefixes. If none
+    are given, all of them.
+    """
+    if not keys and not prefixes:
+        return vault.listSecrets()
+    secretKeys = set()
+    for key in keys or []:
+        if isGlob(key):
+            secretKeys.update(vault.findSecrets(key))
+        else:
+            secretKeys.add(key)
+    for prefix in prefixes or []:
+        secretKeys.update(vault.listSecrets(prefix))
+    return sorted(secretKeys)
+
+
+def _withoutStreams(vault, secretKeys):
+    """Names of Secrets that are not Streams, which are too large to be read whole."""
+    selectedSecretKeys = []
+    for secretKey in secretKeys:
+        if vault.isSecretStream(secretKey):
+            _printError('Skipping Stream {}.'.format(secretKey))
+        else:
+            selectedSecretKeys.append(secretKey)
+    return selectedSecretKeys
+
+
+def _readPublicKey(publicKeyFile):
+    """The PEM Public Key in publicKeyFile, read as it is rather than parsed, or None."""
+    if not publicKeyFile or not os.path.isfile(publicKeyFile):
+        return None
+    with open(publicKeyFile, "rb") as publicKeyFileStream:
+        publicKey = publicKeyFileStream.read().decode('ascii', 'replace').strip()
+    if publicKey.startswith(PEM_PUBLIC_KEY_BEGIN) and publicKey.endswith(PEM_PUBLIC_KEY_END) and \
+            publicKey.count(PEM_PUBLIC_KEY_BEGIN) == 1:
+        return publicKey
+    return None
+
+
+def _identitiesOf(value):
+    from .identity import splitKeyring
+
+    if value and value.startswith("@"):
+        valueDirectory = value.lstrip("@")
+        if os.path.isdir(valueDirectory):
+            identities = []
+            for entry in sorted(os.listdir(valueDirectory)):
+                if entry.endswith('.pub'):
+                    identities.extend(_identitiesOf('@' + os.path.join(valueDirectory, entry)))
+            return identities
+    value = _valueOrContentsOf(value)
+    if not value:
+        return []
+    return splitKeyring(value)
+
+
 def _commandBootstrap(args):
     """
     Bootstrap
     :param args: System Arguments Passed
     """
-    vaultFile = args.vault_file
-    privateKeyFile = args.private_key_file
-    publicKeyFile = args.public_key_file
-
-    _debugMessage('Bootstrapping Identity, this will take some time ...')
-    identity = Identity(privateKeyFile, publicKeyFile)
-    _debugMessage('Opening or Bootstrapping Vault ...')
-    _ = Vault(identity=identity, vaultFile=vaultFile)
+    _ = _openVault(args)
 
     _printSuccess('Vault Ready.')
 
@@ -89,17 +216,23 @@ def _commandId(args):
     Show Identity
     :param args: System Arguments Passed
     """
-    vaultFile = args.vault_file
-    privateKeyFile = args.private_key_file
-    publicKeyFile = args.public_key_file
+    _debugMessage('Listing Identity ...')
+    publicKey = _readPublicKey(args.public_key_file)
+    if not publicKey:
+        publicKey = _openIdentity(args).getPublicKey()
+    _printMessage(publicKey)
 
-    _debugMessage('Bootstrapping Identity, this will take some time ...')
-    identity = Identity(privateKeyFile, publicKeyFile)
-    _debugMessage('Opening or Bootstrapping Vault ...')
-    vault = Vault(identity=identity, vaultFile=vaultFile)
 
-    _debugMessage('Listing Identity ...')
-    _printMessage(vault.identity.getPublicKey())
+def _commandNamespaces(args):
+    """
+    List Namespaces
+    :param args: System Arguments Passed
+    """
+    vault = _openVault(args)
+
+    _debugMessage('Listing Namespaces ...')
+    for namespace in vault.listNamespaces():
+        _printMessage(namespace)
 
 
 def _commandSecretAdd(args):
@@ -107,22 +240,18 @@ def _commandSecretAdd(args):
     Add a Secret
     :param args: System Arguments Passed
     """
-    vaultFile = args.vault_file
-    privateKeyFile = args.private_key_file
-    publicKeyFile = args.public_key_file
-
-    _debugMessage('Bootstrapping Identity, this will take some time ...')
-    identity = Identity(privateKeyFile, publicKeyFile)
-    _debugMessage('Opening or Bootstrapping Vault ...')
-    vault = Vault(identity=identity, vaultFile=vaultFile)
-
-    secretKey = args.key
-    secretValue = _valueOrContentsOf(args.value)
-    _debugMessage('Adding Secret {} ...'.format(secretKey))
-    vault.addSecret(secretKey, secretValue)
-    _debugMessage('Saving Vault ...')
-    vault.save()
-    _debugMessage('Vault Saved.')
+    vault = _openVault(args)
+
+    with vault.locked():
+        secretKey = args.key
+        _debugMessage('Adding Secret {} ...'.format(secretKey))
+        if _isStreamValue(args.value, args.stream):
+            with open(args.value.lstrip("@"), "rb") as valueStream:
+                vault.addSecretStream(secretKey, valueStream)
+        else:
+            vault.addSecret(secretKey, _valueOrContentsOf(args.value), codec=args.codec)
+        _debugMessage('Saving Vault ...')
+        _debugMessage('Vault Saved.' if vault.save() else 'Vault Unchanged.')
 
     _printSuccess('Key Added.')
 
@@ -131,21 +260,14 @@ def _commandSecretRemove(args):
     Remove a Secret
     :param args: System Arguments Passed
     """
-    vaultFile = args.vault_file
-    privateKeyFile = args.private_key_file
-    publicKeyFile = args.public_key_file
-
-    _debugMessage('Bootstrapping Identity, this will take some time ...')
-    identity = Identity(privateKeyFile, publicKeyFile)
-    _debugMessage('Opening or Bootstrapping Vault ...')
-    vault = Vault(identity=identity, vaultFile=vaultFile)
+    vault = _openVault(args)
 
-    secretKey = args.key
-    _debugMessage('Removing Secret {} ...'.format(secretKey))
-    vault.removeSecret(secretKey)
-    _debugMessage('Saving Vault ...')
-    vault.save()
-    _debugMessage('Vault Saved.')
+    with vault.locked():
+        secretKey = args.key
+        _debugMessage('Removing Secret {} ...'.format(secretKey))
+        vault.removeSecret(secretKey)
+        _debugMessage('Saving Vault ...')
+        _debugMessage('Vault Saved.' if vault.save() else 'Vault Unchanged.')
 
     _printSuccess('Key Removed.')
 
@@ -154,17 +276,25 @@ def _commandSecretList(args):
     List Secrets
     :param args: System Arguments Passed
     """
-    vaultFile = args.vault_file
-    privateKeyFile = args.private_key_file
-    publicKeyFile = args.public_key_file
-
-    _debugMessage('Bootstrapping Identity, this will take some time ...')
-    identity = Identity(privateKeyFile, publicKeyFile)
-    _debugMessage('Opening or Bootstrapping Vault ...')
-    vault = Vault(identity=identity, vaultFile=vaultFile)
+    if not os.path.exists(args.vault_file):
+        _debugMessage('No Vault to List.')
+        return
+    vault = _openVault(args)
 
     _debugMessage('Listing Secrets ...')
-    for secretKey in vault.listSecrets():
+    if args.long:
+        descriptions = vault.describeSecrets()
+        for secretKey in vault.listSecrets(args.prefix):
+            description = descriptions.get(secretKey, {})
+            modified = description.get('modified')
+            if modified:
+                modified = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(modified))
+            else:
+                modified = '-'
+            size = description.get('size')
+            _printMessage('{:>10} {} {}'.format('-' if size is None else size, modified, secretKey))
+        return
+    for secretKey in vault.listSecrets(args.prefix):
         _printMessage(secretKey)
 
 def _commandSecretShow(args):
@@ -172,66 +302,174 @@ def _commandSecretShow(args):
     Show a Secret
     :param args: System Arguments Passed
     """
-    vaultFile = args.vault_file
-    privateKeyFile = args.private_key_file
-    publicKeyFile = args.public_key_file
-
-    _debugMessage('Bootstrapping Identity, this will take some time ...')
-    identity = Identity(privateKeyFile, publicKeyFile)
-    _debugMessage('Opening or Bootstrapping Vault ...')
-    vault = Vault(identity=identity, vaultFile=vaultFile)
+    vault = _openVault(args)
 
     secretKey = args.key
+    if isGlob(secretKey):
+        _debugMessage('Displaying Secrets matching {} ...'.format(secretKey))
+        secrets = vault.getSecrets(_withoutStreams(vault, vault.findSecrets(secretKey)))
+        _writeOutput(formatJson(secrets), args.output)
+        return
     _debugMessage('Displaying Secret {} ...'.format(secretKey))
+    if args.output or vault.isSecretStream(secretKey):
+        sys.stdout.flush()
+        with _openBinaryOutput(args.output) as outputStream:
+            vault.getSecretStream(secretKey, outputStream)
+        return
     secretValue = vault.getSecret(secretKey)
     if secretValue:
         _printMessage(secretValue)
 
+def _importDirectory(vault, directory, codec=DEFAULT_CODEC):
+    """
+    Add every File under a Directory as a Secret, streaming the large ones.
+    :return: Number of Secrets Added
+    """
+    added = 0
+    for secretKey, filePath in listDirectory(directory):
+        with open(filePath, "rb") as valueStream:
+            if os.path.getsize(filePath) >= DEFAULT_STREAM_THRESHOLD:
+                vault.addSecretStream(secretKey, valueStream)
+            else:
+                vault.addSecret(secretKey, valueStream.read(), codec=codec)
+        added += 1
+    return added
+
+def _secretsOf(source, importFormat):
+    parse = parseJson if importFormat == FORMAT_JSON else parseDotenv
+    if source == '-':
+        for secret in parse(sys.stdin):
+            yield secret
+        return
+    with open(source, "r") as sourceStream:
+        for secret in parse(sourceStream):
+            yield secret
+
+def _commandSecretImport(args):
+    """
+    Import Secrets
+    :param args: System Arguments Passed
+    """
+    vault = _openVault(args)
+
+    with vault.locked():
+        added = 0
+        for source in args.source:
+            _debugMessage('Importing Secrets from {} ...'.format(source))
+            importFormat = args.format or \
+                (FORMAT_DOTENV if source == '-' else guessImportFormat(source))
+            if importFormat == FORMAT_DIRECTORY:
+                added += _importDirectory(vault, source, args.codec)
+            else:
+                added += vault.addSecrets(_secretsOf(source, importFormat), codec=args.codec)
+        _debugMessage('Saving Vault ...')
+        _debugMessage('Vault Saved.' if vault.save() else 'Vault Unchanged.')
+
+    _printSuccess('Imported {} Keys.'.format(added))
+
+def _commandSecretExport(args):
+    """
+    Export Secrets
+    :param args: System Arguments Passed
+    """
+    vault = _openVault(args)
+
+    _debugMessage('Exporting Secrets ...')
+    if args.format == FORMAT_DIRECTORY:
+        assert args.output, "Output Directory Unspecified"
+        for secretKey in _selectSecrets(vault, args.key, args.prefix):
+            filePath = directoryPathOf(args.output, secretKey)
+            if not os.path.isdir(os.path.dirname(filePath)):
+                os.makedirs(os.path.dirname(filePath), 0o700)
+            with _openBinaryOutput(filePath) as outputStream:
+                vault.getSecretStream(secretKey, outputStream)
+        return
+    secrets = vault.getSecrets(_withoutStreams(vault, _selectSecrets(vault, args.key, args.prefix)))
+    _writeOutput(formatSecrets(secrets, args.format), args.output)
+
+def _commandSecretRender(args):
+    """
+    Render a Template with Secrets
+    :param args: System Arguments Passed
+    """
+    vault = _openVault(args)
+
+    if args.template == '-':
+        template = sys.stdin.read()
+    else:
+        with open(args.template, "r") as templateStream:
+            template = templateStream.read()
+    _debugMessage('Rendering Template {} ...'.format(args.template))
+    secrets = vault.getSecrets(listTemplateSecrets(template))
+    _writeOutput(renderTemplate(template, secrets), args.output)
+
+def _commandExec(args):
+    """
+    Execute a Command with Secrets in its Environment
+    :param args: System Arguments Passed
+    """
+    command = args.command
+    if command and command[0] == '--':
+        command = command[1:]
+    assert command, 'Command Unspecified'
+    nameMap = {}
+    for mapping in args.map or []:
+        secretKey, separator, envName = mapping.partition('=')
+        assert separator and secretKey and envName, 'Mapping must be Key=NAME'
+        nameMap[secretKey] = envName
+
+    vault = _openExistingVault(args)
+
+    secretKeys = _selectSecrets(vault, list(args.key or []) + list(nameMap), args.prefix)
+    secretKeys = _withoutStreams(vault, secretKeys)
+    _debugMessage('Decrypting {} Secrets ...'.format(len(secretKeys)))
+    environment = dict(os.environ)
+    environment.update(makeEnvironment(vault.getSecrets(secretKeys), nameMap, args.prefix,
+                                       args.strip_prefix))
+    _debugMessage('Executing {} ...'.format(command[0]))
+    sys.stdout.flush()
+    sys.stderr.flush()
+    try:
+        os.execvpe(command[0], command, environment)
+    except OSError as exc:
+        # Exit like a shell does when it cannot run a command.
+        _printError('Unable to Execute {}: {}'.format(command[0], exc.strerror))
+        sys.exit(127 if exc.errno == errno.ENOENT else 126)
+
 def _commandInduct(args):
     """
     Induct a User
     :param args: System Arguments Passed
     """
-    vaultFile = args.vault_file
-    privateKeyFile = args.private_key_file
-    publicKeyFile = args.public_key_file
+    vault = _openVault(args)
 
-    _debugMessage('Bootstrapping Identity, this will take some time ...')
-    identity = Identity(privateKeyFile, publicKeyFile)
-    _debugMessage('Opening or Bootstrapping Vault ...')
-    vault = Vault(identity=identity, vaultFile=vaultFile)
+    with vault.locked():
+        identitiesNew = []
+        for identityNew in args.identity:
+            identitiesNew.extend(_identitiesOf(identityNew))
+        _debugMessage('Inducting {} Identities ...'.format(len(identitiesNew)))
+        inducted = vault.inductMany(identitiesNew, workers=args.workers)
+        _debugMessage('Saving Vault ...')
+        _debugMessage('Vault Saved.' if vault.save() else 'Vault Unchanged.')
 
-    identityNew = _valueOrContentsOf(args.identity)
-    _debugMessage('Inducting Identity ...')
-    vault.induct(identityNew)
-    _debugMessage('Saving Vault ...')
-    vault.save()
-    _debugMessage('Vault Saved.')
-
-    _printSuccess('Inducted.')
+    _printSuccess('Inducted {} Identities.'.format(len(inducted)))
 
 def _commandDisown(args):
     """
     Disown a User
     :param args: System Arguments Passed
     """
-    vaultFile = args.vault_file
-    privateKeyFile = args.private_key_file
-    publicKeyFile = args.public_key_file
-
-    _debugMessage('Bootstrapping Identity, this will take some time ...')
-    identity = Identity(privateKeyFile, publicKeyFile)
-    _debugMessage('Opening or Bootstrapping Vault ...')
-    vault = Vault(identity=identity, vaultFile=vaultFile)
-
-    identityToDisown = _valueOrContentsOf(args.identity)
-    confirm = args.confirm
-    _debugMessage('Disowning Identity ...')
-    assert (identityToDisown or confirm), 'Must Confirm when Removing Self'
-    vault.disown(identityToDisown)
-    _debugMessage('Saving Vault ...')
-    vault.save()
-    _debugMessage('Vault Saved.')
+    vault = _openVault(args)
+
+    with vault.locked():
+        identityToDisown = _valueOrContentsOf(args.identity)
+        keyIdToDisown = args.id
+        confirm = args.confirm
+        _debugMessage('Disowning Identity ...')
+        assert (identityToDisown or keyIdToDisown or confirm), 'Must Confirm when Removing Self'
+        vault.disown(identityToDisown, keyIdToDisown)
+        _debugMessage('Saving Vault ...')
+        _debugMessage('Vault Saved.' if vault.save() else 'Vault Unchanged.')
 
     _printSuccess('Disowned.')
 
@@ -240,22 +478,190 @@ def _commandRotate(args):
     Rotate Keys in Vault
     :param args: System Arguments Passed
     """
-    vaultFile = args.vault_file
-    privateKeyFile = args.private_key_file
-    publicKeyFile = args.public_key_file
+    vault = _openVault(args)
 
-    _debugMessage('Bootstrapping Identity, this will take some time ...')
-    identity = Identity(privateKeyFile, publicKeyFile)
-    _debugMessage('Opening or Bootstrapping Vault ...')
-    vault = Vault(identity=identity, vaultFile=vaultFile)
+    def progress(hive, done, total):
+        _debugMessage('Rotating {}: {}/{} ...'.format(hive, done, total))
+
+    with vault.locked():
+        _debugMessage('Rotating Vault ...')
+        rotation = vault.rotate(workers=args.workers, progress=progress, reencrypt=args.reencrypt)
+        for stage, seconds in sorted(rotation['timings'].items()):
+            _debugMessage('Rotation {} took {:.3f}s.'.format(stage, seconds))
+        _debugMessage('Saving Vault ...')
+        _debugMessage('Vault Saved.' if vault.save() else 'Vault Unchanged.')
+
+    _printSuccess('Rotated to Epoch {} for {} Members, Re-encrypted {} Secrets.'.format(
+        vault.getEpoch(), rotation['members'], rotation['secrets']))
+
+def _commandReencrypt(args):
+    """
+    Re-encrypt Secrets from older Epochs
+    :param args: System Arguments Passed
+    """
+    vault = _openVault(args)
+
+    def progress(hive, done, total):
+        _debugMessage('Re-encrypting {}: {}/{} ...'.format(hive, done, total))
+
+    with vault.locked():
+        reencryption = vault.reencrypt(batch=args.batch, progress=progress)
+        _debugMessage('Saving Vault ...')
+        _debugMessage('Vault Saved.' if vault.save() else 'Vault Unchanged.')
+
+    _printSuccess('Re-encrypted {} Secrets, {} Remaining.'.format(reencryption['secrets'],
+                                                                  reencryption['remaining']))
+
+def _commandConvert(args):
+    """
+    Convert a Vault to another Format
+    :param args: System Arguments Passed
+    """
+    vault = _openVault(args)
+
+    _debugMessage('Converting Vault from {} to {} ...'.format(vault.vaultFormat, args.to))
+    vault.convert(args.to, args.output)
+
+    _printSuccess('Converted.')
+
+def _commandPrune(args):
+    """
+    Remove unreferenced Blobs and Streams
+    :param args: System Arguments Passed
+    """
+    vault = _openVault(args)
 
-    _debugMessage('Rotating Vault ...')
-    vault.rotate()
-    _debugMessage('Saving Vault ...')
-    vault.save()
-    _debugMessage('Vault Saved.')
+    with vault.locked():
+        _debugMessage('Pruning Vault ...')
+        removed = vault.prune()
+        _debugMessage('Saving Vault ...')
+        _debugMessage('Vault Saved.' if vault.save() else 'Vault Unchanged.')
 
-    _printSuccess('Rotated.')
+    _printSuccess('Pruned {} Values.'.format(removed))
+
+def _commandBench(args):
+    """
+    Benchmark Identity and Vault Operations
+    :param args: System Arguments Passed
+    """
+    from .bench import runBenchmarks, makeReport, compareResults, describeResult
+
+    def progress(result):
+        _printMessage('{}: {:.6f}s'.format(describeResult(result), result['median']))
+
+    results = runBenchmarks(args.name, args.key_bits, args.secrets, args.value_size, args.members,
+                            repeat=args.repeat, workers=args.workers, progress=progress)
+    report = makeReport(results)
+    if args.output:
+        with open(args.output, "w") as outputStream:
+            json.dump(report, outputStream, indent=2, sort_keys=True)
+            outputStream.write('\n')
+    if not args.baseline:
+        return
+    with open(args.baseline) as baselineStream:
+        baseline = json.load(baselineStream)
+    regressions = compareResults(results, baseline, args.tolerance)
+    for regression in regressions:
+        _printError('{}: {:.6f}s, was {:.6f}s ({:.2f}x)'.format(
+            describeResult(regression), regression['median'], regression['baseline'],
+            regression['ratio']))
+    if regressions:
+        _printError('{} of {} Benchmarks Regressed.'.format(len(regressions), len(results)))
+        sys.exit(1)
+    _printSuccess('No Benchmarks Regressed.')
+
+def _reportStats(args):
+    if args.stats:
+        _printMessage(formatStats(getStats()), file_=sys.stderr)
+    if not args.stats_json:
+        return
+    if args.stats_json == '-':
+        json.dump(getStats(), sys.stderr, sort_keys=True)
+        sys.stderr.write('\n')
+        return
+    with open(args.stats_json, "w") as statsStream:
+        json.dump(getStats(), statsStream, indent=2, sort_keys=True)
+        statsStream.write('\n')
+
+def _daemonize():
+    pid = os.fork()
+    if pid:
+        os.waitpid(pid, 0)
+        return False
+    os.setsid()
+    if os.fork():
+        os._exit(0)  # pylint: disable=W0212
+    devNull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devNull, fd)
+    return True
+
+def _commandAgentStart(args):
+    """
+    Start an Agent
+    :param args: System Arguments Passed
+    """
+    from .agent import AgentServer
+
+    agentSocket = os.path.abspath(args.agent_socket or DEFAULT_AGENT_SOCKET)
+    _debugMessage('Starting Agent on {} ...'.format(agentSocket))
+    server = AgentServer(agentSocket, ttl=args.ttl)
+    if not args.foreground and not _daemonize():
+        server.socket.close()
+        _printMessage('GROUPENC_AGENT_SOCK={}; export GROUPENC_AGENT_SOCK;'.format(agentSocket))
+        return
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+def _commandAgentStop(args):
+    """
+    Stop an Agent
+    :param args: System Arguments Passed
+    """
+    from .agent import AgentClient
+
+    assert AgentClient(args.agent_socket).stop(), 'Agent not Running'
+    _printSuccess('Agent Stopped.')
+
+def _commandAgentLock(args):
+    """
+    Lock an Agent, forgetting all Keys
+    :param args: System Arguments Passed
+    """
+    from .agent import AgentClient
+
+    assert AgentClient(args.agent_socket).lock(), 'Agent not Running'
+    _printSuccess('Agent Locked.')
+
+def _commandAgentUnlock(args):
+    """
+    Unlock an Agent
+    :param args: System Arguments Passed
+    """
+    from .agent import AgentClient
+
+    assert AgentClient(args.agent_socket).unlock(), 'Agent not Running'
+    _printSuccess('Agent Unlocked.')
+
+def _commandKeygen(args):
+    """
+    Pre-generate Key Pairs into a Pool
+    :param args: System Arguments Passed
+    """
+    from .keygen import fillKeyPool
+
+    def progress(done, total):
+        _debugMessage('Key Pool has {}/{} Key Pairs ...'.format(done, total))
+
+    if args.background and not _daemonize():
+        _printSuccess('Filling Key Pool in the Background.')
+        return
+    generated = fillKeyPool(args.pool, args.key_type, args.workers, args.pool_dir,
+                            progress=progress)
+    if not args.background:
+        _printSuccess('Generated {} Key Pairs.'.format(generated))
 
 def main():
     """Main Program."""
@@ -263,6 +669,20 @@ def main():
     parser.add_argument('--vault-file', type=str, default=DEFAULT_VAULT_FILE, help='Vault File')
     parser.add_argument('--private-key-file', type=str, default=DEFAULT_PRIVATE_KEY, help='Private Key File')
     parser.add_argument('--public-key-file', type=str, default=DEFAULT_PUBLIC_KEY, help='Public Key File')
+    parser.add_argument('--compact', action='store_true', default=bool(DEFAULT_COMPACT),
+                        help='Save Vault without Indentation')
+    parser.add_argument('--key-type', type=str, default=DEFAULT_KEY_TYPE,
+                        choices=[KEY_TYPE_RSA, KEY_TYPE_X25519],
+                        help='Type of Key Pair to Bootstrap')
+    parser.add_argument('--namespace', type=str, default=DEFAULT_NAMESPACE,
+                        help='Namespace to Work in, with its own Group Key and Members. '
+                             'Created if new.')
+    parser.add_argument('--agent-socket', type=str, default=DEFAULT_AGENT_SOCKET,
+                        help='Agent Socket, empty to disable.')
+    parser.add_argument('--stats', action='store_true',
+                        help='Show Counts and Timings of Crypto and I/O when Done.')
+    parser.add_argument('--stats-json', type=str,
+                        help='File to Write Counts and Timings to, as JSON. - for Standard Error.')
 
     subparsers = parser.add_subparsers()
 
@@ -272,12 +692,21 @@ def main():
     parserId = subparsers.add_parser('id', help='Show Identity')
     parserId.set_defaults(func=_commandId)
 
+    parserNamespaces = subparsers.add_parser('namespaces', help='List Namespaces')
+    parserNamespaces.set_defaults(func=_commandNamespaces)
+
     parserSecret = subparsers.add_parser('secret', help='Manage Secrets')
     subparserSecret = parserSecret.add_subparsers()
 
     parserSecretAdd = subparserSecret.add_parser('add', help='Add a Secret')
     parserSecretAdd.add_argument('key', type=str, help='Key to Add')
-    parserSecretAdd.add_argument('value', type=str, help='Value to Add')
+    parserSecretAdd.add_argument('value', type=str,
+                                 help='Value to Add, or @File to Add the Contents of.')
+    parserSecretAdd.add_argument('--stream', action='store_true',
+                                 help='Encrypt @File in Chunks, however small.')
+    parserSecretAdd.add_argument('--codec', type=str, default=DEFAULT_CODEC,
+                                 choices=[CODEC_NONE] + sorted(CODECS),
+                                 help='Compress with this first, if that pays off.')
     parserSecretAdd.set_defaults(func=_commandSecretAdd)
 
     parserSecretRemove = subparserSecret.add_parser('remove', help='Remove a Secret')
@@ -285,36 +714,166 @@ def main():
     parserSecretRemove.set_defaults(func=_commandSecretRemove)
 
     parserSecretList = subparserSecret.add_parser('list', help='List Secrets')
+    parserSecretList.add_argument('--long', action='store_true',
+                                  help='Show Size and Modified Time.')
+    parserSecretList.add_argument('--prefix', type=str,
+                                  help='List Keys Starting with this, such as db/prod/.')
     parserSecretList.set_defaults(func=_commandSecretList)
 
     parserSecretShow = subparserSecret.add_parser('show', help='Show a Secret')
-    parserSecretShow.add_argument('key', type=str, help='Key to Show')
+    parserSecretShow.add_argument('key', type=str,
+                                  help='Key to Show, or a Glob such as db/prod/* to Show as JSON.')
+    parserSecretShow.add_argument('--output', type=str,
+                                  help='File to Write to, unchanged. If none, Standard Output.')
     parserSecretShow.set_defaults(func=_commandSecretShow)
 
+    parserSecretImport = subparserSecret.add_parser('import', help='Import Secrets')
+    parserSecretImport.add_argument('source', type=str, nargs='+',
+                                    help='dotenv or JSON Files, or Directories. '
+                                         '- for Standard Input.')
+    parserSecretImport.add_argument('--format', type=str, choices=IMPORT_FORMATS,
+                                    help='Format. If none, Guess.')
+    parserSecretImport.add_argument('--codec', type=str, default=DEFAULT_CODEC,
+                                    choices=[CODEC_NONE] + sorted(CODECS),
+                                    help='Compress with this first, if that pays off.')
+    parserSecretImport.set_defaults(func=_commandSecretImport)
+
+    parserSecretExport = subparserSecret.add_parser('export', help='Export Secrets')
+    parserSecretExport.add_argument('key', type=str, nargs='*',
+                                    help='Keys or Globs to Export. If none, Export all.')
+    parserSecretExport.add_argument('--prefix', type=str, action='append',
+                                    help='Export Keys Starting with this. Repeatable.')
+    parserSecretExport.add_argument('--format', type=str, default=FORMAT_DOTENV,
+                                    choices=EXPORT_FORMATS, help='Format.')
+    parserSecretExport.add_argument('--output', type=str,
+                                    help='File or Directory to Write to. If none, Standard Output.')
+    parserSecretExport.set_defaults(func=_commandSecretExport)
+
+    parserSecretRender = subparserSecret.add_parser('render', help='Render a Template with Secrets')
+    parserSecretRender.add_argument('template', type=str,
+                                    help='Template File with {{ secret.name }} Placeholders.')
+    parserSecretRender.add_argument('--output', type=str,
+                                    help='File to Write to. If none, Standard Output.')
+    parserSecretRender.set_defaults(func=_commandSecretRender)
+
+    parserExec = subparsers.add_parser('exec',
+                                       help='Execute a Command with Secrets in its Environment')
+    parserExec.add_argument('--key', type=str, action='append', help='Key to Pass. Repeatable.')
+    parserExec.add_argument('--prefix', type=str, action='append',
+                            help='Pass Keys Starting with this. Repeatable.')
+    parserExec.add_argument('--strip-prefix', action='store_true',
+                            help='Remove the Prefix from Variable Names.')
+    parserExec.add_argument('--map', type=str, action='append',
+                            help='Pass Key as Variable NAME, as Key=NAME.')
+    parserExec.add_argument('command', nargs=argparse.REMAINDER,
+                            help='Command to Execute, after --.')
+    parserExec.set_defaults(func=_commandExec)
+
     parserInduct = subparsers.add_parser('induct', help='Induct a User')
-    parserInduct.add_argument('identity', type=str, help='Public Key Value or File to Induct.')
+    parserInduct.add_argument('identity', type=str, nargs='+',
+                              help='Public Key Values, Keyring Files or Directories of .pub Files '
+                                   'to Induct.')
+    parserInduct.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                              help='Processes to Wrap Keys with.')
     parserInduct.set_defaults(func=_commandInduct)
 
     parserDisown = subparsers.add_parser('disown', help='Disown a User')
     parserDisown.add_argument('--identity', type=str, help='Public Key Value or File to Disown. If none, Remove self.')
+    parserDisown.add_argument('--id', type=str, help='Key Id to Disown, as listed in the Vault.')
     parserDisown.add_argument('--confirm', type=str, help='Confirm when Removing Self.')
     parserDisown.set_defaults(func=_commandDisown)
 
     parserRotate = subparsers.add_parser('rotate', help='Rotate Keys in Vault')
+    parserRotate.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                              help='Processes to Wrap Keys with.')
+    parserRotate.add_argument('--reencrypt', action='store_true',
+                              help='Re-encrypt all Secrets now.')
     parserRotate.set_defaults(func=_commandRotate)
 
+    parserReencrypt = subparsers.add_parser('reencrypt',
+                                            help='Re-encrypt Secrets from older Epochs')
+    parserReencrypt.add_argument('--batch', type=int,
+                                 help='Most Secrets to Re-encrypt. If none, all of them.')
+    parserReencrypt.set_defaults(func=_commandReencrypt)
+
+    parserConvert = subparsers.add_parser('convert', help='Convert a Vault to another Format')
+    parserConvert.add_argument('--to', type=str, required=True,
+                               choices=[VAULT_FORMAT_JSON, VAULT_FORMAT_BINARY],
+                               help='Format to Convert to.')
+    parserConvert.add_argument('--output', type=str,
+                               help='Vault File to Write. If none, Convert in Place.')
+    parserConvert.set_defaults(func=_commandConvert)
+
+    parserPrune = subparsers.add_parser('prune', help='Remove Values no Secret References')
+    parserPrune.set_defaults(func=_commandPrune)
+
+    parserBench = subparsers.add_parser('bench', help='Benchmark Identity and Vault Operations')
+    parserBench.add_argument('--name', type=str, action='append',
+                             help='Benchmark to Run, such as vault.rotate. Repeatable. '
+                                  'If none, Run all.')
+    parserBench.add_argument('--key-bits', type=int, action='append',
+                             help='RSA Key Size. Repeatable. If none, 2048 and 4096.')
+    parserBench.add_argument('--secrets', type=int, action='append',
+                             help='Secrets in the Vault. Repeatable.')
+    parserBench.add_argument('--value-size', type=int, action='append',
+                             help='Size of each Secret. Repeatable.')
+    parserBench.add_argument('--members', type=int, action='append',
+                             help='Members of the Vault. Repeatable.')
+    parserBench.add_argument('--repeat', type=int, default=DEFAULT_BENCH_REPEAT,
+                             help='Times to Run each Benchmark.')
+    parserBench.add_argument('--workers', type=int, default=1, help='Processes to Wrap Keys with.')
+    parserBench.add_argument('--output', type=str, help='File to Write Results to, as JSON.')
+    parserBench.add_argument('--baseline', type=str,
+                             help='Results to Compare against, as Written by --output.')
+    parserBench.add_argument('--tolerance', type=float, default=DEFAULT_BENCH_TOLERANCE,
+                             help='Fraction a Benchmark may Slow down by before it Regresses.')
+    parserBench.set_defaults(func=_commandBench)
+
+    parserKeygen = subparsers.add_parser('keygen', help='Pre-generate Key Pairs for Bootstrap')
+    parserKeygen.add_argument('--pool', type=int, default=1, help='Key Pairs to keep in the Pool.')
+    parserKeygen.add_argument('--pool-dir', type=str, default=DEFAULT_KEY_POOL,
+                              help='Key Pool Directory.')
+    parserKeygen.add_argument('--workers', type=int, default=DEFAULT_KEYGEN_WORKERS,
+                              help='Processes to Search Primes with.')
+    parserKeygen.add_argument('--background', action='store_true', help='Detach while Generating.')
+    parserKeygen.set_defaults(func=_commandKeygen)
+
+    parserAgent = subparsers.add_parser('agent', help='Cache Group Keys across Invocations')
+    subparserAgent = parserAgent.add_subparsers()
+
+    parserAgentStart = subparserAgent.add_parser('start', help='Start an Agent')
+    parserAgentStart.add_argument('--ttl', type=int, default=DEFAULT_AGENT_TTL,
+                                  help='Seconds to Hold Keys for.')
+    parserAgentStart.add_argument('--foreground', action='store_true', help='Do not Detach.')
+    parserAgentStart.set_defaults(func=_commandAgentStart)
+
+    parserAgentStop = subparserAgent.add_parser('stop', help='Stop an Agent')
+    parserAgentStop.set_defaults(func=_commandAgentStop)
+
+    parserAgentLock = subparserAgent.add_parser('lock', help='Lock an Agent, forgetting all Keys')
+    parserAgentLock.set_defaults(func=_commandAgentLock)
+
+    parserAgentUnlock = subparserAgent.add_parser('unlock', help='Unlock an Agent')
+    parserAgentUnlock.set_defaults(func=_commandAgentUnlock)
+
     args = parser.parse_args()
     try:
         func = args.func
     except AttributeError:
         func = None
         _printMessage(parser.format_help())
+    failed = False
     try:
         if func:
             func(args)
     except Exception as exc:
         errorMessage = str(exc) or 'Exception Occured'
         _printError(errorMessage)
+        failed = True
+    finally:
+        _reportStats(args)
+    if failed:
+        sys.exit(1)
 
 if __name__ == '__main__':
     main()
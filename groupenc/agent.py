@@ -0,0 +1,175 @@
+"""
+groupenc agent: Holds unwrapped Group Keys across CLI invocations, like ssh-agent.
+
+Requests and responses are single JSON lines over a Unix Socket that only
+the owner can connect to.
+"""
+import json
+import os
+import socket
+import struct
+import threading
+import time
+
+try:
+    import socketserver
+except ImportError:
+    import SocketServer as socketserver
+
+from Crypto.Hash import SHA256
+
+from .config import DEFAULT_AGENT_SOCKET, DEFAULT_AGENT_TTL
+from .helpers import encodeToBase64, decodeFromBase64, makeBytesOf, makeStringOf
+
+AGENT_TIMEOUT = 5
+
+
+def makeVaultId(keyId, groupKeyEncrypted):
+    """Agent entries are bound to the wrapped Group Key, so a Rotation never sees a stale key."""
+    sha256 = SHA256.new(makeBytesOf("{}:{}".format(keyId, groupKeyEncrypted)))
+    return sha256.hexdigest()
+
+
+def _peerUid(connection):
+    try:
+        credentials = connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    except (AttributeError, OSError, socket.error):
+        return None
+    _, uid, _ = struct.unpack('3i', credentials)
+    return uid
+
+
+class _AgentHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        peerUid = _peerUid(self.connection)
+        if peerUid is not None and peerUid != os.getuid():
+            return
+        for line in self.rfile:
+            try:
+                response = self.server.handleRequest(json.loads(makeStringOf(line)))
+            except Exception as exc:
+                response = {'ok': False, 'error': str(exc) or 'Exception Occured'}
+            self.wfile.write(makeBytesOf(json.dumps(response) + '\n'))
+            self.wfile.flush()
+
+
+class AgentServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socketPath=DEFAULT_AGENT_SOCKET, ttl=DEFAULT_AGENT_TTL):
+        self.socketPath = socketPath
+        self.ttl = ttl
+        self.locked = False
+        self.keys = {}
+        self.keysLock = threading.Lock()
+        if os.path.exists(socketPath):
+            assert not AgentClient(socketPath).isAvailable(), "Agent already running on {}".format(socketPath)
+            os.unlink(socketPath)
+        oldUmask = os.umask(0o177)
+        try:
+            socketserver.UnixStreamServer.__init__(self, socketPath, _AgentHandler)
+        finally:
+            os.umask(oldUmask)
+
+    def _getKey(self, vaultId):
+        entry = self.keys.get(vaultId)
+        if entry is None:
+            return None
+        groupKey, expires = entry
+        if expires < time.time():
+            del self.keys[vaultId]
+            return None
+        return groupKey
+
+    def handleRequest(self, request):
+        operation = request.get('op')
+        with self.keysLock:
+            if operation == 'status':
+                return {'ok': True, 'locked': self.locked, 'keys': len(self.keys)}
+            if operation == 'lock':
+                self.keys.clear()
+                self.locked = True
+                return {'ok': True}
+            if operation == 'unlock':
+                self.locked = False
+                return {'ok': True}
+            if operation == 'stop':
+                self.keys.clear()
+                threading.Thread(target=self.shutdown).start()
+                return {'ok': True}
+            assert not self.locked, "Agent Locked"
+            vaultId = request.get('id')
+            assert vaultId, "Vault Id Unspecified"
+            if operation == 'get':
+                return {'ok': True, 'key': self._getKey(vaultId)}
+            if operation == 'put':
+                ttl = min(int(request.get('ttl') or self.ttl), self.ttl)
+                self.keys[vaultId] = (request['key'], time.time() + ttl)
+                return {'ok': True}
+            if operation == 'forget':
+                self.keys.pop(vaultId, None)
+                return {'ok': True}
+        raise AssertionError("Unknown Operation {}".format(operation))
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        if os.path.exists(self.socketPath):
+            os.unlink(self.socketPath)
+
+
+class AgentClient:
+    socketPath = None
+
+    def __init__(self, socketPath=DEFAULT_AGENT_SOCKET):
+        self.socketPath = socketPath
+
+    def _request(self, **request):
+        if not self.socketPath or not os.path.exists(self.socketPath):
+            return None
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.settimeout(AGENT_TIMEOUT)
+            connection.connect(self.socketPath)
+            connection.sendall(makeBytesOf(json.dumps(request) + '\n'))
+            response = connection.makefile('rb').readline()
+        except (OSError, socket.error):
+            return None
+        finally:
+            connection.close()
+        if not response:
+            return None
+        return json.loads(makeStringOf(response))
+
+    def isAvailable(self):
+        response = self._request(op='status')
+        return bool(response and response.get('ok'))
+
+    def status(self):
+        return self._request(op='status')
+
+    def getGroupKey(self, vaultId):
+        response = self._request(op='get', id=vaultId)
+        if not response or not response.get('ok') or not response.get('key'):
+            return None
+        return decodeFromBase64(response['key'])
+
+    def putGroupKey(self, vaultId, groupKey, ttl=None):
+        response = self._request(op='put', id=vaultId, key=encodeToBase64(groupKey), ttl=ttl)
+        return bool(response and response.get('ok'))
+
+    def forget(self, vaultId):
+        response = self._request(op='forget', id=vaultId)
+        return bool(response and response.get('ok'))
+
+    def lock(self):
+        response = self._request(op='lock')
+        return bool(response and response.get('ok'))
+
+    def unlock(self):
+        response = self._request(op='unlock')
+        return bool(response and response.get('ok'))
+
+    def stop(self):
+        response = self._request(op='stop')
+        return bool(response and response.get('ok'))
@@ -0,0 +1,152 @@
+"""
+asyncio counterparts of Identity and Vault. Key parsing, unwrapping, AES and file I/O run
+in an Executor, so they never block the Event Loop.
+"""
+import asyncio
+import functools
+
+from .config import DEFAULT_PRIVATE_KEY, DEFAULT_PUBLIC_KEY, DEFAULT_VAULT_FILE
+from .identity import Identity
+from .vault import Vault
+
+DEFAULT_BATCH = 64
+
+# get_event_loop is deprecated inside coroutines; get_running_loop is new in Python 3.7.
+_runningLoop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+
+def _runIn(executor, func, *args, **kwargs):
+    """Run func in executor. Only called from coroutines, on the loop running them."""
+    loop = _runningLoop()
+    return loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+
+class AsyncIdentity:
+    identity = None
+    executor = None
+
+    def __init__(self, identity, executor=None):
+        """
+        :param identity: Identity to wrap. Use create to load one without blocking.
+        :param executor: Executor to run in, or None for the Event Loop's default
+        """
+        self.identity = identity
+        self.executor = executor
+
+    @classmethod
+    async def create(cls, privateKeyFile=DEFAULT_PRIVATE_KEY, publicKeyFile=DEFAULT_PUBLIC_KEY, givenKey=None,
+                     keyType=None, executor=None):
+        identity = await _runIn(executor, Identity, privateKeyFile, publicKeyFile, givenKey, keyType)
+        return cls(identity, executor)
+
+    def getKeyType(self):
+        return self.identity.getKeyType()
+
+    def getPublicKey(self):
+        return self.identity.getPublicKey()
+
+    def getId(self):
+        return self.identity.getId()
+
+    async def encryptPublic(self, message):
+        return await _runIn(self.executor, self.identity.encryptPublic, message)
+
+    async def decrypt(self, message):
+        return await _runIn(self.executor, self.identity.decrypt, message)
+
+
+class AsyncVault:
+    """
+    Concurrent first requests share a single Group Key unwrap. Changes and saves are
+    serialized, reads are not.
+    """
+    vault = None
+    executor = None
+
+    def __init__(self, vault, executor=None):
+        """
+        :param vault: Vault to wrap. Use open to read one without blocking.
+        :param executor: Executor to run in, or None for the Event Loop's default
+        """
+        self.vault = vault
+        self.executor = executor
+        self._unwrapping = None
+        self._writeLock = None
+
+    @classmethod
+    async def open(cls, identity=None, vaultFile=DEFAULT_VAULT_FILE, executor=None, **kwargs):
+        """
+        :param identity: Identity or AsyncIdentity, or None for the default one
+        :param kwargs: Passed on to Vault
+        """
+        if isinstance(identity, AsyncIdentity):
+            identity = identity.identity
+        if identity is None:
+            identity = (await AsyncIdentity.create(executor=executor)).identity
+        vault = await _runIn(executor, Vault, identity, vaultFile, **kwargs)
+        return cls(vault, executor)
+
+    def _run(self, func, *args, **kwargs):
+        return _runIn(self.executor, func, *args, **kwargs)
+
+    def _getWriteLock(self):
+        if self._writeLock is None:
+            self._writeLock = asyncio.Lock()
+        return self._writeLock
+
+    async def getGroupKey(self):
+        groupKey = self.vault.peekGroupKey()
+        if groupKey:
+            return groupKey
+        if self._unwrapping is None:
+            self._unwrapping = asyncio.ensure_future(self._run(self.vault._getGroupKeyAsBytes))  # pylint: disable=W0212
+            self._unwrapping.add_done_callback(lambda _: setattr(self, '_unwrapping', None))
+        return await asyncio.shield(self._unwrapping)
+
+    async def listSecrets(self):
+        await self.getGroupKey()
+        return await self._run(lambda: list(self.vault.listSecrets()))
+
+    async def getSecret(self, secretKey):
+        groupKey = await self.getGroupKey()
+        return await self._run(self.vault.getSecret, secretKey, groupKey)
+
+    async def getSecrets(self, secretKeys=None, batchSize=DEFAULT_BATCH):
+        """
+        Decrypt many Secrets at once, in batches run side by side.
+        :param secretKeys: Names of Secrets to get, or None for all of them
+        :return: Mapping of Secret Names to Values, leaving out missing Secrets
+        """
+        groupKey = await self.getGroupKey()
+        if secretKeys is None:
+            secretKeys = await self.listSecrets()
+        secretKeys = list(secretKeys)
+        batches = [secretKeys[batchStart:batchStart + batchSize] for batchStart in range(0, len(secretKeys), batchSize)]
+        secrets = {}
+        for batchSecrets in await asyncio.gather(*[self._run(self.vault.getSecrets, batch, groupKey)
+                                                   for batch in batches]):
+            secrets.update(batchSecrets)
+        return secrets
+
+    async def addSecret(self, secretKey, secretValue=None, **kwargs):
+        groupKey = await self.getGroupKey()
+        async with self._getWriteLock():
+            await self._run(self.vault.addSecret, secretKey, secretValue, groupKey, **kwargs)
+
+    async def addSecrets(self, secrets, **kwargs):
+        groupKey = await self.getGroupKey()
+        async with self._getWriteLock():
+            return await self._run(self.vault.addSecrets, secrets, groupKey, **kwargs)
+
+    async def removeSecret(self, secretKey):
+        await self.getGroupKey()
+        async with self._getWriteLock():
+            await self._run(self.vault.removeSecret, secretKey)
+
+    async def reload(self):
+        async with self._getWriteLock():
+            await self._run(self.vault.reload)
+
+    async def save(self, force=False):
+        async with self._getWriteLock():
+            return await self._run(self.vault.save, force)
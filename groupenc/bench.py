@@ -0,0 +1,275 @@
+"""
+Benchmarks of Identity and Vault operations across Key Sizes, Vault Sizes, Value Sizes and Members.
+
+Every Benchmark runs on Vaults built in a temporary directory and reports seconds per operation,
+as the median, minimum and mean of its repeats. Results are plain JSON, so they can be kept as a
+baseline and compared against later runs.
+"""
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import tempfile
+import time
+
+from .config import DEFAULT_KEYGEN_WORKERS, DEFAULT_BENCH_REPEAT, DEFAULT_BENCH_TOLERANCE
+from .helpers import encodeToBase64
+from .identity import Identity
+from .keygen import generateRSAKeyPair, exportKey
+from .vault import Vault, _bootstrapGroupKey
+
+# Smaller than DEFAULT_KEY_BITS, as every Key Size needs several Key Pairs generated.
+DEFAULT_BENCH_KEY_BITS = [2048, 4096]
+DEFAULT_BENCH_SECRETS = [10, 1000]
+DEFAULT_BENCH_VALUE_SIZES = [64, 4096]
+DEFAULT_BENCH_MEMBERS = [1, 10]
+DEFAULT_BENCH_OPS = 100
+
+_CLOCK = getattr(time, 'perf_counter', time.time)
+
+
+def _timed(func, *args, **kwargs):
+    started = _CLOCK()
+    func(*args, **kwargs)
+    return _CLOCK() - started
+
+
+def _makeValue(valueSize):
+    """An incompressible, unique Value of valueSize characters."""
+    return encodeToBase64(os.urandom(valueSize))[:valueSize]
+
+
+def _secretName(index):
+    return 'bench/{:06d}'.format(index)
+
+
+class _Workspace:
+    """
+    Key Pairs and Vault Files shared by Benchmarks, built once and copied before changes.
+    Key Pairs are generated with every CPU, as that is not measured.
+    """
+
+    def __init__(self, workers=1):
+        self.directory = tempfile.mkdtemp(prefix='groupenc-bench-')
+        self.workers = workers
+        self._identities = {}
+        self._memberKeys = {}
+        self._vaultFiles = {}
+        self._scratchCount = 0
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def identity(self, keyBits):
+        if keyBits not in self._identities:
+            keyPair = generateRSAKeyPair(keyBits, DEFAULT_KEYGEN_WORKERS)
+            self._identities[keyBits] = Identity(givenKey=exportKey(keyPair))
+        return self._identities[keyBits]
+
+    def memberKeys(self, keyBits, count):
+        memberKeys = self._memberKeys.setdefault(keyBits, [])
+        while len(memberKeys) < count:
+            memberKeys.append(exportKey(generateRSAKeyPair(keyBits, DEFAULT_KEYGEN_WORKERS).publickey()))
+        return memberKeys[:count]
+
+    def vaultFile(self, keyBits, secrets, valueSize, members):
+        """A saved Vault holding secrets Values of valueSize, shared with members in all."""
+        fixture = (keyBits, secrets, valueSize, members)
+        if fixture not in self._vaultFiles:
+            vaultFile = os.path.join(self.directory, 'vault-{}-{}-{}-{}.json'.format(*fixture))
+            vault = Vault(self.identity(keyBits), vaultFile)
+            vault.addSecrets(dict((_secretName(index), _makeValue(valueSize)) for index in range(secrets)))
+            vault.inductMany(self.memberKeys(keyBits, members - 1), workers=self.workers)
+            vault.save()
+            self._vaultFiles[fixture] = vaultFile
+        return self._vaultFiles[fixture]
+
+    def openVault(self, keyBits, secrets, valueSize, members, scratch=False, unwrap=True):
+        """
+        Open a Vault Fixture, leaving the Group Key unwrapped so that is not measured.
+        :param scratch: Open a copy, for Benchmarks that change the Vault
+        """
+        vaultFile = self.vaultFile(keyBits, secrets, valueSize, members)
+        if scratch:
+            self._scratchCount += 1
+            scratchFile = os.path.join(self.directory, 'scratch-{}.json'.format(self._scratchCount))
+            shutil.copyfile(vaultFile, scratchFile)
+            vaultFile = scratchFile
+        vault = Vault(self.identity(keyBits), vaultFile)
+        if unwrap:
+            vault._getGroupKeyAsBytes()  # pylint: disable=W0212
+        return vault
+
+
+def _benchKeygen(workspace, keyBits):
+    return _timed(generateRSAKeyPair, keyBits, workspace.workers), 1
+
+
+def _benchWrap(workspace, keyBits):
+    identity = workspace.identity(keyBits)
+    groupKey = _bootstrapGroupKey()
+    return _timed(lambda: [identity.encryptPublic(groupKey) for _ in range(DEFAULT_BENCH_OPS)]), DEFAULT_BENCH_OPS
+
+
+def _benchUnwrap(workspace, keyBits):
+    identity = workspace.identity(keyBits)
+    groupKeyEncrypted = identity.encryptPublic(_bootstrapGroupKey())
+    return _timed(identity.decrypt, groupKeyEncrypted), 1
+
+
+def _benchLoad(workspace, keyBits, secrets, valueSize):
+    vaultFile = workspace.vaultFile(keyBits, secrets, valueSize, 1)
+    return _timed(Vault, workspace.identity(keyBits), vaultFile), 1
+
+
+def _benchSave(workspace, keyBits, secrets, valueSize):
+    vault = workspace.openVault(keyBits, secrets, valueSize, 1, scratch=True, unwrap=False)
+    return _timed(vault.save, force=True), 1
+
+
+def _benchGetSecret(workspace, keyBits, secrets, valueSize):
+    vault = workspace.openVault(keyBits, secrets, valueSize, 1)
+    secretKeys = [_secretName(index) for index in range(min(secrets, DEFAULT_BENCH_OPS))]
+    return _timed(lambda: [vault.getSecret(secretKey) for secretKey in secretKeys]), len(secretKeys)
+
+
+def _benchAddSecret(workspace, keyBits, secrets, valueSize):
+    vault = workspace.openVault(keyBits, secrets, valueSize, 1, scratch=True)
+    newSecrets = [(_secretName(secrets + index), _makeValue(valueSize)) for index in range(DEFAULT_BENCH_OPS)]
+    return _timed(lambda: [vault.addSecret(secretKey, secretValue) for secretKey, secretValue in newSecrets]), \
+        len(newSecrets)
+
+
+def _benchListSecrets(workspace, keyBits, secrets):
+    vault = workspace.openVault(keyBits, secrets, DEFAULT_BENCH_VALUE_SIZES[0], 1)
+    return _timed(vault.listSecrets), 1
+
+
+def _benchInduct(workspace, keyBits, members):
+    vault = workspace.openVault(keyBits, DEFAULT_BENCH_SECRETS[0], DEFAULT_BENCH_VALUE_SIZES[0], 1, scratch=True)
+    memberKeys = workspace.memberKeys(keyBits, members)
+    return _timed(vault.inductMany, memberKeys, workers=workspace.workers), members
+
+
+def _benchRotate(workspace, keyBits, members):
+    vault = workspace.openVault(keyBits, DEFAULT_BENCH_SECRETS[0], DEFAULT_BENCH_VALUE_SIZES[0], members,
+                                scratch=True)
+    return _timed(vault.rotate, workers=workspace.workers), 1
+
+
+def _benchReencrypt(workspace, keyBits, secrets, valueSize):
+    vault = workspace.openVault(keyBits, secrets, valueSize, 1, scratch=True)
+    vault.rotate(workers=workspace.workers)
+    return _timed(vault.reencrypt), secrets
+
+
+# Name, Parameters it varies over, Function returning (seconds, operations) for one repeat.
+BENCHMARKS = [
+    ('identity.keygen', ['keyBits'], _benchKeygen),
+    ('identity.wrap', ['keyBits'], _benchWrap),
+    ('identity.unwrap', ['keyBits'], _benchUnwrap),
+    ('vault.load', ['keyBits', 'secrets', 'valueSize'], _benchLoad),
+    ('vault.save', ['keyBits', 'secrets', 'valueSize'], _benchSave),
+    ('vault.getSecret', ['keyBits', 'secrets', 'valueSize'], _benchGetSecret),
+    ('vault.addSecret', ['keyBits', 'secrets', 'valueSize'], _benchAddSecret),
+    ('vault.listSecrets', ['keyBits', 'secrets'], _benchListSecrets),
+    ('vault.induct', ['keyBits', 'members'], _benchInduct),
+    ('vault.rotate', ['keyBits', 'members'], _benchRotate),
+    ('vault.reencrypt', ['keyBits', 'secrets', 'valueSize'], _benchReencrypt),
+]
+BENCHMARK_NAMES = [name for name, _, _ in BENCHMARKS]
+
+
+def _median(samples):
+    samples = sorted(samples)
+    middle = len(samples) // 2
+    if len(samples) % 2:
+        return samples[middle]
+    return (samples[middle - 1] + samples[middle]) / 2.0
+
+
+def runBenchmarks(names=None, keyBits=None, secrets=None, valueSizes=None, members=None,
+                  repeat=DEFAULT_BENCH_REPEAT, workers=1, progress=None):
+    """
+    Run Benchmarks over every combination of the Parameters each one varies over.
+    :param names: Benchmarks to run. If none, all of BENCHMARK_NAMES.
+    :param progress: Optional callable(result), called as each result is ready
+    :return: Results, each with name, params and seconds per operation
+    """
+    dimensions = {
+        'keyBits': keyBits or DEFAULT_BENCH_KEY_BITS,
+        'secrets': secrets or DEFAULT_BENCH_SECRETS,
+        'valueSize': valueSizes or DEFAULT_BENCH_VALUE_SIZES,
+        'members': members or DEFAULT_BENCH_MEMBERS,
+    }
+    for name in names or []:
+        assert name in BENCHMARK_NAMES, "Unknown Benchmark {}".format(name)
+
+    results = []
+    workspace = _Workspace(workers)
+    try:
+        for name, paramNames, func in BENCHMARKS:
+            if names and name not in names:
+                continue
+            for values in itertools.product(*[dimensions[paramName] for paramName in paramNames]):
+                params = dict(zip(paramNames, values))
+                samples = []
+                for _ in range(max(repeat, 1)):
+                    seconds, ops = func(workspace, *values)
+                    samples.append(seconds / max(ops, 1))
+                result = {
+                    'name': name,
+                    'params': params,
+                    'ops': ops,
+                    'repeat': len(samples),
+                    'median': _median(samples),
+                    'min': min(samples),
+                    'mean': sum(samples) / len(samples),
+                }
+                results.append(result)
+                if progress:
+                    progress(result)
+    finally:
+        workspace.close()
+    return results
+
+
+def makeReport(results):
+    """Results with the Environment they were measured in, as saved for a baseline."""
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpus': multiprocessing.cpu_count(),
+        'results': results,
+    }
+
+
+def _resultId(result):
+    return '{} {}'.format(result['name'], json.dumps(result['params'], sort_keys=True))
+
+
+def describeResult(result):
+    params = ' '.join('{}={}'.format(paramName, value) for paramName, value in sorted(result['params'].items()))
+    return '{} {}'.format(result['name'], params).strip()
+
+
+def compareResults(results, baseline, tolerance=DEFAULT_BENCH_TOLERANCE):
+    """
+    Compare Results against a baseline Report, matching them by name and params.
+    :param tolerance: Fraction the median may grow by before it counts as a regression
+    :return: Regressions, each a result with its baseline median and ratio to it
+    """
+    baselineMedians = dict((_resultId(result), result['median']) for result in baseline.get('results', []))
+    regressions = []
+    for result in results:
+        baselineMedian = baselineMedians.get(_resultId(result))
+        if not baselineMedian or result['median'] <= baselineMedian * (1 + tolerance):
+            continue
+        regression = dict(result)
+        regression['baseline'] = baselineMedian
+        regression['ratio'] = result['median'] / baselineMedian
+        regressions.append(regression)
+    return regressions
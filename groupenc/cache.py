@@ -0,0 +1,227 @@
+"""
+CachedVault: a Vault for long-running processes. It notices when the Vault File changes,
+and serves Secrets from a bounded cache until they expire.
+"""
+import collections
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import threading
+import time
+
+from .config import DEFAULT_VAULT_FILE, DEFAULT_CACHE_ENTRIES, DEFAULT_CACHE_TTL, DEFAULT_POLL_INTERVAL, \
+    DEFAULT_NAMESPACE
+from .helpers import makeBytesOf
+from .vault import Vault, _fileSignature
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct('iIII')
+
+_now = getattr(time, 'monotonic', time.time)
+
+
+def _inotifyWatch(directory):
+    """
+    inotify File Descriptor watching a Directory, or None where inotify is unavailable.
+    The Directory is watched, as saving a Vault replaces its File.
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        inotifyInit = libc.inotify_init1
+        inotifyAddWatch = libc.inotify_add_watch
+    except (OSError, AttributeError, TypeError):
+        return None
+    fd = inotifyInit(IN_NONBLOCK | IN_CLOEXEC)
+    if fd < 0:
+        return None
+    if inotifyAddWatch(fd, makeBytesOf(directory), IN_WATCH_MASK) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+class FileWatcher:
+    """
+    Tells whether a File changed since it was last asked, by inotify where available,
+    or else by polling its inode, size and mtime.
+    """
+    path = None
+    pollInterval = DEFAULT_POLL_INTERVAL
+
+    def __init__(self, path, pollInterval=DEFAULT_POLL_INTERVAL, useInotify=True):
+        self.path = path
+        self.pollInterval = pollInterval
+        self._fileName = makeBytesOf(os.path.basename(path))
+        self._signature = _fileSignature(path)
+        self._nextPoll = 0
+        self._fd = _inotifyWatch(os.path.dirname(os.path.abspath(path))) if useInotify else None
+
+    def isInotify(self):
+        return self._fd is not None
+
+    def _readEvents(self):
+        touched = False
+        while True:
+            try:
+                events = os.read(self._fd, 4096)
+            except OSError as exc:
+                if exc.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return touched
+                raise
+            offset = 0
+            while offset < len(events):
+                _, _, _, nameLength = INOTIFY_EVENT.unpack_from(events, offset)
+                offset += INOTIFY_EVENT.size
+                name = events[offset:offset + nameLength].rstrip(b'\0')
+                offset += nameLength
+                touched = touched or name == self._fileName
+
+    def changed(self):
+        if self._fd is not None:
+            if not self._readEvents():
+                return False
+        else:
+            now = _now()
+            if now < self._nextPoll:
+                return False
+            self._nextPoll = now + self.pollInterval
+        signature = _fileSignature(self.path)
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        return True
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class SecretCache:
+    """
+    Least Recently Used cache of at most maxEntries, each kept for ttl seconds.
+    """
+    maxEntries = DEFAULT_CACHE_ENTRIES
+    ttl = DEFAULT_CACHE_TTL
+
+    def __init__(self, maxEntries=DEFAULT_CACHE_ENTRIES, ttl=DEFAULT_CACHE_TTL, clock=_now):
+        self.maxEntries = maxEntries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = collections.OrderedDict()
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        value, expires = entry
+        if expires <= self._clock():
+            del self._entries[key]
+            return default
+        del self._entries[key]
+        self._entries[key] = entry
+        return value
+
+    def __contains__(self, key):
+        marker = object()
+        return self.get(key, marker) is not marker
+
+    def put(self, key, value):
+        self._entries.pop(key, None)
+        self._entries[key] = (value, self._clock() + self.ttl)
+        while len(self._entries) > self.maxEntries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CachedVault:
+    """
+    Read-only Vault for long-running processes. The Vault File is only read again when it changes,
+    and the Group Key only unwrapped again when it changes too. Safe to share between threads.
+    """
+    vault = None
+    watcher = None
+    cache = None
+
+    def __init__(self, identity=None, vaultFile=DEFAULT_VAULT_FILE, agent=None, maxEntries=DEFAULT_CACHE_ENTRIES,
+                 ttl=DEFAULT_CACHE_TTL, pollInterval=DEFAULT_POLL_INTERVAL, useInotify=True,
+                 namespace=DEFAULT_NAMESPACE):
+        """
+        :param maxEntries: Most Secrets to keep decrypted
+        :param ttl: Seconds to keep a decrypted Secret for
+        :param pollInterval: Seconds between checks of the Vault File, where inotify is unavailable
+        """
+        vaultFile = vaultFile or DEFAULT_VAULT_FILE
+        self.watcher = FileWatcher(vaultFile, pollInterval, useInotify)
+        self.vault = Vault(identity=identity, vaultFile=vaultFile, agent=agent, namespace=namespace)
+        self.cache = SecretCache(maxEntries, ttl)
+        self._lock = threading.RLock()
+
+    def refresh(self):
+        """
+        Reload the Vault if its File changed.
+        :return: Whether it was reloaded
+        """
+        with self._lock:
+            if not self.watcher.changed():
+                return False
+            self.vault.reload()
+            self.cache.clear()
+            return True
+
+    def _getSecret(self, secretKey):
+        marker = object()
+        secretValue = self.cache.get(secretKey, marker)
+        if secretValue is marker:
+            secretValue = self.vault.getSecret(secretKey)
+            self.cache.put(secretKey, secretValue)
+        return secretValue
+
+    def getSecret(self, secretKey):
+        with self._lock:
+            self.refresh()
+            return self._getSecret(secretKey)
+
+    def getSecrets(self, secretKeys=None):
+        """
+        :param secretKeys: Names of Secrets to get, or None for all of them
+        :return: Mapping of Secret Names to Values, leaving out missing Secrets
+        """
+        with self._lock:
+            self.refresh()
+            if secretKeys is None:
+                secretKeys = list(self.vault.listSecrets())
+            secrets = {}
+            for secretKey in secretKeys:
+                secretValue = self._getSecret(secretKey)
+                if secretValue is not None:
+                    secrets[secretKey] = secretValue
+            return secrets
+
+    def listSecrets(self):
+        with self._lock:
+            self.refresh()
+            return list(self.vault.listSecrets())
+
+    def invalidate(self):
+        with self._lock:
+            self.cache.clear()
+
+    def close(self):
+        with self._lock:
+            self.watcher.close()
+            self.cache.clear()
@@ -0,0 +1,53 @@
+"""
+Codecs Values are compressed with before they are encrypted.
+"""
+import zlib
+
+from .config import DEFAULT_CODEC, DEFAULT_COMPRESS_MIN_BYTES
+
+CODEC_NONE = 'none'
+CODEC_ZLIB = 'zlib'
+CODEC_LZMA = 'lzma'
+CODECS = {}
+
+
+def registerCodec(name, compress, decompress):
+    """
+    Make a Codec available to compress and decompress. Its name is stored with every Value it compressed,
+    so it must stay registered for as long as such Values exist.
+    :param compress: callable(bytes) returning bytes
+    :param decompress: callable(bytes) returning bytes
+    """
+    assert name and name != CODEC_NONE, "Invalid Codec Name {}".format(name)
+    CODECS[name] = (compress, decompress)
+
+
+registerCodec(CODEC_ZLIB, lambda payload: zlib.compress(payload, 9), zlib.decompress)
+
+try:
+    import lzma
+
+    registerCodec(CODEC_LZMA, lzma.compress, lzma.decompress)
+except ImportError:
+    pass
+
+
+def compress(payload, codec=DEFAULT_CODEC, minBytes=DEFAULT_COMPRESS_MIN_BYTES):
+    """
+    Compress a Value, unless it is too small or would not shrink by at least an eighth.
+    :return: (Codec used or None, Payload)
+    """
+    if not codec or codec == CODEC_NONE or len(payload) < minBytes:
+        return None, payload
+    assert codec in CODECS, "Unknown Codec {}".format(codec)
+    compressed = CODECS[codec][0](payload)
+    if len(compressed) > len(payload) - len(payload) // 8:
+        return None, payload
+    return codec, compressed
+
+
+def decompress(payload, codec=None):
+    if not codec or codec == CODEC_NONE:
+        return payload
+    assert codec in CODECS, "Unknown Codec {}".format(codec)
+    return CODECS[codec][1](payload)
@@ -6,6 +6,16 @@ def __getEnvNumber(varName, defaultValue):
     except:
         return int(defaultValue)
 
+def __getCpuCount():
+    # Importing multiprocessing just for this slows every start down.
+    if hasattr(os, 'cpu_count'):
+        return os.cpu_count() or 1
+    import multiprocessing
+    return multiprocessing.cpu_count()
+
+KEY_TYPE_RSA = 'rsa'
+KEY_TYPE_X25519 = 'x25519'
+DEFAULT_KEY_TYPE = os.getenv('GROUPENC_KEY_TYPE', KEY_TYPE_RSA)
 DEFAULT_KEY_BITS = __getEnvNumber('GROUPENC_KEY_BITS', 8192)
 DEFAULT_KEY_BYTES = DEFAULT_KEY_BITS // 8
 DEFAULT_GROUP_KEY_BITS = __getEnvNumber('GROUPENC_GROUP_KEY_BITS', 256)
@@ -15,10 +25,39 @@ DEFAULT_IV_BYTES = DEFAULT_IV_BITS // 8
 DEFAULT_PAD_BITS = __getEnvNumber('GROUPENC_PAD_BITS', DEFAULT_GROUP_KEY_BITS)
 DEFAULT_PAD_BYTES = DEFAULT_PAD_BITS // 8
 
+DEFAULT_WORKERS = __getEnvNumber('GROUPENC_WORKERS', __getCpuCount())
+DEFAULT_PARALLEL_MIN_TASKS = __getEnvNumber('GROUPENC_PARALLEL_MIN_TASKS', 16)
+DEFAULT_ROTATE_BATCH = __getEnvNumber('GROUPENC_ROTATE_BATCH', 256)
+DEFAULT_KEYGEN_WORKERS = __getEnvNumber('GROUPENC_KEYGEN_WORKERS', DEFAULT_WORKERS)
+DEFAULT_STREAM_CHUNK_BYTES = __getEnvNumber('GROUPENC_STREAM_CHUNK_BYTES', 64 * 1024)
+DEFAULT_STREAM_THRESHOLD = __getEnvNumber('GROUPENC_STREAM_THRESHOLD', 1024 * 1024)
+DEFAULT_DEDUP_MIN_BYTES = __getEnvNumber('GROUPENC_DEDUP_MIN_BYTES', 256)
+DEFAULT_CODEC = os.getenv('GROUPENC_CODEC', 'zlib')
+DEFAULT_COMPRESS_MIN_BYTES = __getEnvNumber('GROUPENC_COMPRESS_MIN_BYTES', 128)
+
 DEFAULT_KEY_ENCODING = os.getenv('GROUPENC_KEY_ENCODING', 'latin1')
 DEFAULT_VALUE_ENCODING = os.getenv('GROUPENC_VALUE_ENCODING', 'utf8')
 
 DEFAULT_VAULT_FILE = os.getenv('GROUPENC_FILE', '.groupenc.json')
+VAULT_FORMAT_JSON = 'json'
+VAULT_FORMAT_BINARY = 'binary'
+DEFAULT_VAULT_FORMAT = os.getenv('GROUPENC_FORMAT', VAULT_FORMAT_JSON)
 DEFAULT_PRIVATE_KEY = os.getenv('GROUPENC_PRIVATE_KEY', os.path.expanduser('~/.groupenc_private'))
 DEFAULT_PUBLIC_KEY = os.getenv('GROUPENC_PUBLIC_KEY', os.path.expanduser('~/.groupenc_public'))
+DEFAULT_KEY_POOL = os.getenv('GROUPENC_KEY_POOL', os.path.expanduser('~/.groupenc_pool'))
 HASH_SECRETS = os.getenv('GROUPENC_HASH_SECRETS')
+NAMESPACE_SEPARATOR = '@'
+DEFAULT_NAMESPACE = os.getenv('GROUPENC_NAMESPACE')
+DEFAULT_COMPACT = os.getenv('GROUPENC_COMPACT')
+DEFAULT_LOCK_TIMEOUT = __getEnvNumber('GROUPENC_LOCK_TIMEOUT', 30)
+DEFAULT_SAVE_RETRIES = __getEnvNumber('GROUPENC_SAVE_RETRIES', 5)
+
+DEFAULT_AGENT_SOCKET = os.getenv('GROUPENC_AGENT_SOCK', os.path.expanduser('~/.groupenc_agent.sock'))
+DEFAULT_AGENT_TTL = __getEnvNumber('GROUPENC_AGENT_TTL', 3600)
+
+DEFAULT_CACHE_ENTRIES = __getEnvNumber('GROUPENC_CACHE_ENTRIES', 1024)
+DEFAULT_CACHE_TTL = __getEnvNumber('GROUPENC_CACHE_TTL', 300)
+DEFAULT_POLL_INTERVAL = __getEnvNumber('GROUPENC_POLL_INTERVAL', 1)
+
+DEFAULT_BENCH_REPEAT = __getEnvNumber('GROUPENC_BENCH_REPEAT', 3)
+DEFAULT_BENCH_TOLERANCE = 0.25
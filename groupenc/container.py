@@ -0,0 +1,216 @@
+"""
+Binary Vault container, read through mmap so only the Secrets touched get decoded.
+
+Layout, all integers big-endian:
+
+    MAGIC
+    Header Length (uint32), Header: JSON of every hive but the mapped ones
+    For each hive in the Header's mapped list, MAPPED_HIVES and their Namespaced copies:
+        Entry Count (uint32), Entries sorted by Key: Key Offset (uint64), Key Length (uint32),
+            Value Offset (uint64), Value Length (uint32), Value Type (uint8)
+        Keys and Values
+"""
+import base64
+import binascii
+import bisect
+import json
+import mmap
+import struct
+
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
+
+from .config import NAMESPACE_SEPARATOR
+from .helpers import makeBytesOf, makeStringOf
+
+MAGIC = b'GRPENC\x00\x01'
+SECRETS_HIVE = 'secrets'
+BLOBS_HIVE = 'blobs'
+MAPPED_HIVES = [SECRETS_HIVE, BLOBS_HIVE]
+MAPPED_FIELD = '_mapped'
+LENGTH = struct.Struct('>I')
+ENTRY = struct.Struct('>QIQIB')
+
+VALUE_BASE64 = 0
+VALUE_JSON = 1
+
+
+def isContainer(vaultFile):
+    with open(vaultFile, "rb") as vaultFileStream:
+        return vaultFileStream.read(len(MAGIC)) == MAGIC
+
+
+def _encodeValue(value):
+    if isinstance(value, (type(u''), str)):
+        try:
+            decoded = base64.b64decode(makeBytesOf(value))
+        except (binascii.Error, TypeError, ValueError):
+            decoded = None
+        if decoded is not None and makeStringOf(base64.b64encode(decoded)) == value:
+            return VALUE_BASE64, decoded
+    return VALUE_JSON, makeBytesOf(json.dumps(value, sort_keys=True))
+
+
+def _isMapped(hiveName):
+    return hiveName.split(NAMESPACE_SEPARATOR, 1)[0] in MAPPED_HIVES
+
+
+def _decodeValue(valueType, payload):
+    if valueType == VALUE_BASE64:
+        return makeStringOf(base64.b64encode(payload))
+    return json.loads(makeStringOf(payload))
+
+
+class ContainerSecrets(MutableMapping):
+    """
+    A mapped hive of a Container. Lookups binary search the mapped Entries;
+    changes are kept aside until the Vault is saved again.
+    """
+
+    def __init__(self, mapped, entriesOffset, entryCount):
+        self._mapped = mapped
+        self._entriesOffset = entriesOffset
+        self._entryCount = entryCount
+        self._changes = {}
+        self._deleted = set()
+
+    def original(self):
+        """The hive as it was read, without the changes kept aside."""
+        return ContainerSecrets(self._mapped, self._entriesOffset, self._entryCount)
+
+    def _entry(self, index):
+        return ENTRY.unpack_from(self._mapped, self._entriesOffset + index * ENTRY.size)
+
+    def _key(self, index):
+        keyOffset, keyLength, _, _, _ = self._entry(index)
+        return makeStringOf(self._mapped[keyOffset:keyOffset + keyLength])
+
+    def _find(self, key):
+        keys = _LazyKeys(self)
+        index = bisect.bisect_left(keys, key)
+        if index < self._entryCount and keys[index] == key:
+            return index
+        return None
+
+    def endOffset(self):
+        """Where the Keys and Values of this hive end, as they are written in Key order."""
+        if not self._entryCount:
+            return self._entriesOffset
+        _, _, valueOffset, valueLength, _ = self._entry(self._entryCount - 1)
+        return valueOffset + valueLength
+
+    def _baseKeys(self):
+        for index in range(self._entryCount):
+            yield self._key(index)
+
+    def __getitem__(self, key):
+        if key in self._changes:
+            return self._changes[key]
+        if key in self._deleted:
+            raise KeyError(key)
+        index = self._find(key)
+        if index is None:
+            raise KeyError(key)
+        _, _, valueOffset, valueLength, valueType = self._entry(index)
+        return _decodeValue(valueType, self._mapped[valueOffset:valueOffset + valueLength])
+
+    def __contains__(self, key):
+        if key in self._changes:
+            return True
+        if key in self._deleted:
+            return False
+        return self._find(key) is not None
+
+    def __setitem__(self, key, value):
+        self._deleted.discard(key)
+        self._changes[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._changes.pop(key, None)
+        self._deleted.add(key)
+
+    def __iter__(self):
+        for key in self._baseKeys():
+            if key not in self._changes and key not in self._deleted:
+                yield key
+        for key in list(self._changes):
+            yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class _LazyKeys:
+    """Sequence view of the sorted Keys, for bisect."""
+
+    def __init__(self, secrets):
+        self._secrets = secrets
+
+    def __len__(self):
+        return self._secrets._entryCount  # pylint: disable=W0212
+
+    def __getitem__(self, index):
+        return self._secrets._key(index)  # pylint: disable=W0212
+
+
+def readContainer(vaultFile):
+    """
+    Map a Container, decoding only its Header and Entry Count.
+    :return: Vault Contents, with a ContainerSecrets for each mapped hive
+    """
+    with open(vaultFile, "rb") as vaultFileStream:
+        mapped = mmap.mmap(vaultFileStream.fileno(), 0, access=mmap.ACCESS_READ)
+    assert mapped[:len(MAGIC)] == MAGIC, "Not a Vault Container"
+    offset = len(MAGIC)
+    headerLength, = LENGTH.unpack_from(mapped, offset)
+    offset += LENGTH.size
+    vaultContents = json.loads(makeStringOf(mapped[offset:offset + headerLength]))
+    offset += headerLength
+    for hiveName in vaultContents.pop(MAPPED_FIELD, [SECRETS_HIVE]):
+        entryCount, = LENGTH.unpack_from(mapped, offset)
+        offset += LENGTH.size
+        vaultContents[hiveName] = ContainerSecrets(mapped, offset, entryCount)
+        offset = vaultContents[hiveName].endOffset()
+    return vaultContents
+
+
+def _writeHive(hive, stream):
+    keys = sorted(hive)
+    stream.write(LENGTH.pack(len(keys)))
+    entriesOffset = stream.tell()
+    stream.write(b'\x00' * (len(keys) * ENTRY.size))
+
+    entries = []
+    dataOffset = stream.tell()
+    for key in keys:
+        keyBytes = makeBytesOf(key)
+        valueType, valueBytes = _encodeValue(hive[key])
+        entries.append(ENTRY.pack(dataOffset, len(keyBytes), dataOffset + len(keyBytes), len(valueBytes), valueType))
+        stream.write(keyBytes)
+        stream.write(valueBytes)
+        dataOffset += len(keyBytes) + len(valueBytes)
+
+    stream.seek(entriesOffset)
+    stream.write(b''.join(entries))
+    stream.seek(dataOffset)
+
+
+def writeContainer(vaultContents, stream):
+    """
+    Write a Container to a seekable Stream, one Value at a time.
+    """
+    mappedHives = [SECRETS_HIVE] + sorted(hiveName for hiveName in vaultContents
+                                          if _isMapped(hiveName) and hiveName != SECRETS_HIVE)
+    header = dict((hiveName, hive) for hiveName, hive in vaultContents.items() if not _isMapped(hiveName))
+    header[MAPPED_FIELD] = mappedHives
+    headerBytes = makeBytesOf(json.dumps(header, sort_keys=True, separators=(',', ':')))
+
+    stream.write(MAGIC)
+    stream.write(LENGTH.pack(len(headerBytes)))
+    stream.write(headerBytes)
+    for hiveName in mappedHives:
+        _writeHive(vaultContents.get(hiveName, {}), stream)
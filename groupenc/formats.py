@@ -0,0 +1,203 @@
+"""
+Formats to export many Secrets at once in.
+"""
+import json
+import os
+import re
+
+FORMAT_DOTENV = 'dotenv'
+FORMAT_JSON = 'json'
+FORMAT_SHELL = 'shell'
+FORMAT_DIRECTORY = 'directory'
+FORMATS = [FORMAT_DOTENV, FORMAT_JSON, FORMAT_SHELL]
+IMPORT_FORMATS = [FORMAT_DOTENV, FORMAT_JSON, FORMAT_DIRECTORY]
+EXPORT_FORMATS = FORMATS + [FORMAT_DIRECTORY]
+
+ENV_NAME_INVALID = re.compile(r'[^A-Za-z0-9_]')
+TEMPLATE_PLACEHOLDER = re.compile(r'\{\{\s*secret\.(.+?)\s*\}\}')
+DOTENV_LINE = re.compile(r'^\s*(?:export\s+)?([^=\s]+)\s*=\s*(.*?)\s*$')
+DOTENV_ESCAPES = re.compile(r'\\(.)')
+STRING_TYPES = (type(u''), str)
+DOTENV_UNESCAPED = {'n': '\n', 'r': '\r', 't': '\t'}
+GLOB_SPECIAL = re.compile(r'[*?\[]')
+
+
+def makeEnvName(secretKey):
+    """Turn a Secret Name into a valid Environment Variable Name."""
+    envName = ENV_NAME_INVALID.sub('_', secretKey)
+    if not envName or envName[0].isdigit():
+        envName = '_' + envName
+    return envName
+
+
+def isGlob(pattern):
+    return bool(GLOB_SPECIAL.search(pattern))
+
+
+def globPrefix(pattern):
+    """The literal start of a Glob, which every Name it matches starts with."""
+    match = GLOB_SPECIAL.search(pattern)
+    return pattern[:match.start()] if match else pattern
+
+
+def compileGlob(pattern):
+    """
+    Glob over hierarchical Secret Names: * and ? stay within one / separated level, ** crosses levels,
+    [abc] and [!abc] match a character of a class.
+    """
+    regex = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith('**', index):
+            regex.append('.*')
+            index += 2
+            continue
+        if char == '*':
+            regex.append('[^/]*')
+        elif char == '?':
+            regex.append('[^/]')
+        elif char == '[' and ']' in pattern[index + 2:]:
+            end = pattern.index(']', index + 2)
+            characters = pattern[index + 1:end]
+            if characters.startswith('!'):
+                characters = '^' + characters[1:]
+            regex.append('[{}]'.format(characters.replace('\\', '\\\\')))
+            index = end
+        else:
+            regex.append(re.escape(char))
+        index += 1
+    return re.compile('(?s:{})\\Z'.format(''.join(regex)))
+
+
+def makeEnvironment(secrets, nameMap=None, prefixes=None, stripPrefix=False):
+    """
+    Environment Variables for Secrets.
+    :param nameMap: Mapping of Secret Names to Environment Variable Names
+    :param prefixes: Prefixes removed from Secret Names when stripPrefix is set
+    """
+    nameMap = nameMap or {}
+    environment = {}
+    for secretKey, secretValue in secrets.items():
+        envName = nameMap.get(secretKey)
+        if not envName:
+            envName = secretKey
+            for prefix in (prefixes or []) if stripPrefix else []:
+                if secretKey.startswith(prefix) and len(secretKey) > len(prefix):
+                    envName = secretKey[len(prefix):]
+                    break
+            envName = makeEnvName(envName)
+        environment[envName] = secretValue
+    return environment
+
+
+def _quoteDotenv(value):
+    escaped = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r')
+    return '"{}"'.format(escaped)
+
+
+def _quoteShell(value):
+    return "'{}'".format(value.replace("'", "'\\''"))
+
+
+def formatDotenv(secrets):
+    return ''.join('{}={}\n'.format(makeEnvName(secretKey), _quoteDotenv(secretValue))
+                   for secretKey, secretValue in sorted(secrets.items()))
+
+
+def formatShell(secrets):
+    return ''.join('export {}={}\n'.format(makeEnvName(secretKey), _quoteShell(secretValue))
+                   for secretKey, secretValue in sorted(secrets.items()))
+
+
+def formatJson(secrets):
+    return json.dumps(secrets, indent=4, sort_keys=True) + '\n'
+
+
+def formatSecrets(secrets, outputFormat=FORMAT_DOTENV):
+    """
+    :param secrets: Mapping of Secret Names to Values
+    :param outputFormat: One of FORMATS
+    """
+    formatters = {
+        FORMAT_DOTENV: formatDotenv,
+        FORMAT_JSON: formatJson,
+        FORMAT_SHELL: formatShell,
+    }
+    assert outputFormat in formatters, "Unknown Format {}".format(outputFormat)
+    return formatters[outputFormat](secrets)
+
+
+def listTemplateSecrets(template):
+    """Names of Secrets referenced as {{ secret.name }} in a Template."""
+    return sorted(set(TEMPLATE_PLACEHOLDER.findall(template)))
+
+
+def renderTemplate(template, secrets):
+    def replace(match):
+        secretKey = match.group(1)
+        assert secrets.get(secretKey) is not None, "Secret {} Unspecified".format(secretKey)
+        return secrets[secretKey]
+
+    return TEMPLATE_PLACEHOLDER.sub(replace, template)
+
+
+def _unquoteDotenv(value):
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return DOTENV_ESCAPES.sub(lambda match: DOTENV_UNESCAPED.get(match.group(1), match.group(1)), value[1:-1])
+    if len(value) >= 2 and value[0] == value[-1] == "'":
+        return value[1:-1]
+    return value.split(' #', 1)[0].rstrip()
+
+
+def parseDotenv(stream):
+    """Yield (Name, Value) pairs from a dotenv Stream, one line at a time."""
+    for line in stream:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        match = DOTENV_LINE.match(line)
+        assert match, "Unable to Parse Line {}".format(line)
+        yield match.group(1), _unquoteDotenv(match.group(2))
+
+
+def parseJson(stream):
+    """Yield (Name, Value) pairs from a JSON Object. Values that are not Strings are kept as JSON."""
+    secrets = json.load(stream)
+    assert isinstance(secrets, dict), "JSON must be an Object"
+    for secretKey, secretValue in sorted(secrets.items()):
+        if not isinstance(secretValue, STRING_TYPES):
+            secretValue = json.dumps(secretValue, sort_keys=True)
+        yield secretKey, secretValue
+
+
+def listDirectory(directory):
+    """Yield (Relative Path, Path) pairs for every File under a Directory."""
+    for root, directories, files in os.walk(directory):
+        directories.sort()
+        for fileName in sorted(files):
+            filePath = os.path.join(root, fileName)
+            yield os.path.relpath(filePath, directory).replace(os.sep, '/'), filePath
+
+
+def readDirectory(directory):
+    """Yield (Relative Path, Contents) pairs for every File under a Directory."""
+    for secretKey, filePath in listDirectory(directory):
+        with open(filePath, "rb") as fileStream:
+            yield secretKey, fileStream.read()
+
+
+def directoryPathOf(directory, secretKey):
+    """Path of the File a Secret is exported to under a Directory, like readDirectory reads it."""
+    directory = os.path.abspath(directory)
+    filePath = os.path.abspath(os.path.join(directory, *secretKey.split('/')))
+    assert filePath.startswith(directory + os.sep), "Secret {} is outside of {}".format(secretKey, directory)
+    return filePath
+
+
+def guessImportFormat(source):
+    if os.path.isdir(source):
+        return FORMAT_DIRECTORY
+    if source.endswith('.json'):
+        return FORMAT_JSON
+    return FORMAT_DOTENV
@@ -1,6 +1,8 @@
 import base64
+import multiprocessing
 
-from .config import DEFAULT_VALUE_ENCODING, DEFAULT_KEY_ENCODING
+from .config import DEFAULT_VALUE_ENCODING, DEFAULT_KEY_ENCODING, DEFAULT_WORKERS, DEFAULT_PARALLEL_MIN_TASKS
+from .stats import measure
 
 
 def makeBytesOf(payload, encoding=DEFAULT_VALUE_ENCODING):
@@ -16,8 +18,36 @@ def makeStringOf(payload, encoding=DEFAULT_VALUE_ENCODING):
 
 
 def encodeToBase64(payload, encoding=DEFAULT_KEY_ENCODING):
-    return makeStringOf(base64.b64encode(payload), encoding)
+    with measure('base64.encode', len(payload)):
+        return makeStringOf(base64.b64encode(payload), encoding)
 
 
 def decodeFromBase64(payload, encoding=DEFAULT_KEY_ENCODING):
-    return makeBytesOf(base64.b64decode(payload), encoding)
+    with measure('base64.decode', len(payload)):
+        return makeBytesOf(base64.b64decode(payload), encoding)
+
+
+def isParallel(taskCount, workers=DEFAULT_WORKERS, minTasks=DEFAULT_PARALLEL_MIN_TASKS):
+    return (workers or 1) > 1 and taskCount > 1 and taskCount >= minTasks
+
+
+def parallelMap(func, tasks, workers=DEFAULT_WORKERS, minTasks=DEFAULT_PARALLEL_MIN_TASKS):
+    """
+    Yield func(task) for every task, in no particular order. A Process Pool
+    is only started when there are enough tasks to pay for it.
+    """
+    tasks = list(tasks)
+    if not isParallel(len(tasks), workers, minTasks):
+        for task in tasks:
+            yield func(task)
+        return
+    pool = multiprocessing.Pool(min(workers, len(tasks)))
+    try:
+        for result in pool.imap_unordered(func, tasks):
+            yield result
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
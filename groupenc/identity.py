@@ -1,66 +1,178 @@
 import os
+import re
 import stat
 
-from Crypto.Cipher import PKCS1_OAEP
+from Crypto.Cipher import AES, PKCS1_OAEP
 from Crypto.Hash import SHA256
-from Crypto.PublicKey import RSA
+from Crypto.Protocol.DH import key_agreement, import_x25519_public_key
+from Crypto.Protocol.KDF import HKDF
+from Crypto.PublicKey import ECC, RSA
+from Crypto.Random import get_random_bytes
 
-from .config import DEFAULT_PUBLIC_KEY, DEFAULT_PRIVATE_KEY, DEFAULT_KEY_BITS, DEFAULT_KEY_ENCODING
+from .config import DEFAULT_PUBLIC_KEY, DEFAULT_PRIVATE_KEY, DEFAULT_KEY_ENCODING, DEFAULT_KEY_TYPE, \
+    KEY_TYPE_RSA, KEY_TYPE_X25519
 from .helpers import encodeToBase64, decodeFromBase64, makeBytesOf, makeStringOf
+from .keygen import X25519_CURVE, exportKey, generateKeyPair, takePooledKey
+from .stats import measure
 
+X25519_KEY_BYTES = 32
+X25519_NONCE_BYTES = 12
+X25519_TAG_BYTES = 16
+X25519_CONTEXT = b'groupenc-x25519'
+PEM_BLOCK = re.compile(r'-----BEGIN [A-Z ]+-----.*?-----END [A-Z ]+-----', re.DOTALL)
 
-def _bootstrapKeyPair(privateKeyFile=DEFAULT_PRIVATE_KEY, publicKeyFile=DEFAULT_PUBLIC_KEY):
-    keyPair = RSA.generate(DEFAULT_KEY_BITS)
 
-    privateKey = keyPair.export_key()
+def _keyTypeOf(keyPair):
+    if isinstance(keyPair, ECC.EccKey):
+        assert keyPair.curve == X25519_CURVE, "Unsupported Curve {}".format(keyPair.curve)
+        return KEY_TYPE_X25519
+    return KEY_TYPE_RSA
+
+
+def _publicKeyOf(keyPair):
+    if _keyTypeOf(keyPair) == KEY_TYPE_X25519:
+        return keyPair.public_key()
+    return keyPair.publickey()
+
+
+def _importKey(givenKey, keyType=None):
+    with measure('key.import', len(givenKey)):
+        if keyType == KEY_TYPE_X25519:
+            return ECC.import_key(givenKey)
+        if keyType == KEY_TYPE_RSA:
+            return RSA.import_key(givenKey)
+        try:
+            return RSA.import_key(givenKey)
+        except (ValueError, IndexError, TypeError):
+            return ECC.import_key(givenKey)
+
+
+def _readKeyFile(keyFile):
+    with measure('file.read') as measurement, open(keyFile, "rb") as keyFileStream:
+        key = keyFileStream.read()
+        measurement.size = len(key)
+    return key
+
+
+def splitKeyring(keyring):
+    """Split text holding one or more PEM Public Keys into the individual Keys."""
+    keyring = makeStringOf(keyring)
+    return PEM_BLOCK.findall(keyring) or [keyring]
+
+
+def _bootstrapKeyPair(privateKeyFile=DEFAULT_PRIVATE_KEY, publicKeyFile=DEFAULT_PUBLIC_KEY, keyType=DEFAULT_KEY_TYPE):
+    pooledKey = takePooledKey(keyType)
+    keyPair = _importKey(pooledKey, keyType) if pooledKey else generateKeyPair(keyType)
+
+    privateKey = exportKey(keyPair)
     with open(privateKeyFile, "wb") as privateKeyFileStream:
         privateKeyFileStream.write(privateKey)
     os.chmod(privateKeyFile, stat.S_IRUSR)
 
-    publicKey = keyPair.publickey().export_key()
+    publicKey = exportKey(_publicKeyOf(keyPair))
     with open(publicKeyFile, "wb") as publicKeyFileStream:
         publicKeyFileStream.write(publicKey)
 
     return keyPair
 
 
-def _initializeOrGetKeyPair(privateKeyFile=DEFAULT_PRIVATE_KEY, publicKeyFile=DEFAULT_PUBLIC_KEY):
+def _initializeOrGetKeyPair(privateKeyFile=DEFAULT_PRIVATE_KEY, publicKeyFile=DEFAULT_PUBLIC_KEY,
+                            keyType=DEFAULT_KEY_TYPE):
     if privateKeyFile and os.path.exists(privateKeyFile):
-        with open(privateKeyFile, "rb") as privateKeyFileStream:
-            privateKey = privateKeyFileStream.read()
-            return RSA.import_key(privateKey)
+        return _importKey(_readKeyFile(privateKeyFile))
     elif publicKeyFile and os.path.exists(publicKeyFile):
-        with open(publicKeyFile, "rb") as publicKeyFileStream:
-            publicKey = publicKeyFileStream.read()
-            return RSA.import_key(publicKey)
+        return _importKey(_readKeyFile(publicKeyFile))
     else:
-        return _bootstrapKeyPair(privateKeyFile, publicKeyFile)
+        return _bootstrapKeyPair(privateKeyFile, publicKeyFile, keyType)
 
 
-def _initializeKey(givenKey=None):
+def _initializeKey(givenKey=None, keyType=None):
     if not givenKey:
         return None
-    return RSA.import_key(givenKey)
+    return _importKey(givenKey, keyType)
+
+
+def _x25519Kdf(ephemeralPublicKey, recipientPublicKey):
+    salt = ephemeralPublicKey + recipientPublicKey
+
+    def kdf(sharedSecret):
+        return HKDF(sharedSecret, X25519_KEY_BYTES, salt, SHA256, context=X25519_CONTEXT)
+
+    return kdf
+
+
+def _x25519Encrypt(publicKey, message):
+    ephemeralKey = ECC.generate(curve=X25519_CURVE)
+    ephemeralPublicKey = ephemeralKey.public_key().export_key(format='raw')
+    recipientPublicKey = publicKey.export_key(format='raw')
+    sessionKey = key_agreement(static_pub=publicKey, eph_priv=ephemeralKey,
+                               kdf=_x25519Kdf(ephemeralPublicKey, recipientPublicKey))
+    nonce = get_random_bytes(X25519_NONCE_BYTES)
+    aes = AES.new(sessionKey, AES.MODE_GCM, nonce=nonce)
+    messageEncrypted, tag = aes.encrypt_and_digest(message)
+    return ephemeralPublicKey + nonce + tag + messageEncrypted
+
+
+def _x25519Decrypt(privateKey, message):
+    ephemeralPublicKey = message[:X25519_KEY_BYTES]
+    nonce = message[X25519_KEY_BYTES:X25519_KEY_BYTES + X25519_NONCE_BYTES]
+    tag = message[X25519_KEY_BYTES + X25519_NONCE_BYTES:X25519_KEY_BYTES + X25519_NONCE_BYTES + X25519_TAG_BYTES]
+    messageEncrypted = message[X25519_KEY_BYTES + X25519_NONCE_BYTES + X25519_TAG_BYTES:]
+    recipientPublicKey = privateKey.public_key().export_key(format='raw')
+    ephemeralKey = import_x25519_public_key(ephemeralPublicKey)
+    sessionKey = key_agreement(static_priv=privateKey, eph_pub=ephemeralKey,
+                               kdf=_x25519Kdf(ephemeralPublicKey, recipientPublicKey))
+    aes = AES.new(sessionKey, AES.MODE_GCM, nonce=nonce)
+    return aes.decrypt_and_verify(messageEncrypted, tag)
 
 
 class Identity:
     keyPair = None
-
-    def __init__(self, privateKeyFile=DEFAULT_PRIVATE_KEY, publicKeyFile=DEFAULT_PUBLIC_KEY, givenKey=None):
+    privateKeyFile = None
+    keyId = None
+
+    def __init__(self, privateKeyFile=DEFAULT_PRIVATE_KEY, publicKeyFile=DEFAULT_PUBLIC_KEY, givenKey=None,
+                 keyType=None):
+        """
+        :param keyType: Type of givenKey if known, or of a Key Pair that gets bootstrapped
+        """
         if givenKey:
-            self.keyPair = _initializeKey(givenKey)
+            self.keyPair = _initializeKey(givenKey, keyType)
+        elif privateKeyFile and os.path.exists(privateKeyFile) and publicKeyFile and os.path.exists(publicKeyFile):
+            # Parsing a large Private Key is slow; defer it until something needs decrypting.
+            self.keyPair = _initializeOrGetKeyPair(None, publicKeyFile)
+            self.privateKeyFile = privateKeyFile
         else:
-            self.keyPair = _initializeOrGetKeyPair(privateKeyFile, publicKeyFile)
+            self.keyPair = _initializeOrGetKeyPair(privateKeyFile, publicKeyFile, keyType or DEFAULT_KEY_TYPE)
         assert self.keyPair, "Unable to get KeyPair"
 
+    def _getPrivateKey(self):
+        if not self.keyPair.has_private() and self.privateKeyFile:
+            keyPair = _initializeOrGetKeyPair(self.privateKeyFile, None)
+            assert _publicKeyOf(keyPair) == _publicKeyOf(self.keyPair), "Private Key does not match Public Key"
+            self.keyPair = keyPair
+        return self.keyPair
+
+    def getKeyType(self):
+        return _keyTypeOf(self.keyPair)
+
     def getPublicKey(self):
-        publicKey = self.keyPair.publickey()
+        publicKey = _publicKeyOf(self.keyPair)
         assert publicKey, "Public Key Unspecified"
-        return makeStringOf(publicKey.export_key())
+        return makeStringOf(exportKey(publicKey))
 
     def getId(self):
-        publicKey = self.keyPair.publickey()
+        if self.keyId is None:
+            self.keyId = self._makeId()
+        return self.keyId
+
+    def _makeId(self):
+        publicKey = _publicKeyOf(self.keyPair)
         assert publicKey, "Public Key Unspecified"
+        if self.getKeyType() == KEY_TYPE_X25519:
+            publicKeyRaw = publicKey.export_key(format='raw')
+            sha256 = SHA256.new(makeBytesOf("{}:{}".format(KEY_TYPE_X25519, encodeToBase64(publicKeyRaw))))
+            return sha256.hexdigest()
         publicKeyN = publicKey.n
         publicKeyE = publicKey.e
         sha256 = SHA256.new(makeBytesOf("{}:{}".format(publicKeyN, publicKeyE)))
@@ -68,12 +180,23 @@ class Identity:
 
     def encryptPublic(self, message, encoding=DEFAULT_KEY_ENCODING):
         assert message, "Message Unspecified"
-        publicKey = self.keyPair.publickey()
+        publicKey = _publicKeyOf(self.keyPair)
         assert publicKey, "Public Key Unspecified"
-        pkcs1 = PKCS1_OAEP.new(publicKey)
-        return encodeToBase64(pkcs1.encrypt(makeBytesOf(message, encoding)))
+        message = makeBytesOf(message, encoding)
+        with measure('{}.encrypt'.format(self.getKeyType()), len(message)):
+            if self.getKeyType() == KEY_TYPE_X25519:
+                messageEncrypted = _x25519Encrypt(publicKey, message)
+            else:
+                messageEncrypted = PKCS1_OAEP.new(publicKey).encrypt(message)
+        return encodeToBase64(messageEncrypted)
 
     def decrypt(self, message, encoding=DEFAULT_KEY_ENCODING):
         assert message, "Message Unspecified"
-        pkcs1 = PKCS1_OAEP.new(self.keyPair)
-        return makeStringOf(pkcs1.decrypt(decodeFromBase64(message)), encoding)
+        privateKey = self._getPrivateKey()
+        messageEncrypted = decodeFromBase64(message)
+        with measure('{}.decrypt'.format(self.getKeyType()), len(messageEncrypted)):
+            if self.getKeyType() == KEY_TYPE_X25519:
+                messageDecrypted = _x25519Decrypt(privateKey, messageEncrypted)
+            else:
+                messageDecrypted = PKCS1_OAEP.new(privateKey).decrypt(messageEncrypted)
+        return makeStringOf(messageDecrypted, encoding)
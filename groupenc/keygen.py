@@ -0,0 +1,144 @@
+"""
+Key Pair generation: parallel RSA prime search, and a pool of pre-generated Key Pairs.
+"""
+import binascii
+import multiprocessing
+import os
+import stat
+
+from Crypto.Math.Numbers import Integer
+from Crypto.Math.Primality import generate_probable_prime
+from Crypto.PublicKey import ECC, RSA
+from Crypto.Random import get_random_bytes
+
+from .config import DEFAULT_KEY_BITS, DEFAULT_KEY_TYPE, DEFAULT_KEYGEN_WORKERS, DEFAULT_KEY_POOL, \
+    KEY_TYPE_RSA, KEY_TYPE_X25519
+from .helpers import makeBytesOf, makeStringOf
+
+RSA_PUBLIC_EXPONENT = 65537
+X25519_CURVE = 'Curve25519'
+POOL_SUFFIX = '.pem'
+
+
+def _findPrime(task):
+    primeBits, e = task
+    minimum = (Integer(1) << (2 * primeBits - 1)).sqrt()
+
+    def primeFilter(candidate):
+        return candidate > minimum and (candidate - 1).gcd(e) == 1
+
+    return int(generate_probable_prime(exact_bits=primeBits, prime_filter=primeFilter))
+
+
+def _findPrimes(pool, primeBits, e, workers):
+    minDistance = 1 << (primeBits - 100)
+    primes = []
+    while len(primes) < 2:
+        for prime in pool.imap_unordered(_findPrime, [(primeBits, e)] * workers):
+            if all(abs(prime - other) > minDistance for other in primes):
+                primes.append(prime)
+            if len(primes) == 2:
+                break
+    return primes
+
+
+def generateRSAKeyPair(bits=DEFAULT_KEY_BITS, workers=DEFAULT_KEYGEN_WORKERS, e=RSA_PUBLIC_EXPONENT):
+    """
+    Generate an RSA Key Pair like RSA.generate, but race workers to find the primes.
+    """
+    if workers <= 1 or bits % 2:
+        return RSA.generate(bits, e=e)
+    primeBits = bits // 2
+    pool = multiprocessing.Pool(workers)
+    try:
+        while True:
+            p, q = sorted(_findPrimes(pool, primeBits, e, workers))
+            n = p * q
+            lcm = (p - 1) * (q - 1) // int(Integer(p - 1).gcd(q - 1))
+            d = int(Integer(e).inverse(lcm))
+            if n.bit_length() == bits and d >= (1 << primeBits):
+                return RSA.construct((n, e, d, p, q))
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def generateKeyPair(keyType=DEFAULT_KEY_TYPE, workers=DEFAULT_KEYGEN_WORKERS):
+    if keyType == KEY_TYPE_X25519:
+        return ECC.generate(curve=X25519_CURVE)
+    assert keyType == KEY_TYPE_RSA, "Unknown Key Type {}".format(keyType)
+    return generateRSAKeyPair(DEFAULT_KEY_BITS, workers)
+
+
+def exportKey(keyPair):
+    if isinstance(keyPair, ECC.EccKey):
+        return makeBytesOf(keyPair.export_key(format='PEM'))
+    return keyPair.export_key()
+
+
+def _poolDirectory(keyType=DEFAULT_KEY_TYPE, poolDirectory=DEFAULT_KEY_POOL):
+    if keyType == KEY_TYPE_X25519:
+        return os.path.join(poolDirectory, keyType)
+    return os.path.join(poolDirectory, '{}-{}'.format(keyType, DEFAULT_KEY_BITS))
+
+
+def _listPool(directory):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(entry for entry in os.listdir(directory) if entry.endswith(POOL_SUFFIX))
+
+
+def countPooledKeys(keyType=DEFAULT_KEY_TYPE, poolDirectory=DEFAULT_KEY_POOL):
+    return len(_listPool(_poolDirectory(keyType, poolDirectory)))
+
+
+def addPooledKey(keyPair, keyType=DEFAULT_KEY_TYPE, poolDirectory=DEFAULT_KEY_POOL):
+    directory = _poolDirectory(keyType, poolDirectory)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    os.chmod(poolDirectory, stat.S_IRWXU)
+    os.chmod(directory, stat.S_IRWXU)
+    name = makeStringOf(binascii.hexlify(get_random_bytes(16)))
+    keyFile = os.path.join(directory, name + POOL_SUFFIX)
+    temporaryFile = keyFile + '.tmp'
+    fd = os.open(temporaryFile, os.O_WRONLY | os.O_CREAT | os.O_EXCL, stat.S_IRUSR | stat.S_IWUSR)
+    with os.fdopen(fd, "wb") as keyFileStream:
+        keyFileStream.write(exportKey(keyPair))
+    os.rename(temporaryFile, keyFile)
+    return keyFile
+
+
+def takePooledKey(keyType=DEFAULT_KEY_TYPE, poolDirectory=DEFAULT_KEY_POOL):
+    """
+    Claim a pre-generated Private Key from the pool, if there is one.
+    :return: The Private Key as PEM bytes, or None
+    """
+    directory = _poolDirectory(keyType, poolDirectory)
+    for entry in _listPool(directory):
+        keyFile = os.path.join(directory, entry)
+        claimedFile = '{}.{}'.format(keyFile, os.getpid())
+        try:
+            os.rename(keyFile, claimedFile)
+        except OSError:
+            continue
+        with open(claimedFile, "rb") as keyFileStream:
+            privateKey = keyFileStream.read()
+        os.unlink(claimedFile)
+        return privateKey
+    return None
+
+
+def fillKeyPool(count, keyType=DEFAULT_KEY_TYPE, workers=DEFAULT_KEYGEN_WORKERS, poolDirectory=DEFAULT_KEY_POOL,
+                progress=None):
+    """
+    Generate Key Pairs until the pool holds count of them.
+    :param progress: Optional callable(done, total)
+    :return: Number of Key Pairs generated
+    """
+    generated = 0
+    while countPooledKeys(keyType, poolDirectory) < count:
+        addPooledKey(generateKeyPair(keyType, workers), keyType, poolDirectory)
+        generated += 1
+        if progress:
+            progress(countPooledKeys(keyType, poolDirectory), count)
+    return generated
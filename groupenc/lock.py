@@ -0,0 +1,97 @@
+"""
+Advisory locks on Vault Files, so writers that cooperate take turns.
+
+The lock is held on a Lock File beside the Vault File, as saving replaces the Vault File itself.
+It uses flock where available and msvcrt on Windows; elsewhere locking is a no-op, and concurrent
+writers rely on Vault.save merging what changed.
+"""
+import errno
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+from .config import DEFAULT_LOCK_TIMEOUT
+
+LOCK_SUFFIX = '.lock'
+LOCK_POLL_INTERVAL = 0.05
+_BUSY_ERRORS = (errno.EAGAIN, errno.EACCES, getattr(errno, 'EWOULDBLOCK', errno.EAGAIN), errno.EDEADLK)
+
+
+def _tryLock(fd):
+    if fcntl:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    elif msvcrt:
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+
+
+def _unlock(fd):
+    if fcntl:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    elif msvcrt:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class VaultLock:
+    """
+    Exclusive lock on a Vault File. It can be acquired again by its holder, and is released once
+    released as many times.
+    """
+
+    def __init__(self, vaultFile, timeout=DEFAULT_LOCK_TIMEOUT):
+        """
+        :param timeout: Seconds to wait for another holder to release the lock
+        """
+        self.lockFile = vaultFile + LOCK_SUFFIX
+        self.timeout = timeout
+        self._fd = None
+        self._depth = 0
+
+    def isHeld(self):
+        return self._depth > 0
+
+    def acquire(self):
+        if self._depth:
+            self._depth += 1
+            return
+        fd = os.open(self.lockFile, os.O_RDWR | os.O_CREAT, 0o600)
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                _tryLock(fd)
+                break
+            except (IOError, OSError) as exc:
+                if exc.errno not in _BUSY_ERRORS or time.time() >= deadline:
+                    os.close(fd)
+                    raise AssertionError("Unable to Lock {}: {}".format(self.lockFile, exc))
+                time.sleep(LOCK_POLL_INTERVAL)
+        self._fd = fd
+        self._depth = 1
+
+    def release(self):
+        assert self._depth, "Lock {} not Held".format(self.lockFile)
+        self._depth -= 1
+        if self._depth:
+            return
+        fd, self._fd = self._fd, None
+        try:
+            _unlock(fd)
+        finally:
+            os.close(fd)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.release()
+        return False
@@ -0,0 +1,88 @@
+"""
+Counts and timings of the costly work: RSA and X25519 operations, AES, base64, JSON and file I/O.
+
+Operations are named like rsa.decrypt or file.read, and are totalled per process, so work done in
+worker processes is not included. Hooks registered with registerHook see every operation as it
+finishes, to feed Prometheus, StatsD and the like.
+"""
+import threading
+import time
+
+STAT_COUNT = 'count'
+STAT_SECONDS = 'seconds'
+STAT_BYTES = 'bytes'
+
+_CLOCK = getattr(time, 'perf_counter', time.time)
+_LOCK = threading.Lock()
+_STATS = {}
+_HOOKS = []
+
+
+def registerHook(hook):
+    """
+    Call hook(name, seconds, size) after every operation, from the thread that did it.
+    """
+    assert callable(hook), "Hook must be Callable"
+    _HOOKS.append(hook)
+
+
+def unregisterHook(hook):
+    if hook in _HOOKS:
+        _HOOKS.remove(hook)
+
+
+def record(name, seconds, size=0):
+    """Count an operation that took seconds and processed size bytes."""
+    with _LOCK:
+        stat = _STATS.get(name)
+        if stat is None:
+            stat = _STATS[name] = [0, 0.0, 0]
+        stat[0] += 1
+        stat[1] += seconds
+        stat[2] += size
+    for hook in list(_HOOKS):
+        hook(name, seconds, size)
+
+
+class _Measurement:
+
+    def __init__(self, name, size=0):
+        self.name = name
+        self.size = size
+        self.started = None
+
+    def __enter__(self):
+        self.started = _CLOCK()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        record(self.name, _CLOCK() - self.started, self.size)
+        return False
+
+
+def measure(name, size=0):
+    """
+    Time a block as one operation. Set size on what it returns if it is only known afterwards.
+    """
+    return _Measurement(name, size)
+
+
+def getStats():
+    """:return: Totals by operation name, each with count, seconds and bytes"""
+    with _LOCK:
+        return dict((name, {STAT_COUNT: count, STAT_SECONDS: seconds, STAT_BYTES: size})
+                    for name, (count, seconds, size) in _STATS.items())
+
+
+def resetStats():
+    with _LOCK:
+        _STATS.clear()
+
+
+def formatStats(stats):
+    """A table of Stats, slowest operation first."""
+    lines = ['{:<20} {:>10} {:>12} {:>14}'.format('Operation', 'Count', 'Seconds', 'Bytes')]
+    for name, stat in sorted(stats.items(), key=lambda item: (-item[1][STAT_SECONDS], item[0])):
+        lines.append('{:<20} {:>10} {:>12.6f} {:>14}'.format(name, stat[STAT_COUNT], stat[STAT_SECONDS],
+                                                             stat[STAT_BYTES]))
+    return '\n'.join(lines)
@@ -0,0 +1,88 @@
+"""
+Chunked, authenticated encryption of large Secrets, one chunk in memory at a time.
+
+Layout: MAGIC, Salt, then Chunks of Flags (uint8), Length (uint32), Ciphertext, Tag.
+Each Stream has its own Key derived from the Group Key and Salt; Chunk n uses
+Nonce n and authenticates its Flags, so a Stream cannot be truncated or reordered.
+"""
+import struct
+
+from Crypto.Cipher import AES
+from Crypto.Hash import SHA256
+from Crypto.Protocol.KDF import HKDF
+from Crypto.Random import get_random_bytes
+
+from .config import DEFAULT_STREAM_CHUNK_BYTES, DEFAULT_KEY_ENCODING
+from .helpers import makeBytesOf
+from .stats import measure
+
+MAGIC = b'GRPSTR\x00\x01'
+SALT_BYTES = 16
+TAG_BYTES = 16
+NONCE = struct.Struct('>4xQ')
+CHUNK_HEADER = struct.Struct('>BI')
+FLAG_FINAL = 1
+STREAM_CONTEXT = b'groupenc-stream'
+
+
+def _streamKey(groupKey, salt):
+    return HKDF(makeBytesOf(groupKey, DEFAULT_KEY_ENCODING), 32, salt, SHA256, context=STREAM_CONTEXT)
+
+
+def _readExactly(stream, size):
+    data = stream.read(size)
+    assert len(data) == size, "Stream Truncated"
+    return data
+
+
+def readChunks(stream, chunkBytes=DEFAULT_STREAM_CHUNK_BYTES):
+    """Yield a Stream in chunks of up to chunkBytes."""
+    while True:
+        chunk = stream.read(chunkBytes)
+        if not chunk:
+            return
+        yield chunk
+
+
+def encryptChunks(groupKey, chunks):
+    """Yield the encrypted Stream for an Iterable of plaintext chunks."""
+    salt = get_random_bytes(SALT_BYTES)
+    streamKey = _streamKey(groupKey, salt)
+    yield MAGIC + salt
+
+    chunks = iter(chunks)
+    chunk = next(chunks, b'')
+    counter = 0
+    while True:
+        nextChunk = next(chunks, None)
+        header = CHUNK_HEADER.pack(FLAG_FINAL if nextChunk is None else 0, len(chunk))
+        with measure('aes.encrypt', len(chunk)):
+            aes = AES.new(streamKey, AES.MODE_GCM, nonce=NONCE.pack(counter))
+            aes.update(header)
+            chunkEncrypted, tag = aes.encrypt_and_digest(makeBytesOf(chunk))
+        yield header + chunkEncrypted + tag
+        if nextChunk is None:
+            return
+        chunk = nextChunk
+        counter += 1
+
+
+def decryptChunks(groupKey, stream):
+    """Yield the plaintext chunks of an encrypted Stream, verifying each one."""
+    assert _readExactly(stream, len(MAGIC)) == MAGIC, "Not an Encrypted Stream"
+    streamKey = _streamKey(groupKey, _readExactly(stream, SALT_BYTES))
+    counter = 0
+    while True:
+        header = _readExactly(stream, CHUNK_HEADER.size)
+        flags, length = CHUNK_HEADER.unpack(header)
+        chunkEncrypted = _readExactly(stream, length)
+        tag = _readExactly(stream, TAG_BYTES)
+        with measure('aes.decrypt', length):
+            aes = AES.new(streamKey, AES.MODE_GCM, nonce=NONCE.pack(counter))
+            aes.update(header)
+            chunk = aes.decrypt_and_verify(chunkEncrypted, tag)
+        yield chunk
+        if flags & FLAG_FINAL:
+            return
+        counter += 1
+
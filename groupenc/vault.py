@@ -1,70 +1,361 @@
+import binascii
+import bisect
+import contextlib
 import json
 import os
+import re
+import shutil
+import stat
+import tempfile
+import time
+import zlib
 
 from Crypto.Cipher import AES
-from Crypto.Hash import SHA256
+from Crypto.Hash import HMAC, SHA256
+from Crypto.Protocol.KDF import HKDF
 from Crypto.Random import get_random_bytes
 from Crypto.Util.Padding import pad, unpad
 
 from .config import DEFAULT_VAULT_FILE, DEFAULT_GROUP_KEY_BITS, DEFAULT_PAD_BYTES, DEFAULT_IV_BITS, \
-    DEFAULT_KEY_ENCODING, HASH_SECRETS
-from .helpers import makeBytesOf, makeStringOf, encodeToBase64, decodeFromBase64
+    DEFAULT_KEY_ENCODING, DEFAULT_WORKERS, DEFAULT_ROTATE_BATCH, DEFAULT_COMPACT, DEFAULT_VAULT_FORMAT, \
+    VAULT_FORMAT_JSON, VAULT_FORMAT_BINARY, HASH_SECRETS, DEFAULT_STREAM_CHUNK_BYTES, DEFAULT_DEDUP_MIN_BYTES, \
+    DEFAULT_CODEC, DEFAULT_NAMESPACE, NAMESPACE_SEPARATOR, DEFAULT_SAVE_RETRIES
+from .helpers import makeBytesOf, makeStringOf, encodeToBase64, decodeFromBase64, isParallel, parallelMap
+from .agent import makeVaultId
+from .compression import compress, decompress
+from .formats import compileGlob, globPrefix
+from .container import isContainer, readContainer, writeContainer, ContainerSecrets
 from .identity import Identity
+from .lock import VaultLock
+from .stream import readChunks, encryptChunks, decryptChunks
+from .stats import measure
 
 PUBLIC_KEY_HIVE = 'public_keys'
 GROUP_KEY_HIVE = 'group_keys'
 SECRETS_HIVE = 'secrets'
+KEY_TYPE_HIVE = 'key_types'
+BLOBS_HIVE = 'blobs'
+BLOB_FIELD = 'blob'
+VALUE_FIELD = 'v'
+CODEC_FIELD = 'codec'
+MANIFEST_HIVE = 'manifest'
+SEALED_FIELD = 'sealed'
+MANIFEST_CONTEXT = b'groupenc-manifest'
+EPOCH_CONTEXT = 'groupenc-epoch-{}'
+SEAL_NONCE_BYTES = 12
+SEAL_TAG_BYTES = 16
+NAME_FIELD = 'name'
+MODIFIED_FIELD = 'modified'
+STREAM_FIELD = 'stream'
+SIZE_FIELD = 'size'
+STREAMS_SUFFIX = '.streams'
+EPOCHS_HIVE = 'epochs'
+EPOCH_FIELD = 'e'
+# Hives every Namespace has its own of. Members' Public Keys are shared by all Namespaces.
+NAMESPACED_HIVES = [GROUP_KEY_HIVE, SECRETS_HIVE, BLOBS_HIVE, MANIFEST_HIVE, EPOCHS_HIVE]
+NAMESPACE_PATTERN = re.compile(r'^[A-Za-z0-9_.-]+$')
+_MISSING = object()
 
 
 def _bootstrapGroupKey(groupKeyBits=DEFAULT_GROUP_KEY_BITS):
     return get_random_bytes(groupKeyBits // 8)
 
 
-def _saveVault(vaultContents, vaultFile=DEFAULT_VAULT_FILE):
-    with open(vaultFile, "w") as vaultFileStream:
-        json.dump(vaultContents, vaultFileStream, indent=4, sort_keys=True)
+def _fileModeFor(vaultFile):
+    if os.path.exists(vaultFile):
+        return stat.S_IMODE(os.stat(vaultFile).st_mode)
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _fsyncDirectory(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _saveVault(vaultContents, vaultFile=DEFAULT_VAULT_FILE, compact=DEFAULT_COMPACT, vaultFormat=VAULT_FORMAT_JSON):
+    """
+    Write through a Temporary File that replaces the Vault File, so readers never see a partial Vault.
+    :return: JSON written, or None for a binary Vault
+    """
+    directory = os.path.dirname(os.path.abspath(vaultFile))
+    vaultJson = None
+    fd, temporaryFile = tempfile.mkstemp(prefix='.{}.'.format(os.path.basename(vaultFile)), dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as vaultFileStream:
+            if vaultFormat == VAULT_FORMAT_BINARY:
+                with measure('file.write') as measurement:
+                    writeContainer(vaultContents, vaultFileStream)
+                    measurement.size = vaultFileStream.tell()
+            else:
+                vaultContents = dict((hiveName, dict(hive)) for hiveName, hive in vaultContents.items())
+                with measure('json.serialize') as measurement:
+                    if compact:
+                        vaultJson = json.dumps(vaultContents, separators=(',', ':'), sort_keys=True)
+                    else:
+                        vaultJson = json.dumps(vaultContents, indent=4, sort_keys=True)
+                    vaultJson = makeBytesOf(vaultJson)
+                    measurement.size = len(vaultJson)
+                with measure('file.write', len(vaultJson)):
+                    vaultFileStream.write(vaultJson)
+            with measure('file.sync'):
+                vaultFileStream.flush()
+                os.fsync(vaultFileStream.fileno())
+        os.chmod(temporaryFile, _fileModeFor(vaultFile))
+        getattr(os, 'replace', os.rename)(temporaryFile, vaultFile)
+    except BaseException:
+        if os.path.exists(temporaryFile):
+            os.unlink(temporaryFile)
+        raise
+    _fsyncDirectory(directory)
+    return vaultJson
+
+
+def _streamDirectoryOf(vaultFile):
+    return vaultFile + STREAMS_SUFFIX
+
+
+def _isStream(encryptedSecretValue):
+    return isinstance(encryptedSecretValue, dict) and STREAM_FIELD in encryptedSecretValue
+
 
+def _isBlob(encryptedSecretValue):
+    return isinstance(encryptedSecretValue, dict) and BLOB_FIELD in encryptedSecretValue
 
-def _inductIntoVault(vaultContents, identity, groupKey):
+
+def _blobAddress(groupKey, message):
+    """Keyed Hash of a Value, so equal Values share a Blob without revealing them."""
+    hmac = HMAC.new(makeBytesOf(groupKey, DEFAULT_KEY_ENCODING), makeBytesOf(message), SHA256)
+    return hmac.hexdigest()
+
+
+def namespacedHive(hiveName, namespace=None):
+    """Name of a Namespace's own hive, such as secrets@team. The default Namespace uses the plain names."""
+    if not namespace or hiveName not in NAMESPACED_HIVES:
+        return hiveName
+    return '{}{}{}'.format(hiveName, NAMESPACE_SEPARATOR, namespace)
+
+
+def _hivesOf(vaultContents, hiveName):
+    """Every Namespace's hive of a kind, including the default Namespace's."""
+    prefix = hiveName + NAMESPACE_SEPARATOR
+    return [hive for name, hive in vaultContents.items() if name == hiveName or name.startswith(prefix)]
+
+
+def listNamespaces(vaultContents):
+    """Namespaces with Members, other than the default Namespace."""
+    prefix = GROUP_KEY_HIVE + NAMESPACE_SEPARATOR
+    return sorted(name[len(prefix):] for name, hive in vaultContents.items() if name.startswith(prefix) and hive)
+
+
+def _inductIntoVault(vaultContents, identity, groupKey, namespace=None):
     publicKey = identity.getPublicKey()
     keyId = identity.getId()
     encryptedGroupKey = identity.encryptPublic(groupKey)
-    vaultContents[PUBLIC_KEY_HIVE][keyId] = publicKey
-    vaultContents[GROUP_KEY_HIVE][keyId] = encryptedGroupKey
+    vaultContents.setdefault(PUBLIC_KEY_HIVE, {})[keyId] = publicKey
+    vaultContents.setdefault(namespacedHive(GROUP_KEY_HIVE, namespace), {})[keyId] = encryptedGroupKey
+    vaultContents.setdefault(KEY_TYPE_HIVE, {})[keyId] = identity.getKeyType()
     return vaultContents
 
 
-def _disownFromVault(vaultContents, identity):
-    keyId = identity.getId()
+def _wrapGroupKey(task):
+    keyId, publicKey, keyType, groupKey = task
+    identity = Identity(givenKey=publicKey, keyType=keyType)
+    return keyId, identity.encryptPublic(groupKey)
+
+
+def _identifyKey(givenKey):
+    identity = Identity(givenKey=givenKey)
+    return identity.getId(), identity.getPublicKey(), identity.getKeyType()
+
+
+def _disownFromVault(vaultContents, keyId, namespace=None):
+    """
+    Disown a member from a Namespace, and forget their Public Key once they are in no Namespace.
+    A Namespace left without members is removed, Secrets and all, as nobody can read them anymore.
+    """
+    groupKeyHive = namespacedHive(GROUP_KEY_HIVE, namespace)
+    if keyId in vaultContents.get(groupKeyHive, {}):
+        del vaultContents[groupKeyHive][keyId]
+    if namespace and not vaultContents.get(groupKeyHive):
+        for hiveName in NAMESPACED_HIVES:
+            vaultContents.pop(namespacedHive(hiveName, namespace), None)
+    if any(keyId in groupKeys for groupKeys in _hivesOf(vaultContents, GROUP_KEY_HIVE)):
+        return vaultContents
     if keyId in vaultContents.get(PUBLIC_KEY_HIVE, {}):
         del vaultContents[PUBLIC_KEY_HIVE][keyId]
-    if keyId in vaultContents.get(GROUP_KEY_HIVE, {}):
-        del vaultContents[GROUP_KEY_HIVE][keyId]
+    if keyId in vaultContents.get(KEY_TYPE_HIVE, {}):
+        del vaultContents[KEY_TYPE_HIVE][keyId]
     return vaultContents
 
 
-def _bootstrapVault(identity, vaultFile=DEFAULT_VAULT_FILE):
+def _bootstrapVault(identity, vaultFile=DEFAULT_VAULT_FILE, compact=DEFAULT_COMPACT, vaultFormat=VAULT_FORMAT_JSON):
     groupKey = _bootstrapGroupKey()
 
     vaultContents = {
         PUBLIC_KEY_HIVE: {},
         GROUP_KEY_HIVE: {},
         SECRETS_HIVE: {},
+        KEY_TYPE_HIVE: {},
     }
 
     vaultContents = _inductIntoVault(vaultContents, identity, groupKey)
-    _saveVault(vaultContents, vaultFile)
+    _saveVault(vaultContents, vaultFile, compact, vaultFormat)
 
     return vaultContents
 
 
-def _initializeOrGetVault(identity, vaultFile=DEFAULT_VAULT_FILE):
+def _vaultFormatOf(vaultFile, vaultFormat=DEFAULT_VAULT_FORMAT):
     if os.path.exists(vaultFile):
-        with open(vaultFile, "rb") as vaultFileStream:
-            vaultContents = json.load(vaultFileStream)
-            return vaultContents
-    else:
-        return _bootstrapVault(identity, vaultFile)
+        return VAULT_FORMAT_BINARY if isContainer(vaultFile) else VAULT_FORMAT_JSON
+    return vaultFormat
+
+
+def _fileSignature(vaultFile):
+    """Changes whenever the Vault File is saved, as saving replaces it."""
+    try:
+        fileStat = os.stat(vaultFile)
+    except OSError:
+        return None
+    return fileStat.st_dev, fileStat.st_ino, fileStat.st_size, getattr(fileStat, 'st_mtime_ns', fileStat.st_mtime)
+
+
+def _copyContents(vaultContents):
+    """A copy of Vault Contents that changes to them do not reach. Mapped hives are copied as they were read."""
+    return dict((hiveName, hive.original() if isinstance(hive, ContainerSecrets) else dict(hive))
+                for hiveName, hive in vaultContents.items())
+
+
+def _parseVault(vaultSource):
+    """Vault Contents from the JSON of a Vault File, or a copy of a binary Vault's."""
+    if not isinstance(vaultSource, bytes):
+        return _copyContents(vaultSource)
+    with measure('json.parse', len(vaultSource)):
+        return json.loads(makeStringOf(vaultSource))
+
+
+def _readVault(vaultFile, vaultFormat=VAULT_FORMAT_JSON):
+    """
+    :return: Vault Contents, and a Source to parse them from again as they were read
+    """
+    if vaultFormat == VAULT_FORMAT_BINARY:
+        vaultContents = readContainer(vaultFile)
+        return vaultContents, _copyContents(vaultContents)
+    with measure('file.read') as measurement, open(vaultFile, "rb") as vaultFileStream:
+        vaultJson = vaultFileStream.read()
+        measurement.size = len(vaultJson)
+    return _parseVault(vaultJson), vaultJson
+
+
+def _loadVault(identity, vaultFile=DEFAULT_VAULT_FILE, compact=DEFAULT_COMPACT, vaultFormat=VAULT_FORMAT_JSON):
+    """
+    Read a Vault File, bootstrapping it under its lock if there is none yet.
+    :return: Vault Contents, their Source and the Signature of the Vault File they were read from
+    """
+    if not os.path.exists(vaultFile):
+        with VaultLock(vaultFile):
+            if not os.path.exists(vaultFile):
+                _bootstrapVault(identity, vaultFile, compact, vaultFormat)
+    signature = _fileSignature(vaultFile)
+    vaultContents, vaultSource = _readVault(vaultFile, _vaultFormatOf(vaultFile, vaultFormat))
+    return vaultContents, vaultSource, signature
+
+
+def _namespaceOf(hiveName):
+    baseName, _, namespace = hiveName.partition(NAMESPACE_SEPARATOR)
+    return namespace or None
+
+
+def _mergeHive(baseHive, ourHive, theirHive):
+    """
+    Three-way merge of a hive, entry by entry. Entries changed on one side only take that change;
+    entries changed on both sides keep ours.
+    """
+    mergedHive = dict(theirHive)
+    for key in set(baseHive) | set(ourHive):
+        ourValue = ourHive.get(key, _MISSING)
+        if ourValue == baseHive.get(key, _MISSING):
+            continue
+        if ourValue is _MISSING:
+            mergedHive.pop(key, None)
+        else:
+            mergedHive[key] = ourValue
+    return mergedHive
+
+
+def _keyingOf(vaultContents, namespace):
+    """What changes when a Namespace gets a new Group Key: by Rotation, or by creating the Namespace."""
+    return (bool(vaultContents.get(namespacedHive(GROUP_KEY_HIVE, namespace))),
+            dict(vaultContents.get(namespacedHive(EPOCHS_HIVE, namespace), {})))
+
+
+def _sealKey(groupKey, context):
+    return HKDF(makeBytesOf(groupKey, DEFAULT_KEY_ENCODING), 32, b'', SHA256, context=context)
+
+
+def _seal(groupKey, context, message):
+    """
+    Encrypt and authenticate under a Key derived from the Group Key for context, with a random Nonce.
+    Unlike _encryptValue, this is safe for predictable plaintexts such as JSON and Keys.
+    """
+    nonce = get_random_bytes(SEAL_NONCE_BYTES)
+    aes = AES.new(_sealKey(groupKey, context), AES.MODE_GCM, nonce=nonce)
+    message = makeBytesOf(message)
+    with measure('aes.encrypt', len(message)):
+        messageEncrypted, tag = aes.encrypt_and_digest(message)
+    return encodeToBase64(nonce + messageEncrypted + tag)
+
+
+def _unseal(groupKey, context, sealed):
+    """Decrypt what _seal encrypted, raising ValueError if it was altered or sealed with another Key."""
+    payload = decodeFromBase64(sealed)
+    assert len(payload) >= SEAL_NONCE_BYTES + SEAL_TAG_BYTES, "Sealed Value Truncated"
+    nonce, messageEncrypted, tag = \
+        payload[:SEAL_NONCE_BYTES], payload[SEAL_NONCE_BYTES:-SEAL_TAG_BYTES], payload[-SEAL_TAG_BYTES:]
+    aes = AES.new(_sealKey(groupKey, context), AES.MODE_GCM, nonce=nonce)
+    with measure('aes.decrypt', len(messageEncrypted)):
+        return aes.decrypt_and_verify(messageEncrypted, tag)
+
+
+def _epochContext(epoch):
+    """Each Epoch's Key is wrapped under a Key of its own, derived from the Key of the Epoch after it."""
+    return makeBytesOf(EPOCH_CONTEXT.format(epoch))
+
+
+def _sealManifest(groupKey, manifest):
+    codec, payload = compress(makeBytesOf(json.dumps(manifest, sort_keys=True, separators=(',', ':'))))
+    storedManifest = {SEALED_FIELD: _seal(groupKey, MANIFEST_CONTEXT, payload)}
+    if codec:
+        storedManifest[CODEC_FIELD] = codec
+    return storedManifest
+
+
+def _readManifest(groupKey, storedManifest):
+    """
+    Decrypt the manifest hive. A sealed manifest that was altered, or sealed with another Key, raises
+    ValueError rather than reading as empty, as the next save would then lose hashed Names for good.
+    """
+    if not storedManifest:
+        return {}
+    if SEALED_FIELD in storedManifest:
+        payload = decompress(_unseal(groupKey, MANIFEST_CONTEXT, storedManifest[SEALED_FIELD]),
+                             storedManifest.get(CODEC_FIELD))
+        return json.loads(makeStringOf(payload))
+    try:
+        # Manifests of earlier versions, sealed again when the Vault is next saved.
+        return json.loads(makeStringOf(_decryptStored(groupKey, storedManifest)))
+    except (KeyError, ValueError, zlib.error):
+        # Left under an old Group Key by a version that did not know of manifests.
+        return {}
 
 
 def _makeIV(encryptionKey, ivBits=DEFAULT_IV_BITS):
@@ -80,21 +371,64 @@ def _encryptValue(encryptionKey, message):
     iv = _makeIV(encryptionKey)
     aes = AES.new(encryptionKey, AES.MODE_GCM, nonce=iv)
     message = makeBytesOf(message)
-    messagePadded = pad(message, DEFAULT_PAD_BYTES)
-    messageEncrypted = aes.encrypt(messagePadded)
+    with measure('aes.encrypt', len(message)):
+        messagePadded = pad(message, DEFAULT_PAD_BYTES)
+        messageEncrypted = aes.encrypt(messagePadded)
     return encodeToBase64(messageEncrypted)
 
 
-def _decryptValue(encryptionKey, message):
+def _decryptBytes(encryptionKey, message):
     assert encryptionKey, "Encryption Key Unspecified"
     assert message, "Message Unspecified"
     encryptionKey = makeBytesOf(encryptionKey, DEFAULT_KEY_ENCODING)
     iv = _makeIV(encryptionKey)
     aes = AES.new(encryptionKey, AES.MODE_GCM, nonce=iv)
     messageEncrypted = decodeFromBase64(message)
-    messagePadded = aes.decrypt(messageEncrypted)
-    message = unpad(messagePadded, DEFAULT_PAD_BYTES)
-    return makeStringOf(message)
+    with measure('aes.decrypt', len(messageEncrypted)):
+        messagePadded = aes.decrypt(messageEncrypted)
+        return unpad(messagePadded, DEFAULT_PAD_BYTES)
+
+
+def _decryptValue(encryptionKey, message):
+    return makeStringOf(_decryptBytes(encryptionKey, message))
+
+
+def _encryptStored(encryptionKey, message, codec=DEFAULT_CODEC, epoch=0):
+    """
+    Encrypt a Value, compressed first if that pays off. Compressed Values are stored with their
+    Codec, Values of Epochs after the first with their Epoch, and others as before.
+    """
+    codec, message = compress(makeBytesOf(message), codec)
+    messageEncrypted = _encryptValue(encryptionKey, message)
+    if not codec and not epoch:
+        return messageEncrypted
+    storedValue = {VALUE_FIELD: messageEncrypted}
+    if codec:
+        storedValue[CODEC_FIELD] = codec
+    if epoch:
+        storedValue[EPOCH_FIELD] = epoch
+    return storedValue
+
+
+def _decryptStored(encryptionKey, storedValue):
+    if isinstance(storedValue, dict):
+        return decompress(_decryptBytes(encryptionKey, storedValue[VALUE_FIELD]), storedValue.get(CODEC_FIELD))
+    return _decryptBytes(encryptionKey, storedValue)
+
+
+def _codecOf(storedValue):
+    return storedValue.get(CODEC_FIELD) if isinstance(storedValue, dict) else None
+
+
+def _epochOf(storedValue):
+    """Epoch of the Group Key a stored Value, Blob or Stream was encrypted with."""
+    return storedValue.get(EPOCH_FIELD, 0) if isinstance(storedValue, dict) else 0
+
+
+def _withEpoch(record, epoch):
+    if epoch:
+        record[EPOCH_FIELD] = epoch
+    return record
 
 
 def _hashKey(message):
@@ -121,103 +455,926 @@ class Vault:
     identity = None
     vaultFile = None
     vaultContents = None
+    agent = None
+    compact = False
+    vaultFormat = VAULT_FORMAT_JSON
+    namespace = None
 
-    def __init__(self, identity=None, vaultFile=DEFAULT_VAULT_FILE):
+    def __init__(self, identity=None, vaultFile=DEFAULT_VAULT_FILE, agent=None, compact=DEFAULT_COMPACT,
+                 vaultFormat=DEFAULT_VAULT_FORMAT, namespace=DEFAULT_NAMESPACE):
+        """
+        :param compact: Save without Indentation
+        :param vaultFormat: Format of a new Vault File. Existing Vault Files keep theirs.
+        :param namespace: Namespace to work in, with its own Group Key, Members and Secrets. It is
+            created, with this Identity as its only Member, if it does not exist yet.
+        """
+        assert not namespace or NAMESPACE_PATTERN.match(namespace), "Invalid Namespace {}".format(namespace)
         self.identity = identity or Identity()
         self.vaultFile = vaultFile or DEFAULT_VAULT_FILE
-        self.vaultContents = _initializeOrGetVault(self.identity, self.vaultFile)
+        self.agent = agent
+        self.compact = bool(compact)
+        self.namespace = namespace or None
+        self.vaultFormat = _vaultFormatOf(self.vaultFile, vaultFormat)
+        self._memberIdentities = {}
+        self._dirtyHives = set()
+        self._obsoleteStreams = set()
+        self._renamedSecrets = {}
+        self._blobRefs = None
+        self._manifest = None
+        self._manifestGroupKey = None
+        self._nameIndex = None
+        self._lock = VaultLock(self.vaultFile)
+        self._resetCache()
+        self.vaultContents, self._baseSource, self._baseSignature = \
+            _loadVault(self.identity, self.vaultFile, self.compact, self.vaultFormat)
+        self._bootstrapNamespace()
+
+    def _hiveName(self, hiveName):
+        return namespacedHive(hiveName, self.namespace)
+
+    def _hive(self, hiveName):
+        return self.vaultContents.setdefault(self._hiveName(hiveName), {})
+
+    def _getHive(self, hiveName):
+        return self.vaultContents.get(self._hiveName(hiveName), {})
+
+    def _markDirty(self, *hiveNames):
+        self._dirtyHives.update(self._hiveName(hiveName) for hiveName in hiveNames)
+
+    def _bootstrapNamespace(self):
+        if not self.namespace or self._getHive(GROUP_KEY_HIVE):
+            return
+        leftHives = [hiveName for hiveName in NAMESPACED_HIVES if self._getHive(hiveName)]
+        assert not leftHives, \
+            "Namespace {} has no Members but holds {}".format(self.namespace, ', '.join(leftHives))
+        groupKey = _bootstrapGroupKey()
+        self.vaultContents = _inductIntoVault(self.vaultContents, self.identity, groupKey, self.namespace)
+        self._markDirty(PUBLIC_KEY_HIVE, GROUP_KEY_HIVE, KEY_TYPE_HIVE)
+        self._setCache(groupKey, self._getHive(GROUP_KEY_HIVE)[self.identity.getId()])
+
+    def listNamespaces(self):
+        """Namespaces in the Vault other than the default one, whether or not this Identity is in them."""
+        return listNamespaces(self.vaultContents)
+
+    def isDirty(self):
+        return bool(self._dirtyHives)
+
+    def _resetCache(self):
+        """Forget the unwrapped Group Key and the Secret Name mappings made with it."""
+        self._groupKey = None
+        self._groupKeyEncrypted = None
+        self._encryptedKeys = {}
+        self._decryptedKeys = {}
+        self._epochKeys = {}
+
+    def _setCache(self, groupKey, groupKeyEncrypted):
+        self._resetCache()
+        self._groupKey = groupKey
+        self._groupKeyEncrypted = groupKeyEncrypted
 
     def _getGroupKeyAsBytes(self):
-        groupKeyEncrypted = self.vaultContents.get(GROUP_KEY_HIVE, {}).get(self.identity.getId())
+        groupKeyEncrypted = self._getHive(GROUP_KEY_HIVE).get(self.identity.getId())
         if not groupKeyEncrypted:
+            self._resetCache()
             return None
-        return makeBytesOf(self.identity.decrypt(groupKeyEncrypted), DEFAULT_KEY_ENCODING)
+        if groupKeyEncrypted != self._groupKeyEncrypted:
+            groupKey = self._unwrapGroupKey(groupKeyEncrypted)
+            self._setCache(groupKey, groupKeyEncrypted)
+        return self._groupKey
+
+    def peekGroupKey(self):
+        """The Group Key if it is unwrapped already and still current, without unwrapping it."""
+        groupKeyEncrypted = self._getHive(GROUP_KEY_HIVE).get(self.identity.getId())
+        if groupKeyEncrypted and groupKeyEncrypted == self._groupKeyEncrypted:
+            return self._groupKey
+        return None
+
+    def _unwrapGroupKey(self, groupKeyEncrypted):
+        if self.agent:
+            groupKey = self.agent.getGroupKey(makeVaultId(self.identity.getId(), groupKeyEncrypted))
+            if groupKey:
+                return groupKey
+        groupKey = makeBytesOf(self.identity.decrypt(groupKeyEncrypted), DEFAULT_KEY_ENCODING)
+        self._shareGroupKey(groupKey, groupKeyEncrypted)
+        return groupKey
+
+    def _shareGroupKey(self, groupKey, groupKeyEncrypted):
+        if self.agent:
+            self.agent.putGroupKey(makeVaultId(self.identity.getId(), groupKeyEncrypted), groupKey)
+
+    def _encryptSecretKey(self, groupKey, secretKey):
+        """Encrypted Name a Secret is stored under, in whichever Epoch it was written."""
+        if groupKey != self._groupKey:
+            return self._findSecretKey(groupKey, secretKey)
+        encryptedSecretKey = self._encryptedKeys.get(secretKey)
+        if encryptedSecretKey is None:
+            encryptedSecretKey = self._findSecretKey(groupKey, secretKey)
+            self._cacheSecretKey(secretKey, encryptedSecretKey)
+        return encryptedSecretKey
+
+    def _findSecretKey(self, groupKey, secretKey):
+        encryptedSecretKey = _encryptKey(groupKey, secretKey)
+        secrets = self._getHive(SECRETS_HIVE)
+        if HASH_SECRETS or encryptedSecretKey in secrets:
+            return encryptedSecretKey
+        for epoch in range(self.getEpoch() - 1, -1, -1):
+            olderSecretKey = _encryptKey(self._keyForEpoch(groupKey, epoch), secretKey)
+            if olderSecretKey in secrets:
+                return olderSecretKey
+        return encryptedSecretKey
+
+    def _cacheSecretKey(self, secretKey, encryptedSecretKey, oldEncryptedSecretKey=None):
+        self._decryptedKeys.pop(oldEncryptedSecretKey, None)
+        self._encryptedKeys[secretKey] = encryptedSecretKey
+        self._decryptedKeys[encryptedSecretKey] = makeBytesOf(secretKey)
+
+    def _currentSecretKey(self, groupKey, secretKey):
+        """
+        Encrypted Name to write a Secret under, in the current Epoch. A Secret written in an older
+        Epoch is removed from under its old Name first.
+        """
+        encryptedSecretKey = self._encryptSecretKey(groupKey, secretKey)
+        if HASH_SECRETS or not self.getEpoch():
+            return encryptedSecretKey
+        currentSecretKey = _encryptKey(groupKey, secretKey)
+        if currentSecretKey != encryptedSecretKey:
+            self._removeSecretForEncryptedKey(encryptedSecretKey)
+            self._dropFromManifest(groupKey, encryptedSecretKey)
+            if groupKey == self._groupKey:
+                self._cacheSecretKey(secretKey, currentSecretKey, encryptedSecretKey)
+        return currentSecretKey
+
+    def getEpoch(self):
+        """Epoch of the current Group Key, one more than the Epochs before it. 0 until the first Rotation."""
+        epochs = self._getHive(EPOCHS_HIVE)
+        return max(int(epoch) for epoch in epochs) + 1 if epochs else 0
+
+    def _keyForEpoch(self, groupKey, epoch):
+        """
+        Group Key of an older Epoch. Each is kept wrapped under the Key of the Epoch after it.
+        """
+        currentEpoch = self.getEpoch()
+        if epoch >= currentEpoch:
+            return groupKey
+        epochKeys = self._epochKeys if groupKey == self._groupKey else {}
+        epochKey = groupKey
+        for olderEpoch in range(currentEpoch - 1, epoch - 1, -1):
+            if olderEpoch not in epochKeys:
+                wrappedKey = self._getHive(EPOCHS_HIVE).get(str(olderEpoch))
+                assert wrappedKey, "Group Key of Epoch {} Missing".format(olderEpoch)
+                epochKeys[olderEpoch] = _unseal(epochKey, _epochContext(olderEpoch), wrappedKey)
+            epochKey = epochKeys[olderEpoch]
+        return epochKey
+
+    def reload(self):
+        """Re-read the Vault File. The Group Key is only unwrapped again if it changed."""
+        self.vaultFormat = _vaultFormatOf(self.vaultFile, self.vaultFormat)
+        self.vaultContents, self._baseSource, self._baseSignature = \
+            _loadVault(self.identity, self.vaultFile, self.compact, self.vaultFormat)
+        self._memberIdentities = {}
+        self._dirtyHives = set()
+        self._obsoleteStreams = set()
+        self._renamedSecrets = {}
+        self._blobRefs = None
+        self._manifest = None
+        self._manifestGroupKey = None
+        self._nameIndex = None
+        # Encrypted Names depend on the Epoch a Secret was written in, which another writer may have changed.
+        self._encryptedKeys = {}
+        self._decryptedKeys = {}
+        self._bootstrapNamespace()
+
+    def getMember(self, keyId):
+        """
+        Parsed Identity of a member, parsed once per Vault session.
+        """
+        identity = self._memberIdentities.get(keyId)
+        if identity is None:
+            publicKey = self._getHive(PUBLIC_KEY_HIVE).get(keyId)
+            if not publicKey:
+                return None
+            keyType = self._getHive(KEY_TYPE_HIVE).get(keyId)
+            identity = Identity(givenKey=publicKey, keyType=keyType)
+            identity.keyId = keyId
+            self._memberIdentities[keyId] = identity
+        return identity
 
     def _listSecretsEncrypted(self):
-        for encryptedSecretKey in self.vaultContents.get(SECRETS_HIVE, {}):
+        for encryptedSecretKey in self._getHive(SECRETS_HIVE):
             yield encryptedSecretKey
 
-    def listSecrets(self):
-        if not HASH_SECRETS:
-            groupKey = self._getGroupKeyAsBytes()
+    def _getManifest(self, groupKey):
+        """
+        Names of Secrets, with their size and modified time, by Encrypted Name. The manifest hive is
+        decrypted once per Group Key. Secrets it lacks, for example ones added by older versions, are
+        filled in by decrypting their Names where they are not hashed.
+        """
+        if self._manifest is not None and self._manifestGroupKey == groupKey:
+            return self._manifest
+        storedManifest = self.vaultContents.get(self._hiveName(MANIFEST_HIVE))
+        manifest = _readManifest(groupKey, storedManifest)
+        if storedManifest and SEALED_FIELD not in storedManifest:
+            self._markDirty(MANIFEST_HIVE)
+        secrets = self._getHive(SECRETS_HIVE)
+        for encryptedSecretKey in [key for key in manifest if key not in secrets]:
+            del manifest[encryptedSecretKey]
+        if len(manifest) < len(secrets):
             for encryptedSecretKey in self._listSecretsEncrypted():
-                decryptedKey = _decryptKey(groupKey, encryptedSecretKey)
-                if decryptedKey:
-                    yield makeStringOf(decryptedKey)
+                if encryptedSecretKey not in manifest:
+                    epochKey = self._keyForEpoch(groupKey, _epochOf(secrets[encryptedSecretKey]))
+                    decryptedKey = _decryptKey(epochKey, encryptedSecretKey)
+                    if decryptedKey:
+                        manifest[encryptedSecretKey] = {NAME_FIELD: makeStringOf(decryptedKey)}
+        self._manifest = manifest
+        self._manifestGroupKey = groupKey
+        if groupKey == self._groupKey:
+            for encryptedSecretKey, entry in manifest.items():
+                self._encryptedKeys[entry[NAME_FIELD]] = encryptedSecretKey
+                self._decryptedKeys[encryptedSecretKey] = makeBytesOf(entry[NAME_FIELD])
+        return manifest
+
+    def _getNameIndex(self, groupKey):
+        """Sorted Names of Secrets, built once per manifest and kept up to date by add and remove."""
+        manifest = self._getManifest(groupKey)
+        if self._nameIndex is None or self._nameIndex[0] is not manifest:
+            self._nameIndex = (manifest, sorted(entry[NAME_FIELD] for entry in manifest.values()))
+        return self._nameIndex[1]
+
+    def _recordInManifest(self, groupKey, encryptedSecretKey, secretKey, size):
+        manifest = self._getManifest(groupKey)
+        if encryptedSecretKey not in manifest and self._nameIndex and self._nameIndex[0] is manifest:
+            bisect.insort(self._nameIndex[1], secretKey)
+        manifest[encryptedSecretKey] = {NAME_FIELD: secretKey, SIZE_FIELD: size, MODIFIED_FIELD: int(time.time())}
+        self._markDirty(MANIFEST_HIVE)
+
+    def _dropFromManifest(self, groupKey, encryptedSecretKey):
+        manifest = self._getManifest(groupKey)
+        entry = manifest.pop(encryptedSecretKey, None)
+        if entry is None:
+            return
+        if self._nameIndex and self._nameIndex[0] is manifest:
+            names = self._nameIndex[1]
+            index = bisect.bisect_left(names, entry[NAME_FIELD])
+            if index < len(names) and names[index] == entry[NAME_FIELD]:
+                del names[index]
+        self._markDirty(MANIFEST_HIVE)
+
+    def _storeManifest(self):
+        self.vaultContents[self._hiveName(MANIFEST_HIVE)] = _sealManifest(self._manifestGroupKey, self._manifest)
+
+    def listSecrets(self, prefix=None):
+        """
+        Names of Secrets in order, found through the Name index without decrypting any Secret.
+        :param prefix: Only Names starting with this, such as db/prod/
+        """
+        groupKey = self._getGroupKeyAsBytes()
+        names = self._getNameIndex(groupKey)
+        if not prefix:
+            return list(names)
+        start = bisect.bisect_left(names, prefix)
+        end = start
+        while end < len(names) and names[end].startswith(prefix):
+            end += 1
+        return names[start:end]
+
+    def findSecrets(self, pattern):
+        """
+        Names of Secrets matching a Glob such as db/prod/*, scanning only those sharing its literal prefix.
+        """
+        regex = compileGlob(pattern)
+        return [secretKey for secretKey in self.listSecrets(globPrefix(pattern)) if regex.match(secretKey)]
+
+    def describeSecrets(self):
+        """
+        :return: Mapping of Secret Names to their size and modified time, where they are known
+        """
+        groupKey = self._getGroupKeyAsBytes()
+        return dict((entry[NAME_FIELD], dict((field, entry.get(field)) for field in (SIZE_FIELD, MODIFIED_FIELD)))
+                    for entry in self._getManifest(groupKey).values())
 
     def listKeys(self):
-        for keyId, keyValue in self.vaultContents.get(PUBLIC_KEY_HIVE, {}).items():
-            yield keyId, keyValue
+        """Key Ids and Public Keys of the Members of this Namespace."""
+        publicKeys = self._getHive(PUBLIC_KEY_HIVE)
+        for keyId in self._getHive(GROUP_KEY_HIVE):
+            if keyId in publicKeys:
+                yield keyId, publicKeys[keyId]
+
+    def _streamFile(self, streamId, vaultFile=None):
+        return os.path.join(_streamDirectoryOf(vaultFile or self.vaultFile), streamId)
+
+    def _writeStream(self, groupKey, chunks):
+        """
+        Encrypt chunks into a new Stream File beside the Vault File.
+        :return: Record for the secrets hive
+        """
+        directory = _streamDirectoryOf(self.vaultFile)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+            os.chmod(directory, stat.S_IRWXU)
+        streamId = makeStringOf(binascii.hexlify(get_random_bytes(16)))
+        size = [0]
+
+        def countedChunks():
+            for chunk in chunks:
+                size[0] += len(chunk)
+                yield chunk
+
+        fd, temporaryFile = tempfile.mkstemp(prefix='.{}.'.format(streamId), dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as streamFileStream:
+                for piece in encryptChunks(groupKey, countedChunks()):
+                    with measure('file.write', len(piece)):
+                        streamFileStream.write(piece)
+                with measure('file.sync'):
+                    streamFileStream.flush()
+                    os.fsync(streamFileStream.fileno())
+            os.rename(temporaryFile, self._streamFile(streamId))
+        except BaseException:
+            if os.path.exists(temporaryFile):
+                os.unlink(temporaryFile)
+            raise
+        return _withEpoch({STREAM_FIELD: streamId, SIZE_FIELD: size[0]}, self.getEpoch())
+
+    def _readChunks(self, groupKey, encryptedSecretValue):
+        """Yield the plaintext of a stored Secret, one chunk at a time."""
+        if _isBlob(encryptedSecretValue):
+            blob = self._getHive(BLOBS_HIVE).get(encryptedSecretValue[BLOB_FIELD])
+            assert blob, "Blob {} Missing".format(encryptedSecretValue[BLOB_FIELD])
+            yield _decryptStored(self._keyForEpoch(groupKey, _epochOf(blob)), blob)
+            return
+        epochKey = self._keyForEpoch(groupKey, _epochOf(encryptedSecretValue))
+        if not _isStream(encryptedSecretValue):
+            yield _decryptStored(epochKey, encryptedSecretValue)
+            return
+        with open(self._streamFile(encryptedSecretValue[STREAM_FIELD]), "rb") as streamFileStream:
+            for chunk in decryptChunks(epochKey, streamFileStream):
+                yield chunk
+
+    def _getBlobRefs(self):
+        """Number of Secrets referencing each Blob, counted once per Vault session."""
+        if self._blobRefs is None:
+            self._blobRefs = {}
+            for encryptedSecretValue in self._getHive(SECRETS_HIVE).values():
+                if _isBlob(encryptedSecretValue):
+                    address = encryptedSecretValue[BLOB_FIELD]
+                    self._blobRefs[address] = self._blobRefs.get(address, 0) + 1
+        return self._blobRefs
+
+    def _storeValue(self, groupKey, secretValue, codec=DEFAULT_CODEC):
+        """
+        Values of DEFAULT_DEDUP_MIN_BYTES or more are kept once in the blobs hive, and referenced by Address.
+        """
+        secretValue = makeBytesOf(secretValue)
+        epoch = self.getEpoch()
+        if len(secretValue) < DEFAULT_DEDUP_MIN_BYTES:
+            return _encryptStored(groupKey, secretValue, codec, epoch)
+        address = _blobAddress(groupKey, secretValue)
+        blobs = self._hive(BLOBS_HIVE)
+        if address not in blobs:
+            blobs[address] = _encryptStored(groupKey, secretValue, codec, epoch)
+            self._markDirty(BLOBS_HIVE)
+        return _withEpoch({BLOB_FIELD: address}, epoch)
+
+    def _releaseValue(self, encryptedSecretValue):
+        if _isStream(encryptedSecretValue):
+            self._obsoleteStreams.add(encryptedSecretValue[STREAM_FIELD])
+        if _isBlob(encryptedSecretValue):
+            blobRefs = self._getBlobRefs()
+            address = encryptedSecretValue[BLOB_FIELD]
+            blobRefs[address] = blobRefs.get(address, 0) - 1
+            if blobRefs[address] <= 0:
+                del blobRefs[address]
+                if address in self._getHive(BLOBS_HIVE):
+                    del self.vaultContents[self._hiveName(BLOBS_HIVE)][address]
+                    self._markDirty(BLOBS_HIVE)
+
+    def _putEncryptedSecret(self, encryptedSecretKey, encryptedSecretValue):
+        secrets = self._hive(SECRETS_HIVE)
+        blobRefs = self._getBlobRefs()
+        oldEncryptedSecretValue = secrets.get(encryptedSecretKey)
+        if oldEncryptedSecretValue == encryptedSecretValue:
+            return False
+        if _isBlob(encryptedSecretValue):
+            address = encryptedSecretValue[BLOB_FIELD]
+            blobRefs[address] = blobRefs.get(address, 0) + 1
+        self._releaseValue(oldEncryptedSecretValue)
+        secrets[encryptedSecretKey] = encryptedSecretValue
+        self._renamedSecrets.pop(encryptedSecretKey, None)
+        self._markDirty(SECRETS_HIVE)
+        return True
 
     def _getSecretForEncryptedKey(self, encryptedSecretKey, groupKey=None):
         assert encryptedSecretKey, "Encrypted Secret Unspecified"
         groupKey = groupKey or self._getGroupKeyAsBytes()
-        encryptedSecretValue = self.vaultContents.get(SECRETS_HIVE, {}).get(encryptedSecretKey)
+        encryptedSecretValue = self._getHive(SECRETS_HIVE).get(encryptedSecretKey)
         if encryptedSecretValue:
-            secretValue = _decryptValue(groupKey, encryptedSecretValue)
+            secretValue = makeStringOf(b''.join(self._readChunks(groupKey, encryptedSecretValue)))
             return secretValue
         return None
 
     def getSecret(self, secretKey, groupKey=None):
         assert secretKey, "Secret Unspecified"
         groupKey = groupKey or self._getGroupKeyAsBytes()
-        encryptedSecretKey = _encryptKey(groupKey, secretKey)
-        return self._getSecretForEncryptedKey(encryptedSecretKey)
+        encryptedSecretKey = self._encryptSecretKey(groupKey, secretKey)
+        return self._getSecretForEncryptedKey(encryptedSecretKey, groupKey)
+
+    def isSecretStream(self, secretKey, groupKey=None):
+        assert secretKey, "Secret Unspecified"
+        groupKey = groupKey or self._getGroupKeyAsBytes()
+        encryptedSecretKey = self._encryptSecretKey(groupKey, secretKey)
+        return _isStream(self._getHive(SECRETS_HIVE).get(encryptedSecretKey))
+
+    def getSecretStream(self, secretKey, outputStream, groupKey=None):
+        """
+        Write a Secret to a binary Stream, one chunk at a time.
+        :return: Number of Bytes Written, or None if there is no such Secret
+        """
+        assert secretKey, "Secret Unspecified"
+        groupKey = groupKey or self._getGroupKeyAsBytes()
+        encryptedSecretKey = self._encryptSecretKey(groupKey, secretKey)
+        encryptedSecretValue = self._getHive(SECRETS_HIVE).get(encryptedSecretKey)
+        if not encryptedSecretValue:
+            return None
+        written = 0
+        for chunk in self._readChunks(groupKey, encryptedSecretValue):
+            outputStream.write(chunk)
+            written += len(chunk)
+        return written
 
-    def _addSecretForEncryptedKey(self, encryptedSecretKey, secretValue=None, groupKey=None):
+    def getSecrets(self, secretKeys=None, groupKey=None):
+        """
+        Decrypt many Secrets with one Group Key.
+        :param secretKeys: Names of Secrets to get, or None for all of them
+        :return: Mapping of Secret Names to Values, leaving out missing Secrets. Streams are not
+            read whole; get those with getSecretStream.
+        """
+        groupKey = groupKey or self._getGroupKeyAsBytes()
+        if secretKeys is None:
+            secretKeys = list(self.listSecrets())
+        secrets = {}
+        for secretKey in secretKeys:
+            assert secretKey, "Secret Unspecified"
+            encryptedSecretKey = self._encryptSecretKey(groupKey, secretKey)
+            assert not _isStream(self._getHive(SECRETS_HIVE).get(encryptedSecretKey)), \
+                "Secret {} is a Stream, get it with getSecretStream".format(secretKey)
+            secretValue = self._getSecretForEncryptedKey(encryptedSecretKey, groupKey)
+            if secretValue is not None:
+                secrets[secretKey] = secretValue
+        return secrets
+
+    def _addSecretForEncryptedKey(self, encryptedSecretKey, secretValue=None, groupKey=None, codec=DEFAULT_CODEC):
         assert encryptedSecretKey, "Encrypted Secret Unspecified"
         groupKey = groupKey or self._getGroupKeyAsBytes()
         secretValue = secretValue or ""
-        encryptedSecretValue = _encryptValue(groupKey, secretValue)
-        self.vaultContents[SECRETS_HIVE][encryptedSecretKey] = encryptedSecretValue
+        encryptedSecretValue = self._storeValue(groupKey, secretValue, codec)
+        return self._putEncryptedSecret(encryptedSecretKey, encryptedSecretValue)
 
-    def addSecret(self, secretKey, secretValue=None, groupKey=None):
+    def addSecret(self, secretKey, secretValue=None, groupKey=None, codec=DEFAULT_CODEC):
+        """
+        :param codec: Codec to compress the Value with, if that pays off. 'none' to store it as is.
+        """
         assert secretKey, "Secret Unspecified"
         groupKey = groupKey or self._getGroupKeyAsBytes()
-        encryptedSecretKey = _encryptKey(groupKey, secretKey)
-        self._addSecretForEncryptedKey(encryptedSecretKey, secretValue, groupKey)
+        manifest = self._getManifest(groupKey)
+        encryptedSecretKey = self._currentSecretKey(groupKey, secretKey)
+        if self._addSecretForEncryptedKey(encryptedSecretKey, secretValue, groupKey, codec) or \
+                encryptedSecretKey not in manifest:
+            self._recordInManifest(groupKey, encryptedSecretKey, secretKey, len(makeBytesOf(secretValue or "")))
+
+    def addSecretStream(self, secretKey, inputStream, groupKey=None, chunkBytes=DEFAULT_STREAM_CHUNK_BYTES):
+        """
+        Add a Secret read from a binary Stream, encrypted in chunks into a Stream File
+        beside the Vault File, so it never has to be in memory all at once.
+        :return: Number of Bytes Added
+        """
+        assert secretKey, "Secret Unspecified"
+        groupKey = groupKey or self._getGroupKeyAsBytes()
+        assert groupKey, "Unable to get a Group Key"
+        self._getManifest(groupKey)
+        encryptedSecretKey = self._currentSecretKey(groupKey, secretKey)
+        encryptedSecretValue = self._writeStream(groupKey, readChunks(inputStream, chunkBytes))
+        self._putEncryptedSecret(encryptedSecretKey, encryptedSecretValue)
+        self._recordInManifest(groupKey, encryptedSecretKey, secretKey, encryptedSecretValue[SIZE_FIELD])
+        return encryptedSecretValue[SIZE_FIELD]
+
+    def addSecrets(self, secrets, groupKey=None, codec=DEFAULT_CODEC):
+        """
+        Add many Secrets with one Group Key.
+        :param secrets: Mapping, or Iterable of (Name, Value) pairs
+        :return: Number of Secrets Added
+        """
+        groupKey = groupKey or self._getGroupKeyAsBytes()
+        assert groupKey, "Unable to get a Group Key"
+        if hasattr(secrets, 'items'):
+            secrets = secrets.items()
+        added = 0
+        for secretKey, secretValue in secrets:
+            self.addSecret(secretKey, secretValue, groupKey, codec)
+            added += 1
+        return added
 
     def _removeSecretForEncryptedKey(self, encryptedSecretKey):
         assert encryptedSecretKey, "Encrypted Secret Unspecified"
-        if encryptedSecretKey in self.vaultContents.get(SECRETS_HIVE, {}):
-            del self.vaultContents[SECRETS_HIVE][encryptedSecretKey]
+        if encryptedSecretKey in self._getHive(SECRETS_HIVE):
+            self._getBlobRefs()
+            encryptedSecretValue = self.vaultContents[self._hiveName(SECRETS_HIVE)][encryptedSecretKey]
+            del self.vaultContents[self._hiveName(SECRETS_HIVE)][encryptedSecretKey]
+            self._renamedSecrets.pop(encryptedSecretKey, None)
+            self._releaseValue(encryptedSecretValue)
+            self._markDirty(SECRETS_HIVE)
 
     def removeSecret(self, secretKey):
         assert secretKey, "Secret Unspecified"
         groupKey = self._getGroupKeyAsBytes()
-        encryptedSecretKey = _encryptKey(groupKey, secretKey)
+        self._getManifest(groupKey)
+        encryptedSecretKey = self._encryptSecretKey(groupKey, secretKey)
         self._removeSecretForEncryptedKey(encryptedSecretKey)
+        self._dropFromManifest(groupKey, encryptedSecretKey)
 
     def induct(self, givenKey, groupKey=None):
         assert givenKey, "Unable to get an Identity to Induct"
         groupKey = groupKey or self._getGroupKeyAsBytes()
         assert groupKey, "Unable to get a Group Key"
         identity = Identity(givenKey=givenKey)
-        self.vaultContents = _inductIntoVault(self.vaultContents, identity, groupKey)
+        self.vaultContents = _inductIntoVault(self.vaultContents, identity, groupKey, self.namespace)
+        self._memberIdentities[identity.getId()] = identity
+        self._markDirty(PUBLIC_KEY_HIVE, GROUP_KEY_HIVE, KEY_TYPE_HIVE)
+
+    def inductMany(self, givenKeys, groupKey=None, workers=DEFAULT_WORKERS):
+        """
+        Induct many Identities at once, skipping those already in the Namespace.
+        :return: Key Ids of the Identities Inducted
+        """
+        groupKey = groupKey or self._getGroupKeyAsBytes()
+        assert groupKey, "Unable to get a Group Key"
+        publicKeys = self._hive(PUBLIC_KEY_HIVE)
+        groupKeys = self._hive(GROUP_KEY_HIVE)
+        newKeys = {}
+        for keyId, publicKey, keyType in parallelMap(_identifyKey, [key for key in givenKeys if key], workers):
+            if keyId not in groupKeys:
+                newKeys[keyId] = (publicKey, keyType)
+        tasks = [(keyId, publicKey, keyType, groupKey) for keyId, (publicKey, keyType) in newKeys.items()]
+        for keyId, encryptedGroupKey in parallelMap(_wrapGroupKey, tasks, workers):
+            publicKey, keyType = newKeys[keyId]
+            publicKeys[keyId] = publicKey
+            groupKeys[keyId] = encryptedGroupKey
+            self._hive(KEY_TYPE_HIVE)[keyId] = keyType
+            self._memberIdentities.pop(keyId, None)
+            self._markDirty(PUBLIC_KEY_HIVE, GROUP_KEY_HIVE, KEY_TYPE_HIVE)
+        return sorted(newKeys)
+
+    def disown(self, givenKey=None, keyId=None):
+        """
+        Disown a member of this Namespace by Public Key or Key Id, or disown self if neither is given.
+        """
+        if not keyId:
+            identity = Identity(givenKey=givenKey) if givenKey else self.identity
+            keyId = identity.getId()
+        if keyId in self._getHive(PUBLIC_KEY_HIVE) or keyId in self._getHive(GROUP_KEY_HIVE):
+            self._markDirty(PUBLIC_KEY_HIVE, GROUP_KEY_HIVE, KEY_TYPE_HIVE)
+        secrets = self._getHive(SECRETS_HIVE)
+        self.vaultContents = _disownFromVault(self.vaultContents, keyId, self.namespace)
+        self._memberIdentities.pop(keyId, None)
+        if self._hiveName(GROUP_KEY_HIVE) not in self.vaultContents:
+            self._markDirty(*NAMESPACED_HIVES)
+            self._obsoleteStreams.update(encryptedSecretValue[STREAM_FIELD]
+                                         for encryptedSecretValue in secrets.values()
+                                         if _isStream(encryptedSecretValue))
+            self._blobRefs = None
+            self._manifest = None
+            self._manifestGroupKey = None
+            self._nameIndex = None
+        if keyId == self.identity.getId():
+            self._resetCache()
 
-    def disown(self, givenKey=None):
-        identity = Identity(givenKey=givenKey) if givenKey else self.identity
-        self.vaultContents = _disownFromVault(self.vaultContents, identity)
+    def _rotateMembers(self, newGroupKey, workers=DEFAULT_WORKERS, progress=None):
+        keyTypes = self._getHive(KEY_TYPE_HIVE)
+        tasks = [(keyId, publicKey, keyTypes.get(keyId), newGroupKey) for keyId, publicKey in self.listKeys()]
+        if isParallel(len(tasks), workers):
+            wrappedKeys = parallelMap(_wrapGroupKey, tasks, workers)
+        else:
+            wrappedKeys = ((keyId, self.getMember(keyId).encryptPublic(newGroupKey)) for keyId, _, _, _ in tasks)
+        groupKeys = {}
+        for keyId, encryptedGroupKey in wrappedKeys:
+            groupKeys[keyId] = encryptedGroupKey
+            if progress:
+                progress(GROUP_KEY_HIVE, len(groupKeys), len(tasks))
+        self.vaultContents[self._hiveName(GROUP_KEY_HIVE)] = groupKeys
+        self._markDirty(GROUP_KEY_HIVE)
+        return len(groupKeys)
 
-    def rotate(self):
+    def rotate(self, workers=DEFAULT_WORKERS, progress=None, reencrypt=False):
+        """
+        Start a new Epoch with a new Group Key, wrapped for every member. The old Group Key is kept
+        wrapped under the new one, so Secrets are read as they are and re-encrypted later by reencrypt.
+        :param workers: Processes used to wrap the Group Key for members
+        :param progress: Optional callable(hive, done, total)
+        :param reencrypt: Re-encrypt every Secret under the new Group Key now
+        :return: Counts and timings (in seconds) of the Rotation
+        """
+        timings = {}
+        started = time.time()
         groupKey = self._getGroupKeyAsBytes()
+        assert groupKey, "Unable to get a Group Key"
         newGroupKey = _bootstrapGroupKey()
         assert (newGroupKey != groupKey), "Unable to derive a New Group Key"
+        manifest = self._getManifest(groupKey)
+        timings['unwrap'] = time.time() - started
+
+        started = time.time()
+        epoch = self.getEpoch()
+        self._hive(EPOCHS_HIVE)[str(epoch)] = _seal(newGroupKey, _epochContext(epoch), groupKey)
+        self._markDirty(EPOCHS_HIVE)
+        memberCount = self._rotateMembers(newGroupKey, workers, progress)
+        timings[GROUP_KEY_HIVE] = time.time() - started
+
+        groupKeyEncrypted = self.vaultContents[self._hiveName(GROUP_KEY_HIVE)].get(self.identity.getId())
+        if groupKeyEncrypted:
+            self._setCache(newGroupKey, groupKeyEncrypted)
+            self._epochKeys[epoch] = groupKey
+            self._shareGroupKey(newGroupKey, groupKeyEncrypted)
+        else:
+            self._resetCache()
+        self._manifest = manifest
+        self._manifestGroupKey = newGroupKey
+        self._markDirty(MANIFEST_HIVE)
 
+        secretCount = 0
+        if reencrypt:
+            started = time.time()
+            secretCount = self.reencrypt(groupKey=newGroupKey, progress=progress)['secrets']
+            timings[SECRETS_HIVE] = time.time() - started
+
+        return {
+            'secrets': secretCount,
+            'members': memberCount,
+            'timings': timings,
+        }
+
+    def _listStaleSecrets(self):
+        epoch = self.getEpoch()
+        return [encryptedSecretKey for encryptedSecretKey, encryptedSecretValue in self._getHive(SECRETS_HIVE).items()
+                if _epochOf(encryptedSecretValue) < epoch]
+
+    def _reencryptSecret(self, groupKey, encryptedSecretKey):
+        """Move a Secret written in an older Epoch to the current one, under its current Name."""
+        encryptedSecretValue = self._getHive(SECRETS_HIVE)[encryptedSecretKey]
+        manifest = self._getManifest(groupKey)
+        entry = manifest.get(encryptedSecretKey)
+        newEncryptedSecretKey = encryptedSecretKey
         if not HASH_SECRETS:
-            for secretKey in list(self.listSecrets()):
-                secretValue = self.getSecret(secretKey)
-                self.removeSecret(secretKey)
-                self.addSecret(secretKey, secretValue, newGroupKey)
+            if entry:
+                secretKey = entry[NAME_FIELD]
+            else:
+                epochKey = self._keyForEpoch(groupKey, _epochOf(encryptedSecretValue))
+                secretKey = makeStringOf(_decryptKey(epochKey, encryptedSecretKey) or b'')
+            if not secretKey:
+                return False
+            newEncryptedSecretKey = _encryptKey(groupKey, secretKey)
+        if _isStream(encryptedSecretValue):
+            newEncryptedSecretValue = self._writeStream(groupKey, self._readChunks(groupKey, encryptedSecretValue))
         else:
-            for encryptedSecretKey in list(self._listSecretsEncrypted()):
-                secretValue = self._getSecretForEncryptedKey(encryptedSecretKey)
-                self._removeSecretForEncryptedKey(encryptedSecretKey)
-                self._addSecretForEncryptedKey(encryptedSecretKey, secretValue, newGroupKey)
+            blob = self._getHive(BLOBS_HIVE).get(encryptedSecretValue[BLOB_FIELD]) \
+                if _isBlob(encryptedSecretValue) else encryptedSecretValue
+            secretValue = b''.join(self._readChunks(groupKey, encryptedSecretValue))
+            newEncryptedSecretValue = self._storeValue(groupKey, secretValue, _codecOf(blob))
+        savedEncryptedSecretKey = self._renamedSecrets.get(encryptedSecretKey, encryptedSecretKey)
+        self._removeSecretForEncryptedKey(encryptedSecretKey)
+        self._putEncryptedSecret(newEncryptedSecretKey, newEncryptedSecretValue)
+        # Remembered so that saving does not undo what another writer did to this Secret meanwhile.
+        self._renamedSecrets[newEncryptedSecretKey] = savedEncryptedSecretKey
+        if entry and newEncryptedSecretKey != encryptedSecretKey:
+            manifest[newEncryptedSecretKey] = manifest.pop(encryptedSecretKey)
+            self._cacheSecretKey(entry[NAME_FIELD], newEncryptedSecretKey, encryptedSecretKey)
+        self._markDirty(MANIFEST_HIVE)
+        return True
+
+    def reencrypt(self, batch=None, groupKey=None, progress=None):
+        """
+        Re-encrypt Secrets written in older Epochs under the current Group Key.
+        :param batch: Most Secrets to re-encrypt, or None for all of them
+        :param progress: Optional callable(hive, done, total)
+        :return: Counts of Secrets re-encrypted, and of those remaining in older Epochs
+        """
+        groupKey = groupKey or self._getGroupKeyAsBytes()
+        assert groupKey, "Unable to get a Group Key"
+        staleSecretKeys = self._listStaleSecrets()
+        selectedSecretKeys = staleSecretKeys[:batch] if batch is not None else staleSecretKeys
+        reencrypted = 0
+        for encryptedSecretKey in selectedSecretKeys:
+            if self._reencryptSecret(groupKey, encryptedSecretKey):
+                reencrypted += 1
+            if progress and (reencrypted % DEFAULT_ROTATE_BATCH == 0 or reencrypted == len(selectedSecretKeys)):
+                progress(SECRETS_HIVE, reencrypted, len(selectedSecretKeys))
+        return {
+            'secrets': reencrypted,
+            'remaining': len(self._listStaleSecrets()),
+        }
+
+    def save(self, force=False):
+        """
+        Write the Vault File, unless nothing changed since it was read or last saved.
+        :return: Whether the Vault File was written
+        """
+        if not force and not self._dirtyHives:
+            self._removeObsoleteStreams()
+            return False
+        with self._lock:
+            retries = DEFAULT_SAVE_RETRIES
+            while _fileSignature(self.vaultFile) != self._baseSignature:
+                assert retries > 0, "Vault File {} Keeps Changing".format(self.vaultFile)
+                self._mergeSaved()
+                retries -= 1
+            if self._hiveName(MANIFEST_HIVE) in self._dirtyHives and self._manifest is not None:
+                self._storeManifest()
+            vaultSource = _saveVault(self.vaultContents, self.vaultFile, self.compact, self.vaultFormat)
+            self._baseSignature = _fileSignature(self.vaultFile)
+            if vaultSource is None:
+                vaultSource = _copyContents(readContainer(self.vaultFile))
+            self._baseSource = vaultSource
+        self._dirtyHives = set()
+        self._renamedSecrets = {}
+        self._removeObsoleteStreams()
+        return True
+
+    @contextlib.contextmanager
+    def locked(self):
+        """
+        Hold the lock on the Vault File, so a load, change and save cannot interleave with another
+        writer's. The Vault is read again first if it changed, unless it has unsaved changes.
+
+            with vault.locked():
+                vault.addSecret('password', 'changeMe')
+                vault.save()
+        """
+        with self._lock:
+            if not self._dirtyHives and _fileSignature(self.vaultFile) != self._baseSignature:
+                self.reload()
+            yield self
+
+    def _mergeSaved(self):
+        """
+        Merge what another writer saved since the Vault File was read into the changes made here,
+        hive by hive. Unwrapped Group Keys are kept, as a Namespace whose Group Key changed on one
+        side cannot be merged with changes to it on the other.
+        """
+        signature = _fileSignature(self.vaultFile)
+        if signature is None:
+            self._baseSource, self._baseSignature = None, None
+            return
+        theirContents, theirSource = _readVault(self.vaultFile, _vaultFormatOf(self.vaultFile, self.vaultFormat))
+        baseContents = _parseVault(self._baseSource) if self._baseSource is not None else {}
+        ourContents = self.vaultContents
+        hiveNames = set(baseContents) | set(ourContents) | set(theirContents)
+
+        for namespace in set(_namespaceOf(hiveName) for hiveName in hiveNames):
+            namespacedHives = [namespacedHive(hiveName, namespace) for hiveName in NAMESPACED_HIVES]
+            baseKeying = _keyingOf(baseContents, namespace)
+            ourChanges = any(hiveName in self._dirtyHives for hiveName in namespacedHives)
+            theirChanges = any(baseContents.get(hiveName, {}) != theirContents.get(hiveName, {})
+                               for hiveName in namespacedHives)
+            ourKeyingChanged = _keyingOf(ourContents, namespace) != baseKeying
+            theirKeyingChanged = _keyingOf(theirContents, namespace) != baseKeying
+            assert not (ourKeyingChanged and theirChanges) and not (theirKeyingChanged and ourChanges), \
+                "Namespace {} was Rotated by another Writer, Reload and Retry".format(namespace or 'default')
+
+        mergedContents = {}
+        for hiveName in hiveNames:
+            if hiveName not in self._dirtyHives:
+                if hiveName in theirContents:
+                    mergedContents[hiveName] = theirContents[hiveName]
+                continue
+            if hiveName == self._hiveName(MANIFEST_HIVE) and self._manifest is not None:
+                self._manifest = _mergeHive(_readManifest(self._manifestGroupKey, baseContents.get(hiveName)),
+                                            self._manifest,
+                                            _readManifest(self._manifestGroupKey, theirContents.get(hiveName)))
+                mergedContents[hiveName] = theirContents.get(hiveName, {})
+                continue
+            mergedContents[hiveName] = _mergeHive(baseContents.get(hiveName, {}), ourContents.get(hiveName, {}),
+                                                  theirContents.get(hiveName, {}))
+        self._mergeRenamedSecrets(baseContents, ourContents, theirContents, mergedContents)
+
+        streamIds = set()
+        for hiveName in list(mergedContents):
+            if hiveName.partition(NAMESPACE_SEPARATOR)[0] != SECRETS_HIVE:
+                continue
+            blobsHiveName = namespacedHive(BLOBS_HIVE, _namespaceOf(hiveName))
+            for encryptedSecretValue in mergedContents[hiveName].values():
+                if _isStream(encryptedSecretValue):
+                    streamIds.add(encryptedSecretValue[STREAM_FIELD])
+                if not _isBlob(encryptedSecretValue):
+                    continue
+                # A Blob one side dropped may still be referenced by the other side's Secrets.
+                address = encryptedSecretValue[BLOB_FIELD]
+                blobs = mergedContents.setdefault(blobsHiveName, {})
+                if address not in blobs:
+                    for contents in (theirContents, baseContents, ourContents):
+                        if address in contents.get(blobsHiveName, {}):
+                            blobs[address] = contents[blobsHiveName][address]
+                            self._dirtyHives.add(blobsHiveName)
+                            break
+        self._obsoleteStreams -= streamIds
+
+        if self._hiveName(MANIFEST_HIVE) not in self._dirtyHives:
+            self._manifest = None
+            self._manifestGroupKey = None
+        if self._manifest is not None:
+            secrets = mergedContents.get(self._hiveName(SECRETS_HIVE), {})
+            for encryptedSecretKey in [key for key in self._manifest if key not in secrets]:
+                del self._manifest[encryptedSecretKey]
+        self.vaultContents = mergedContents
+        self._baseSource, self._baseSignature = theirSource, signature
+        self._memberIdentities = {}
+        self._blobRefs = None
+        self._nameIndex = None
+        self._encryptedKeys = {}
+        self._decryptedKeys = {}
+
+    def _mergeRenamedSecrets(self, baseContents, ourContents, theirContents, mergedContents):
+        """
+        Re-encrypting a Secret moves it to a new Name without changing it, which a merge would take
+        for a new Secret. Where another writer changed or removed that Secret, theirs is kept.
+        """
+        secretsHiveName = self._hiveName(SECRETS_HIVE)
+        if not self._renamedSecrets or secretsHiveName not in self._dirtyHives:
+            return
+        baseSecrets = baseContents.get(secretsHiveName, {})
+        ourSecrets = ourContents.get(secretsHiveName, {})
+        theirSecrets = theirContents.get(secretsHiveName, {})
+        mergedSecrets = mergedContents.setdefault(secretsHiveName, {})
+        theirManifest = None
+        if self._manifest is not None:
+            theirManifest = _readManifest(self._manifestGroupKey,
+                                          theirContents.get(self._hiveName(MANIFEST_HIVE)))
+        for encryptedSecretKey, savedEncryptedSecretKey in list(self._renamedSecrets.items()):
+            encryptedSecretKeys = (savedEncryptedSecretKey, encryptedSecretKey)
+            if all(theirSecrets.get(key) == baseSecrets.get(key) for key in encryptedSecretKeys):
+                continue
+            ourEncryptedSecretValue = ourSecrets.get(encryptedSecretKey)
+            if _isStream(ourEncryptedSecretValue):
+                self._obsoleteStreams.add(ourEncryptedSecretValue[STREAM_FIELD])
+            for key in encryptedSecretKeys:
+                if key in theirSecrets:
+                    mergedSecrets[key] = theirSecrets[key]
+                else:
+                    mergedSecrets.pop(key, None)
+                if theirManifest is not None and key in theirManifest:
+                    self._manifest[key] = theirManifest[key]
+            del self._renamedSecrets[encryptedSecretKey]
+
+    def prune(self):
+        """
+        Remove Blobs no Secret references, and Stream Files left behind by changes that were never saved.
+        Stream Files are removed when the Vault is saved.
+        :return: Number of Blobs and Stream Files Removed
+        """
+        blobRefs = self._getBlobRefs()
+        blobs = self._getHive(BLOBS_HIVE)
+        unusedBlobs = [address for address in blobs if not blobRefs.get(address)]
+        for address in unusedBlobs:
+            del blobs[address]
+            self._markDirty(BLOBS_HIVE)
+
+        streamIds = set(encryptedSecretValue[STREAM_FIELD]
+                        for secrets in _hivesOf(self.vaultContents, SECRETS_HIVE)
+                        for encryptedSecretValue in secrets.values()
+                        if _isStream(encryptedSecretValue))
+        directory = _streamDirectoryOf(self.vaultFile)
+        unusedStreams = [streamId for streamId in (os.listdir(directory) if os.path.isdir(directory) else [])
+                         if streamId not in streamIds and not streamId.startswith('.')]
+        self._obsoleteStreams.update(unusedStreams)
+        return len(unusedBlobs) + len(unusedStreams)
+
+    def _removeObsoleteStreams(self):
+        for streamId in self._obsoleteStreams:
+            streamFile = self._streamFile(streamId)
+            if os.path.exists(streamFile):
+                os.unlink(streamFile)
+        self._obsoleteStreams = set()
 
-        for _, givenKey in dict(self.listKeys()).items():
-            self.disown(givenKey)
-            self.induct(givenKey, newGroupKey)
+    def _copyStreams(self, vaultFile):
+        directory = _streamDirectoryOf(vaultFile)
+        for encryptedSecretValue in [value for secrets in _hivesOf(self.vaultContents, SECRETS_HIVE)
+                                     for value in secrets.values()]:
+            if not _isStream(encryptedSecretValue):
+                continue
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+                os.chmod(directory, stat.S_IRWXU)
+            streamFile = self._streamFile(encryptedSecretValue[STREAM_FIELD], vaultFile)
+            shutil.copyfile(self._streamFile(encryptedSecretValue[STREAM_FIELD]), streamFile)
+            os.chmod(streamFile, stat.S_IRUSR | stat.S_IWUSR)
 
-    def save(self):
-        _saveVault(self.vaultContents, self.vaultFile)
+    def convert(self, vaultFormat, vaultFile=None):
+        """
+        Save the Vault in another Format, in place or to another Vault File.
+        """
+        assert vaultFormat in (VAULT_FORMAT_JSON, VAULT_FORMAT_BINARY), "Unknown Format {}".format(vaultFormat)
+        self.vaultFormat = vaultFormat
+        if vaultFile and vaultFile != self.vaultFile:
+            assert not self._lock.isHeld(), "Unable to Convert to another Vault File while Locked"
+            self._copyStreams(vaultFile)
+            self.vaultFile = vaultFile
+            self._lock = VaultLock(vaultFile)
+            self._baseSignature = _fileSignature(vaultFile)
+        return self.save(force=True)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from groupenc.agent import AgentClient, AgentServer, makeVaultId
+from groupenc.vault import Vault
+
+
+class TestAgent(unittest.TestCase):
+
+    vaultFile = '.test-groupenc.json'
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.socketPath = os.path.join(directory, 'agent.sock')
+        self.server = AgentServer(self.socketPath, ttl=60)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.client = AgentClient(self.socketPath)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def testAgentSocketPermissions(self):
+        self.assertEqual(os.stat(self.socketPath).st_mode & 0o777, 0o600)
+
+    def testAgentGetPutLock(self):
+        self.assertTrue(self.client.isAvailable())
+        self.assertEqual(self.client.getGroupKey('vault'), None)
+        self.assertTrue(self.client.putGroupKey('vault', b'\x00secret\xff'))
+        self.assertEqual(self.client.getGroupKey('vault'), b'\x00secret\xff')
+
+        self.assertTrue(self.client.lock())
+        self.assertFalse(self.client.putGroupKey('vault', b'\x00secret\xff'))
+        self.assertEqual(self.client.getGroupKey('vault'), None)
+        self.assertTrue(self.client.unlock())
+        self.assertEqual(self.client.getGroupKey('vault'), None)
+
+    def testAgentTtl(self):
+        self.assertTrue(self.client.putGroupKey('vault', b'secret', ttl=-1))
+        self.assertEqual(self.client.getGroupKey('vault'), None)
+
+    def testAgentUnavailable(self):
+        client = AgentClient(self.socketPath + '.missing')
+        self.assertFalse(client.isAvailable())
+        self.assertEqual(client.getGroupKey('vault'), None)
+
+    def testVaultUsesAgent(self):
+        vault = Vault(vaultFile=self.vaultFile, agent=self.client)
+        vault.addSecret("agent", "Held!")
+
+        vault = Vault(vaultFile=self.vaultFile, agent=self.client)
+
+        def failingDecrypt(*args, **kwargs):
+            raise AssertionError("Group Key should come from the Agent")
+
+        vault.identity.decrypt = failingDecrypt
+        groupKeyEncrypted = vault.vaultContents['group_keys'][vault.identity.getId()]
+        self.assertTrue(self.client.getGroupKey(makeVaultId(vault.identity.getId(), groupKeyEncrypted)))
+        vault.addSecret("agent", "Held!")
+        self.assertEqual(vault.getSecret("agent"), "Held!")
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import unittest
+
+try:
+    import asyncio
+    from groupenc.asyncvault import AsyncIdentity, AsyncVault
+except (ImportError, SyntaxError):
+    asyncio = None
+
+
+@unittest.skipIf(asyncio is None or sys.version_info < (3, 6), "Requires Python 3.6")
+class TestAsyncVault(unittest.TestCase):
+
+    vaultFile = '.test-groupenc.json'
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        lockFile = self.vaultFile + '.lock'
+        if os.path.exists(lockFile):
+            os.unlink(lockFile)
+
+    def testAsyncVaultBasic(self):
+        run = self.loop.run_until_complete
+        vault = run(AsyncVault.open(vaultFile=self.vaultFile))
+        run(vault.addSecrets(dict(("async/%d" % index, "value %d" % index) for index in range(10))))
+        self.assertEqual(run(vault.getSecret("async/3")), "value 3")
+        secrets = run(vault.getSecrets(["async/%d" % index for index in range(10)] + ["missing"], batchSize=3))
+        self.assertEqual(len(secrets), 10)
+        self.assertEqual(secrets["async/9"], "value 9")
+        for index in range(10):
+            run(vault.removeSecret("async/%d" % index))
+        run(vault.save())
+
+    def testAsyncVaultCoalescesUnwrap(self):
+        run = self.loop.run_until_complete
+        identity = run(AsyncIdentity.create())
+        vault = run(AsyncVault.open(identity, vaultFile=self.vaultFile))
+        unwraps = []
+        decrypt = vault.vault.identity.decrypt
+
+        def countingDecrypt(message):
+            unwraps.append(message)
+            return decrypt(message)
+
+        vault.vault.identity.decrypt = countingDecrypt
+        groupKeys = run(asyncio.gather(*[vault.getGroupKey() for _ in range(5)]))
+        self.assertEqual(len(set(groupKeys)), 1)
+        self.assertEqual(len(unwraps), 1)
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from groupenc.bench import BENCHMARK_NAMES, runBenchmarks, makeReport, compareResults
+
+
+class TestBench(unittest.TestCase):
+
+    def testRunBenchmarks(self):
+        results = runBenchmarks(['vault.getSecret', 'vault.rotate', 'vault.reencrypt'], keyBits=[1024],
+                                secrets=[5, 20], valueSizes=[32], members=[2], repeat=1)
+        self.assertEqual([result['name'] for result in results],
+                         ['vault.getSecret'] * 2 + ['vault.rotate'] + ['vault.reencrypt'] * 2)
+        self.assertEqual(results[1]['params'], {'keyBits': 1024, 'secrets': 20, 'valueSize': 32})
+        self.assertEqual(results[0]['ops'], 5)
+        self.assertEqual(results[2]['params'], {'keyBits': 1024, 'members': 2})
+        self.assertEqual(results[4]['ops'], 20)
+        for result in results:
+            self.assertTrue(0 < result['min'] <= result['median'])
+        self.assertRaises(AssertionError, runBenchmarks, ['vault.unknown'])
+        self.assertIn('identity.keygen', BENCHMARK_NAMES)
+
+    def testCompareResults(self):
+        baseline = makeReport([
+            {'name': 'vault.load', 'params': {'secrets': 10}, 'median': 1.0},
+            {'name': 'vault.load', 'params': {'secrets': 100}, 'median': 1.0},
+        ])
+        results = [
+            {'name': 'vault.load', 'params': {'secrets': 10}, 'median': 1.2},
+            {'name': 'vault.load', 'params': {'secrets': 100}, 'median': 1.5},
+            {'name': 'vault.save', 'params': {'secrets': 10}, 'median': 9.0},
+        ]
+        regressions = compareResults(results, baseline, tolerance=0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertEqual(regressions[0]['params'], {'secrets': 100})
+        self.assertEqual(regressions[0]['ratio'], 1.5)
+        self.assertEqual(compareResults(results, baseline, tolerance=1.0), [])
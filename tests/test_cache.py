@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import os
+import unittest
+
+from groupenc.cache import CachedVault, SecretCache
+from groupenc.vault import Vault
+
+
+class TestCache(unittest.TestCase):
+
+    vaultFile = '.test-groupenc.json'
+
+    def tearDown(self):
+        lockFile = self.vaultFile + '.lock'
+        if os.path.exists(lockFile):
+            os.unlink(lockFile)
+
+    def testSecretCache(self):
+        now = [0]
+        cache = SecretCache(maxEntries=2, ttl=10, clock=lambda: now[0])
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.get('a'), 1)
+        now[0] = 10
+        self.assertEqual(cache.get('a'), None)
+        self.assertEqual(len(cache), 1)
+
+    def _testCachedVault(self, useInotify):
+        writer = Vault(vaultFile=self.vaultFile)
+        writer.addSecret("cached", "one")
+        writer.save()
+
+        cachedVault = CachedVault(vaultFile=self.vaultFile, pollInterval=0, useInotify=useInotify)
+        try:
+            unwraps = []
+            decrypt = cachedVault.vault.identity.decrypt
+
+            def countingDecrypt(message):
+                unwraps.append(message)
+                return decrypt(message)
+
+            cachedVault.vault.identity.decrypt = countingDecrypt
+            self.assertEqual(cachedVault.getSecret("cached"), "one")
+            self.assertFalse(cachedVault.refresh())
+
+            writer.addSecret("cached", "two")
+            writer.save()
+            self.assertEqual(cachedVault.getSecret("cached"), "two")
+            self.assertEqual(cachedVault.getSecrets(["cached", "missing"]), {"cached": "two"})
+            self.assertEqual(len(unwraps), 1)
+        finally:
+            cachedVault.close()
+            writer.removeSecret("cached")
+            writer.save()
+
+    def testCachedVaultInotify(self):
+        self._testCachedVault(useInotify=True)
+
+    def testCachedVaultPolling(self):
+        self._testCachedVault(useInotify=False)
+
+    def testCachedVaultReencrypted(self):
+        vaultFile = '.test-groupenc-reencrypted.json'
+        writer = Vault(vaultFile=vaultFile)
+        writer.addSecret("reencrypted", "Moved")
+        writer.rotate()
+        writer.save()
+
+        cachedVault = CachedVault(vaultFile=vaultFile, pollInterval=0, useInotify=False)
+        try:
+            vault = Vault(vaultFile=vaultFile)
+            self.assertEqual(cachedVault.getSecret("reencrypted"), "Moved")
+            self.assertEqual(vault.getSecret("reencrypted"), "Moved")
+            writer.reencrypt()
+            writer.save()
+
+            self.assertEqual(cachedVault.getSecret("reencrypted"), "Moved")
+            self.assertIn("reencrypted", cachedVault.listSecrets())
+            vault.reload()
+            self.assertEqual(vault.getSecret("reencrypted"), "Moved")
+        finally:
+            cachedVault.close()
+            for suffix in ('', '.lock'):
+                os.unlink(vaultFile + suffix)
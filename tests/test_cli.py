@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from groupenc.helpers import makeStringOf
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def _run(self, *args):
+        """
+        Run groupenc on a Vault and Identity in the test directory.
+        :return: Exit Status and Standard Error
+        """
+        env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT)
+        process = subprocess.Popen([sys.executable, '-m', 'groupenc',
+                                    '--public-key-file', os.path.join(self.directory, 'public'),
+                                    '--private-key-file', os.path.join(self.directory, 'private'),
+                                    '--vault-file', os.path.join(self.directory, 'vault.json'),
+                                    '--key-type', 'x25519', '--agent-socket='] + list(args),
+                                   env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        _, error = process.communicate()
+        return process.returncode, makeStringOf(error)
+
+    def testExecWithoutVault(self):
+        returnCode, error = self._run('exec', '--', 'true')
+        self.assertEqual(returnCode, 1)
+        self.assertIn('Bootstrap first', error)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def testExitStatus(self):
+        self.assertEqual(self._run('bootstrap')[0], 0)
+        self.assertEqual(self._run('exec', '--', 'true')[0], 0)
+        returnCode, error = self._run('exec', '--', os.path.join(self.directory, 'missing'))
+        self.assertEqual(returnCode, 127)
+        self.assertIn('Unable to Execute', error)
+        returnCode, error = self._run('disown')
+        self.assertEqual(returnCode, 1)
+        self.assertIn('Must Confirm', error)
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+import os
+import unittest
+
+from groupenc.compression import CODEC_NONE, CODEC_ZLIB, compress, decompress, registerCodec
+
+
+class TestCompression(unittest.TestCase):
+
+    pem = b"-----BEGIN CERTIFICATE-----\n" + b"MIIEIjANBgkqhkiG9w0BAQEFAAOCBA8A\n" * 40 + b"-----END CERTIFICATE-----\n"
+
+    def testCompressWhenItPays(self):
+        codec, compressed = compress(self.pem, CODEC_ZLIB)
+        self.assertEqual(codec, CODEC_ZLIB)
+        self.assertLess(len(compressed), len(self.pem))
+        self.assertEqual(decompress(compressed, codec), self.pem)
+
+    def testStoreAsIsOtherwise(self):
+        random = os.urandom(4096)
+        self.assertEqual(compress(random, CODEC_ZLIB), (None, random))
+        self.assertEqual(compress(b'short', CODEC_ZLIB), (None, b'short'))
+        self.assertEqual(compress(self.pem, CODEC_NONE), (None, self.pem))
+        self.assertEqual(decompress(b'as is'), b'as is')
+
+    def testRegisterCodec(self):
+        registerCodec('reverse', lambda payload: payload[:64][::-1], lambda payload: payload[::-1])
+        codec, compressed = compress(self.pem, 'reverse')
+        self.assertEqual(codec, 'reverse')
+        self.assertEqual(decompress(compressed, codec), self.pem[:64])
+        self.assertRaises(AssertionError, compress, self.pem, 'unknown')
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import tempfile
+import unittest
+
+from groupenc.container import isContainer, readContainer, writeContainer
+
+
+class TestContainer(unittest.TestCase):
+
+    vaultContents = {
+        'public_keys': {'id': 'PEM'},
+        'group_keys': {'id': 'wrapped'},
+        'secrets': {
+            'b2V5Mg==': 'dmFsdWUy',
+            'a2V5MQ==': 'dmFsdWUx',
+            'hashed': {'v': 'dmFsdWUz', 'codec': 'zlib'},
+            'odd': 'not base64!',
+        },
+        'blobs': {'ab12': 'YmxvYg==', 'cd34': 'YmxvYjI='},
+        'group_keys@team': {'id': 'wrapped2'},
+        'secrets@team': {'a2V5MQ==': 'dmFsdWU0'},
+    }
+
+    def _write(self):
+        fd, containerFile = tempfile.mkstemp()
+        with os.fdopen(fd, "wb") as stream:
+            writeContainer(self.vaultContents, stream)
+        return containerFile
+
+    def testRoundTrip(self):
+        containerFile = self._write()
+        try:
+            self.assertTrue(isContainer(containerFile))
+            vaultContents = readContainer(containerFile)
+            self.assertEqual(vaultContents['public_keys'], self.vaultContents['public_keys'])
+            secrets = vaultContents['secrets']
+            self.assertEqual(dict(secrets), self.vaultContents['secrets'])
+            self.assertEqual(list(secrets), sorted(self.vaultContents['secrets']))
+            self.assertNotIn('missing', secrets)
+            self.assertEqual(secrets.get('missing'), None)
+            self.assertEqual(dict(vaultContents['blobs']), self.vaultContents['blobs'])
+            self.assertEqual(vaultContents['group_keys@team'], self.vaultContents['group_keys@team'])
+            self.assertEqual(vaultContents['secrets@team']['a2V5MQ=='], 'dmFsdWU0')
+            self.assertFalse(isinstance(vaultContents['secrets@team'], dict))
+            self.assertNotIn('_mapped', vaultContents)
+        finally:
+            os.unlink(containerFile)
+
+    def testChanges(self):
+        containerFile = self._write()
+        try:
+            secrets = readContainer(containerFile)['secrets']
+            secrets['new'] = 'bmV3'
+            del secrets['odd']
+            secrets['b2V5Mg=='] = 'Y2hhbmdlZA=='
+            self.assertEqual(len(secrets), 4)
+            self.assertNotIn('odd', secrets)
+            self.assertEqual(secrets['b2V5Mg=='], 'Y2hhbmdlZA==')
+
+            stream = io.BytesIO()
+            writeContainer({'secrets': secrets}, stream)
+            self.assertTrue(stream.getvalue().startswith(b'GRPENC'))
+        finally:
+            os.unlink(containerFile)
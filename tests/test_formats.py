@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from groupenc.formats import formatSecrets, listTemplateSecrets, makeEnvName, makeEnvironment, renderTemplate, \
+    parseDotenv, parseJson, listDirectory, readDirectory, isGlob, globPrefix, compileGlob
+
+
+class TestFormats(unittest.TestCase):
+
+    secrets = {
+        "password": "Hello World!",
+        "not a password": u"it's \"quoted\"\nüber",
+        "1st": "first",
+    }
+
+    def testEnvNames(self):
+        self.assertEqual(makeEnvName("password"), "password")
+        self.assertEqual(makeEnvName("not a password"), "not_a_password")
+        self.assertEqual(makeEnvName("1st"), "_1st")
+        self.assertEqual(makeEnvName("db/prod/password"), "db_prod_password")
+
+    def testFormats(self):
+        self.assertEqual(formatSecrets(self.secrets, 'dotenv'),
+                         u'_1st="first"\nnot_a_password="it\'s \\"quoted\\"\\nüber"\npassword="Hello World!"\n')
+        self.assertEqual(formatSecrets(self.secrets, 'shell'),
+                         u"export _1st='first'\nexport not_a_password='it'\\''s \"quoted\"\nüber'\n"
+                         u"export password='Hello World!'\n")
+        self.assertEqual(json.loads(formatSecrets(self.secrets, 'json')), self.secrets)
+
+    def testTemplate(self):
+        template = "user: admin\npassword: {{ secret.password }}\nother: {{secret.not a password}}\n"
+        self.assertEqual(listTemplateSecrets(template), ["not a password", "password"])
+        self.assertEqual(renderTemplate(template, self.secrets),
+                         u"user: admin\npassword: Hello World!\nother: it's \"quoted\"\nüber\n")
+        self.assertRaises(AssertionError, renderTemplate, "{{ secret.missing }}", self.secrets)
+
+    def testGlobs(self):
+        self.assertFalse(isGlob("db/prod/password"))
+        self.assertTrue(isGlob("db/prod/*"))
+        self.assertEqual(globPrefix("db/pr?d/*"), "db/pr")
+        self.assertTrue(compileGlob("db/*/password").match("db/prod/password"))
+        self.assertFalse(compileGlob("db/*").match("db/prod/password"))
+        self.assertTrue(compileGlob("db/**").match("db/prod/password"))
+        self.assertTrue(compileGlob("db/[!p]*").match("db/dev"))
+        self.assertFalse(compileGlob("db/[!p]*").match("db/prod"))
+        self.assertFalse(compileGlob("db.*").match("dbx"))
+
+    def testMakeEnvironment(self):
+        secrets = {"app_user": "admin", "app_password": "pw", "db/password": "dbpw"}
+        self.assertEqual(makeEnvironment(secrets, nameMap={"db/password": "DATABASE_PASSWORD"},
+                                         prefixes=["app_"], stripPrefix=True),
+                         {"user": "admin", "password": "pw", "DATABASE_PASSWORD": "dbpw"})
+        self.assertEqual(makeEnvironment(secrets, prefixes=["app_"]),
+                         {"app_user": "admin", "app_password": "pw", "db_password": "dbpw"})
+
+    def testParseDotenv(self):
+        exported = formatSecrets(self.secrets, 'dotenv')
+        parsed = dict(parseDotenv(io.StringIO(exported)))
+        self.assertEqual(parsed, dict((makeEnvName(key), value) for key, value in self.secrets.items()))
+        lines = u"# comment\n\nexport A=1\nB = 'two words' \nC=plain # trailing\n"
+        self.assertEqual(list(parseDotenv(io.StringIO(lines))), [("A", "1"), ("B", "two words"), ("C", "plain")])
+
+    def testParseJson(self):
+        parsed = list(parseJson(io.StringIO(u'{"a": "1", "b": {"c": 2}}')))
+        self.assertEqual(parsed, [("a", "1"), ("b", '{"c": 2}')])
+
+    def testReadDirectory(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        os.makedirs(os.path.join(directory, "db", "prod"))
+        with open(os.path.join(directory, "db", "prod", "password"), "wb") as stream:
+            stream.write(b"dbpw")
+        with open(os.path.join(directory, "token"), "wb") as stream:
+            stream.write(b"tk")
+        self.assertEqual(list(readDirectory(directory)), [("token", b"tk"), ("db/prod/password", b"dbpw")])
+        self.assertEqual(list(listDirectory(directory)),
+                         [("token", os.path.join(directory, "token")),
+                          ("db/prod/password", os.path.join(directory, "db", "prod", "password"))])
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from groupenc.helpers import parallelMap
+
+
+def _square(value):
+    return value * value
+
+
+class TestHelpers(unittest.TestCase):
+
+    def testParallelMapSerial(self):
+        self.assertEqual(sorted(parallelMap(_square, range(5), workers=1)), [0, 1, 4, 9, 16])
+
+    def testParallelMapPool(self):
+        self.assertEqual(sorted(parallelMap(_square, range(5), workers=2, minTasks=1)), [0, 1, 4, 9, 16])
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 import unittest
 
-from groupenc.config import DEFAULT_VALUE_ENCODING, DEFAULT_PRIVATE_KEY, DEFAULT_PUBLIC_KEY
-from groupenc.identity import Identity
+from Crypto.PublicKey import ECC
+
+from groupenc.config import DEFAULT_VALUE_ENCODING, DEFAULT_PRIVATE_KEY, DEFAULT_PUBLIC_KEY, KEY_TYPE_X25519
+from groupenc.identity import Identity, splitKeyring
 
 
 class TestIdentity(unittest.TestCase):
@@ -173,3 +175,31 @@ zQpianvFk1ZxXIZozu2ysa1RjBQEvuNrjWd3CKP3KK2jdkVx89fEJlUhO1n1mbCj
         self.assertEqual(identityOriginal.getId(), identityPartialPublic.getId())
         identityPartialPrivate = Identity(privateKeyFile=DEFAULT_PRIVATE_KEY, publicKeyFile=None)
         self.assertEqual(identityOriginal.getId(), identityPartialPrivate.getId())
+
+    def testX25519Identity(self):
+        identity = Identity(privateKeyFile=None, publicKeyFile=None,
+                            givenKey=ECC.generate(curve='Curve25519').export_key(format='PEM'))
+        self.assertEqual(identity.getKeyType(), KEY_TYPE_X25519)
+        for plain in self.testVectors:
+            encrypted = identity.encryptPublic(plain, DEFAULT_VALUE_ENCODING)
+            decrypted = identity.decrypt(encrypted, DEFAULT_VALUE_ENCODING)
+            assert plain == decrypted
+
+        publicIdentity = Identity(givenKey=identity.getPublicKey())
+        self.assertEqual(publicIdentity.getKeyType(), KEY_TYPE_X25519)
+        self.assertEqual(publicIdentity.getId(), identity.getId())
+        encrypted = publicIdentity.encryptPublic(self.testVectors[0], DEFAULT_VALUE_ENCODING)
+        self.assertEqual(identity.decrypt(encrypted, DEFAULT_VALUE_ENCODING), self.testVectors[0])
+
+    def testSplitKeyring(self):
+        x25519Key = ECC.generate(curve='Curve25519').public_key().export_key(format='PEM')
+        keyring = "{}\n\n{}\n".format(self.publicKey, x25519Key)
+        self.assertEqual(splitKeyring(keyring), [self.publicKey, x25519Key])
+        self.assertEqual(splitKeyring(self.publicKey), [self.publicKey])
+
+    def testIdentityIdIsCached(self):
+        identity = Identity(givenKey=self.publicKey)
+        self.assertEqual(identity.keyId, None)
+        keyId = identity.getId()
+        self.assertEqual(identity.keyId, keyId)
+        self.assertIs(identity.getId(), keyId)
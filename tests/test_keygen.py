@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from groupenc.config import KEY_TYPE_X25519
+from groupenc.keygen import generateRSAKeyPair, fillKeyPool, countPooledKeys, takePooledKey
+
+
+class TestKeygen(unittest.TestCase):
+
+    def testParallelRSAKeyPair(self):
+        keyPair = generateRSAKeyPair(2048, workers=2)
+        self.assertEqual(keyPair.n.bit_length(), 2048)
+        self.assertEqual(keyPair.p * keyPair.q, keyPair.n)
+        self.assertTrue(keyPair.has_private())
+
+    def testKeyPool(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        poolDirectory = os.path.join(directory, 'pool')
+        self.assertEqual(takePooledKey(KEY_TYPE_X25519, poolDirectory), None)
+        self.assertEqual(fillKeyPool(2, KEY_TYPE_X25519, poolDirectory=poolDirectory), 2)
+        self.assertEqual(fillKeyPool(2, KEY_TYPE_X25519, poolDirectory=poolDirectory), 0)
+        self.assertEqual(os.stat(poolDirectory).st_mode & 0o777, stat.S_IRWXU)
+
+        first = takePooledKey(KEY_TYPE_X25519, poolDirectory)
+        second = takePooledKey(KEY_TYPE_X25519, poolDirectory)
+        self.assertTrue(first and second and first != second)
+        self.assertEqual(countPooledKeys(KEY_TYPE_X25519, poolDirectory), 0)
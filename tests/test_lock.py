@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+import os
+import unittest
+
+from groupenc.lock import VaultLock
+
+
+class TestLock(unittest.TestCase):
+    vaultFile = '.test-groupenc-lock.json'
+
+    def testVaultLock(self):
+        lock = VaultLock(self.vaultFile)
+        try:
+            with lock:
+                with lock:
+                    self.assertTrue(lock.isHeld())
+                self.assertTrue(lock.isHeld())
+                self.assertRaises(AssertionError, VaultLock(self.vaultFile, timeout=0).acquire)
+            self.assertFalse(lock.isHeld())
+            with VaultLock(self.vaultFile, timeout=0) as otherLock:
+                self.assertTrue(otherLock.isHeld())
+            self.assertRaises(AssertionError, lock.release)
+        finally:
+            os.unlink(self.vaultFile + '.lock')
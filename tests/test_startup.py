@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from groupenc.config import KEY_TYPE_X25519
+from groupenc.keygen import exportKey, generateKeyPair
+from groupenc.helpers import makeStringOf
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SHOW_MODULES = "\nimport sys\nsys.stdout.write(' '.join(sorted(sys.modules)))\n"
+RUN_MAIN = """
+import sys
+from groupenc.__main__ import main
+sys.argv = ['groupenc'] + sys.argv[1:]
+try:
+    main()
+except SystemExit:
+    pass
+"""
+
+
+def _runPython(code, *args):
+    env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT)
+    output = subprocess.check_output([sys.executable, '-c', code + SHOW_MODULES] + list(args), env=env)
+    return makeStringOf(output)
+
+
+def _slowModulesIn(output):
+    modules = output.rsplit('\n', 1)[-1].split()
+    return [module for module in modules if module.split('.')[0] in ('Crypto', 'multiprocessing')]
+
+
+class TestStartup(unittest.TestCase):
+
+    @unittest.skipIf(sys.version_info < (3, 7), "Needs Module __getattr__")
+    def testImport(self):
+        self.assertEqual(_slowModulesIn(_runPython('import groupenc')), [])
+        output = _runPython('import groupenc\nassert groupenc.Vault.__name__ == "Vault"')
+        self.assertIn('groupenc.vault', output.split())
+
+    def testHelp(self):
+        output = _runPython(RUN_MAIN, '--help')
+        self.assertIn('Group Encryption CLI', output)
+        self.assertEqual(_slowModulesIn(output), [])
+
+    def testId(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        publicKey = makeStringOf(exportKey(generateKeyPair(KEY_TYPE_X25519).public_key()))
+        publicKeyFile = os.path.join(directory, 'public')
+        with open(publicKeyFile, 'w') as publicKeyFileStream:
+            publicKeyFileStream.write(publicKey)
+        vaultFile = os.path.join(directory, 'vault.json')
+        output = _runPython(RUN_MAIN, '--public-key-file', publicKeyFile, '--private-key-file',
+                            os.path.join(directory, 'private'), '--vault-file', vaultFile, '--agent-socket=', 'id')
+        self.assertTrue(output.startswith(publicKey + '\n'))
+        self.assertEqual(_slowModulesIn(output), [])
+        self.assertFalse(os.path.exists(vaultFile))
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+
+from groupenc.config import KEY_TYPE_X25519
+from groupenc.identity import Identity
+from groupenc.keygen import exportKey, generateKeyPair
+from groupenc.stats import measure, record, getStats, resetStats, formatStats, registerHook, unregisterHook
+from groupenc.vault import Vault
+
+
+class TestStats(unittest.TestCase):
+
+    def setUp(self):
+        resetStats()
+
+    def testRecord(self):
+        calls = []
+
+        def hook(name, seconds, size):
+            calls.append((name, size))
+
+        registerHook(hook)
+        try:
+            record('file.read', 0.5, 10)
+            record('file.read', 0.25, 20)
+            with measure('json.parse') as measurement:
+                measurement.size = 7
+        finally:
+            unregisterHook(hook)
+        record('file.read', 0, 0)
+        stats = getStats()
+        self.assertEqual(stats['file.read'], {'count': 3, 'seconds': 0.75, 'bytes': 30})
+        self.assertEqual(stats['json.parse']['bytes'], 7)
+        self.assertEqual(calls, [('file.read', 10), ('file.read', 20), ('json.parse', 7)])
+        self.assertEqual(formatStats(stats).splitlines()[1].split()[0], 'file.read')
+
+        resetStats()
+        self.assertEqual(getStats(), {})
+
+    def testVaultStats(self):
+        identity = Identity(givenKey=exportKey(generateKeyPair(KEY_TYPE_X25519)))
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        vaultFile = os.path.join(directory, 'vault.json')
+        vault = Vault(identity, vaultFile)
+        vault.addSecret('password', 'changeMe')
+        vault.save()
+
+        resetStats()
+        vault = Vault(identity, vaultFile)
+        self.assertEqual(vault.getSecret('password'), 'changeMe')
+        stats = getStats()
+        self.assertEqual(stats['x25519.decrypt']['count'], 1)
+        self.assertEqual(stats['file.read']['bytes'], os.path.getsize(vaultFile))
+        self.assertEqual(stats['json.parse']['count'], 1)
+        self.assertTrue(stats['aes.decrypt']['count'] >= 1)
+        self.assertTrue(stats['base64.decode']['count'] >= 2)
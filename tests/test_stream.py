@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+import io
+import unittest
+
+from Crypto.Random import get_random_bytes
+
+from groupenc.stream import readChunks, encryptChunks, decryptChunks
+
+
+class TestStream(unittest.TestCase):
+
+    groupKey = get_random_bytes(32)
+
+    def _encrypt(self, payload, chunkBytes=1024):
+        return b''.join(encryptChunks(self.groupKey, readChunks(io.BytesIO(payload), chunkBytes)))
+
+    def _decrypt(self, encrypted, groupKey=None):
+        return b''.join(decryptChunks(groupKey or self.groupKey, io.BytesIO(encrypted)))
+
+    def testRoundTrip(self):
+        for payload in [b'', b'x', get_random_bytes(1024), get_random_bytes(5000)]:
+            self.assertEqual(self._decrypt(self._encrypt(payload)), payload)
+
+    def testWrongKey(self):
+        encrypted = self._encrypt(b'Hello World!')
+        self.assertRaises(ValueError, self._decrypt, encrypted, get_random_bytes(32))
+
+    def testTampered(self):
+        encrypted = bytearray(self._encrypt(get_random_bytes(3000)))
+        encrypted[-20] ^= 1
+        self.assertRaises(ValueError, self._decrypt, bytes(encrypted))
+
+    def testTruncated(self):
+        payload = get_random_bytes(3000)
+        encrypted = self._encrypt(payload)
+        lastChunk = 5 + (3000 - 2048) + 16
+        self.assertRaises(AssertionError, self._decrypt, encrypted[:-lastChunk])
+        self.assertRaises(AssertionError, self._decrypt, encrypted[:-1])
@@ -1,6 +1,14 @@
 # -*- coding: utf-8 -*-
+import io
+import json
+import os
 import unittest
 
+from Crypto.PublicKey import ECC
+
+from groupenc.helpers import decodeFromBase64, encodeToBase64
+from groupenc.identity import Identity
+from groupenc import vault as vault_module
 from groupenc.vault import Vault
 
 class TestVault(unittest.TestCase):
@@ -33,6 +41,11 @@ sQIDAQAB
 
     vaultFile = '.test-groupenc.json'
 
+    def tearDown(self):
+        lockFile = self.vaultFile + '.lock'
+        if os.path.exists(lockFile):
+            os.unlink(lockFile)
+
     def testVaultBasic(self):
         vault = Vault(vaultFile=self.vaultFile)
 
@@ -65,3 +78,488 @@ sQIDAQAB
         vault.rotate()
         self.assertEqual(vault.getSecret("unicodepassword"), u"😘🤩")
         vault.save()
+
+    def testVaultSessionCache(self):
+        vault = Vault(vaultFile=self.vaultFile)
+        decrypt = vault.identity.decrypt
+        calls = []
+
+        def countingDecrypt(*args, **kwargs):
+            calls.append(args)
+            return decrypt(*args, **kwargs)
+
+        vault.identity.decrypt = countingDecrypt
+        vault.addSecret("cached", "Cached!")
+        for _ in range(5):
+            self.assertEqual(vault.getSecret("cached"), "Cached!")
+        self.assertIn("cached", list(vault.listSecrets()))
+        self.assertEqual(len(calls), 1)
+
+        vault.rotate()
+        self.assertEqual(vault.getSecret("cached"), "Cached!")
+        self.assertEqual(len(calls), 1)
+
+        vault.reload()
+        self.assertEqual(vault.getSecret("cached"), None)
+        self.assertEqual(len(calls), 2)
+
+    def testVaultRotateProgress(self):
+        vault = Vault(vaultFile=self.vaultFile)
+        vault.induct(self.publicKey)
+        for index in range(5):
+            vault.addSecret("rotated{}".format(index), "Value {}".format(index))
+        reports = []
+        rotation = vault.rotate(workers=2, progress=lambda *report: reports.append(report), reencrypt=True)
+        self.assertEqual(rotation['members'], len(dict(vault.listKeys())))
+        self.assertEqual(rotation['secrets'], len(list(vault.listSecrets())))
+        self.assertIn(('secrets', rotation['secrets'], rotation['secrets']), reports)
+        for index in range(5):
+            self.assertEqual(vault.getSecret("rotated{}".format(index)), "Value {}".format(index))
+        vault.disown(self.publicKey)
+        vault.save()
+
+    def testVaultEpochs(self):
+        vault = Vault(vaultFile=self.vaultFile)
+        bundle = "-----BEGIN CERTIFICATE-----\n" + "B" * 1024 + "\n-----END CERTIFICATE-----\n"
+        vault.addSecrets({"epoch/one": "1", "epoch/two": "2", "epoch/bundle": bundle})
+        vault.save()
+        secrets = dict(vault.vaultContents['secrets'])
+
+        epoch = vault.getEpoch()
+        rotation = vault.rotate()
+        self.assertEqual(rotation['secrets'], 0)
+        self.assertEqual(vault.getEpoch(), epoch + 1)
+        self.assertEqual(vault.vaultContents['secrets'], secrets)
+        vault.addSecret("epoch/two", "22")
+        vault.save()
+
+        vault = Vault(vaultFile=self.vaultFile)
+        self.assertEqual(vault.getSecrets(["epoch/one", "epoch/two", "epoch/bundle"]),
+                         {"epoch/one": "1", "epoch/two": "22", "epoch/bundle": bundle})
+        self.assertEqual(len([name for name in vault.listSecrets() if name == "epoch/two"]), 1)
+        reencryption = vault.reencrypt(batch=1)
+        self.assertEqual(reencryption['secrets'], 1)
+        reencryption = vault.reencrypt()
+        self.assertEqual(reencryption['remaining'], 0)
+        vault.save()
+
+        vault = Vault(vaultFile=self.vaultFile)
+        self.assertEqual(vault.getSecrets(["epoch/one", "epoch/two", "epoch/bundle"]),
+                         {"epoch/one": "1", "epoch/two": "22", "epoch/bundle": bundle})
+        self.assertEqual(len(vault.vaultContents['blobs']), 1)
+        vault.removeSecret("epoch/one")
+        vault.removeSecret("epoch/two")
+        vault.removeSecret("epoch/bundle")
+        vault.save()
+
+    def testVaultEpochRevocation(self):
+        vault = Vault(vaultFile=self.vaultFile)
+        oldGroupKey = vault._getGroupKeyAsBytes()
+        vault.rotate()
+        vault.addSecret("revoked/after", "post-revocation-secret", codec='none')
+        wrappedKey = vault.vaultContents['epochs'][str(vault.getEpoch() - 1)]
+        storedValue = vault.vaultContents['secrets'][vault._encryptSecretKey(vault._getGroupKeyAsBytes(),
+                                                                             "revoked/after")]
+        # Were the old Key wrapped with a fixed nonce, XORing it out would give the new Key's keystream.
+        keystream = bytearray(a ^ b for a, b in zip(bytearray(decodeFromBase64(wrappedKey)), bytearray(oldGroupKey)))
+        recovered = bytearray(a ^ b for a, b in zip(bytearray(decodeFromBase64(storedValue['v'])), keystream))
+        self.assertNotIn(b'post-revocation', bytes(recovered))
+        self.assertRaises(ValueError, vault_module._unseal, oldGroupKey,
+                          vault_module._epochContext(vault.getEpoch() - 1), wrappedKey)
+        self.assertEqual(vault.getSecret("revoked/after"), "post-revocation-secret")
+
+    def testVaultMergeOnSave(self):
+        vault = Vault(vaultFile=self.vaultFile)
+        bundle = "-----BEGIN CERTIFICATE-----\n" + "C" * 1024 + "\n-----END CERTIFICATE-----\n"
+        vault.addSecrets({"merge/shared": bundle, "merge/removed": "Gone"})
+        vault.save()
+
+        vault = Vault(vaultFile=self.vaultFile)
+        otherVault = Vault(vaultFile=self.vaultFile)
+        vault.getSecret("merge/shared")
+        decrypt = vault.identity.decrypt
+        calls = []
+
+        def countingDecrypt(*args, **kwargs):
+            calls.append(args)
+            return decrypt(*args, **kwargs)
+
+        vault.identity.decrypt = countingDecrypt
+        vault.addSecret("merge/ours", "Ours")
+        vault.removeSecret("merge/shared")
+        otherVault.addSecret("merge/theirs", bundle)
+        otherVault.removeSecret("merge/removed")
+        self.assertTrue(otherVault.save())
+        self.assertTrue(vault.save())
+        self.assertEqual(len(calls), 0)
+        self.assertEqual(vault.listSecrets("merge/"), ["merge/ours", "merge/theirs"])
+
+        vault = Vault(vaultFile=self.vaultFile)
+        self.assertEqual(vault.getSecrets(vault.listSecrets("merge/")), {"merge/ours": "Ours", "merge/theirs": bundle})
+        self.assertEqual(len(vault.vaultContents['blobs']), 1)
+
+        otherVault = Vault(vaultFile=self.vaultFile)
+        otherVault.rotate()
+        otherVault.save()
+        vault.addSecret("merge/late", "Late")
+        self.assertRaises(AssertionError, vault.save)
+
+        vault = Vault(vaultFile=self.vaultFile)
+        with vault.locked():
+            vault.removeSecret("merge/ours")
+            vault.removeSecret("merge/theirs")
+            vault.save()
+        self.assertEqual(Vault(vaultFile=self.vaultFile).listSecrets("merge/"), [])
+
+    def testVaultMergeReencrypt(self):
+        vault = Vault(vaultFile=self.vaultFile)
+        vault.addSecrets({"merge/revoked": "Revoked", "merge/changed": "Old", "merge/kept": "Kept"})
+        vault.rotate()
+        vault.save()
+
+        vault = Vault(vaultFile=self.vaultFile)
+        otherVault = Vault(vaultFile=self.vaultFile)
+        self.assertEqual(vault.reencrypt()['remaining'], 0)
+        otherVault.removeSecret("merge/revoked")
+        otherVault.addSecret("merge/changed", "New")
+        self.assertTrue(otherVault.save())
+        self.assertTrue(vault.save())
+        self.assertEqual(vault.listSecrets("merge/"), ["merge/changed", "merge/kept"])
+
+        vault = Vault(vaultFile=self.vaultFile)
+        self.assertEqual(vault.getSecrets(vault.listSecrets("merge/")),
+                         {"merge/changed": "New", "merge/kept": "Kept"})
+        self.assertEqual(vault.reencrypt()['remaining'], 0)
+        vault.removeSecret("merge/changed")
+        vault.removeSecret("merge/kept")
+        vault.save()
+
+    def testVaultMixedKeyTypes(self):
+        memberIdentity = Identity(givenKey=ECC.generate(curve='Curve25519').export_key(format='PEM'))
+        vault = Vault(vaultFile=self.vaultFile)
+        vault.induct(memberIdentity.getPublicKey())
+        vault.addSecret("mixed", "Curves!")
+        self.assertEqual(vault.vaultContents['key_types'][memberIdentity.getId()], 'x25519')
+        vault.rotate()
+        vault.save()
+
+        memberVault = Vault(identity=memberIdentity, vaultFile=self.vaultFile)
+        self.assertEqual(memberVault.getSecret("mixed"), "Curves!")
+        memberVault.disown()
+        memberVault.save()
+
+    def testVaultInductMany(self):
+        memberIdentity = Identity(givenKey=ECC.generate(curve='Curve25519').export_key(format='PEM'))
+        vault = Vault(vaultFile=self.vaultFile)
+        inducted = vault.inductMany([self.publicKey, memberIdentity.getPublicKey(), self.publicKey])
+        self.assertEqual(sorted(inducted), sorted([Identity(givenKey=self.publicKey).getId(), memberIdentity.getId()]))
+        self.assertEqual(vault.inductMany([self.publicKey, vault.identity.getPublicKey()]), [])
+        vault.disown(self.publicKey)
+        vault.disown(memberIdentity.getPublicKey())
+        vault.save()
+
+    def testVaultDisownById(self):
+        keyId = Identity(givenKey=self.publicKey).getId()
+        vault = Vault(vaultFile=self.vaultFile)
+        vault.induct(self.publicKey)
+        self.assertEqual(vault.getMember(keyId).getPublicKey(), self.publicKey)
+        vault.disown(keyId=keyId)
+        self.assertNotIn(keyId, dict(vault.listKeys()))
+        self.assertEqual(vault.getMember(keyId), None)
+        vault.save()
+
+    def testVaultGetSecrets(self):
+        vault = Vault(vaultFile=self.vaultFile)
+        vault.addSecret("bulk1", "One")
+        vault.addSecret("bulk2", "Two")
+        self.assertEqual(vault.getSecrets(["bulk1", "bulk2", "missing"]), {"bulk1": "One", "bulk2": "Two"})
+        allSecrets = vault.getSecrets()
+        self.assertEqual(allSecrets["bulk1"], "One")
+        self.assertEqual(sorted(allSecrets), sorted(vault.listSecrets()))
+
+    def testVaultAddSecrets(self):
+        vault = Vault(vaultFile=self.vaultFile)
+        self.assertEqual(vault.addSecrets({"import1": "One", "import2": "Two"}), 2)
+        self.assertEqual(vault.addSecrets(iter([("import3", b"Three")])), 1)
+        self.assertEqual(vault.getSecrets(["import1", "import2", "import3"]),
+                         {"import1": "One", "import2": "Two", "import3": "Three"})
+
+    def testVaultSaveOnlyWhenDirty(self):
+        vault = Vault(vaultFile=self.vaultFile)
+        vault.addSecret("dirty", "Dirty!")
+        self.assertTrue(vault.save())
+        self.assertFalse(vault.save())
+
+        vault.removeSecret("never added")
+        vault.addSecret("dirty", "Dirty!")
+        vault.disown(self.publicKey)
+        self.assertFalse(vault.isDirty())
+        self.assertFalse(vault.save())
+
+        vault.removeSecret("dirty")
+        self.assertTrue(vault.isDirty())
+        self.assertTrue(vault.save())
+        self.assertEqual([entry for entry in os.listdir('.') if entry.startswith('.' + self.vaultFile + '.')], [])
+
+    def testVaultCompactSave(self):
+        vault = Vault(vaultFile=self.vaultFile, compact=True)
+        self.assertTrue(vault.save(force=True))
+        with open(self.vaultFile) as vaultFileStream:
+            contents = vaultFileStream.read()
+        self.assertNotIn('\n', contents)
+        self.assertEqual(json.loads(contents), vault.vaultContents)
+        Vault(vaultFile=self.vaultFile).save(force=True)
+
+    def testVaultBinaryFormat(self):
+        binaryVaultFile = '.test-groupenc.bin'
+        vault = Vault(vaultFile=self.vaultFile)
+        vault.addSecret("binary", "Mapped!")
+        vault.convert('binary', binaryVaultFile)
+        try:
+            binaryVault = Vault(vaultFile=binaryVaultFile)
+            self.assertEqual(binaryVault.vaultFormat, 'binary')
+            self.assertEqual(binaryVault.getSecret("binary"), "Mapped!")
+            self.assertEqual(sorted(binaryVault.listSecrets()), sorted(vault.listSecrets()))
+
+            binaryVault.addSecret("binary2", "Also Mapped!")
+            binaryVault.removeSecret("binary")
+            self.assertEqual(binaryVault.getSecret("binary"), None)
+            self.assertTrue(binaryVault.save())
+
+            binaryVault = Vault(vaultFile=binaryVaultFile)
+            self.assertEqual(binaryVault.getSecret("binary"), None)
+            self.assertEqual(binaryVault.getSecret("binary2"), "Also Mapped!")
+            binaryVault.rotate()
+            binaryVault.convert('json')
+            self.assertEqual(Vault(vaultFile=binaryVaultFile).getSecret("binary2"), "Also Mapped!")
+            self.assertEqual(Vault(vaultFile=binaryVaultFile).vaultFormat, 'json')
+        finally:
+            os.unlink(binaryVaultFile)
+            os.unlink(binaryVaultFile + '.lock')
+
+    def testVaultStreamSecret(self):
+        vault = Vault(vaultFile=self.vaultFile)
+        payload = os.urandom(200 * 1024)
+        self.assertEqual(vault.addSecretStream("blob", io.BytesIO(payload), chunkBytes=64 * 1024), len(payload))
+        self.assertTrue(vault.isSecretStream("blob"))
+        vault.save()
+
+        vault = Vault(vaultFile=self.vaultFile)
+        outputStream = io.BytesIO()
+        self.assertEqual(vault.getSecretStream("blob", outputStream), len(payload))
+        self.assertEqual(outputStream.getvalue(), payload)
+        self.assertRaises(AssertionError, vault.getSecrets, ["blob"])
+
+        vault.rotate()
+        vault.save()
+        outputStream = io.BytesIO()
+        vault.getSecretStream("blob", outputStream)
+        self.assertEqual(outputStream.getvalue(), payload)
+        self.assertEqual(len(os.listdir(self.vaultFile + '.streams')), 1)
+
+        vault.removeSecret("blob")
+        vault.save()
+        self.assertEqual(os.listdir(self.vaultFile + '.streams'), [])
+        self.assertEqual(vault.getSecretStream("blob", io.BytesIO()), None)
+
+    def testVaultDeduplication(self):
+        vault = Vault(vaultFile=self.vaultFile)
+        bundle = "-----BEGIN CERTIFICATE-----\n" + "A" * 1024 + "\n-----END CERTIFICATE-----\n"
+        vault.addSecrets({"dev/tls": bundle, "prod/tls": bundle, "short": "Hello World!"})
+        self.assertEqual(len(vault.vaultContents['blobs']), 1)
+        vault.save()
+
+        vault = Vault(vaultFile=self.vaultFile)
+        self.assertEqual(vault.getSecret("prod/tls"), bundle)
+        vault.rotate()
+        self.assertEqual(len(vault.vaultContents['blobs']), 1)
+        self.assertEqual(vault.getSecrets(["dev/tls", "short"]), {"dev/tls": bundle, "short": "Hello World!"})
+
+        vault.removeSecret("dev/tls")
+        self.assertEqual(len(vault.vaultContents['blobs']), 1)
+        vault.removeSecret("prod/tls")
+        self.assertEqual(len(vault.vaultContents['blobs']), 0)
+
+        vault.vaultContents['blobs']['unused'] = 'dW51c2Vk'
+        self.assertEqual(vault.prune(), 1)
+        self.assertEqual(vault.vaultContents['blobs'], {})
+        vault.save()
+
+    def testVaultCompression(self):
+        vault = Vault(vaultFile=self.vaultFile)
+        chain = "-----BEGIN CERTIFICATE-----\n" + "MIIEIjANBgkqhkiG9w0BAQEFAAOCBA8A\n" * 3 + "-----END CERTIFICATE-----\n"
+        vault.addSecret("chain", chain)
+        vault.addSecret("plain", chain, codec='none')
+        secrets = vault.vaultContents['secrets']
+        storedValues = [secrets[vault._encryptSecretKey(vault._getGroupKeyAsBytes(), secretKey)]
+                        for secretKey in ("chain", "plain")]
+        self.assertEqual(storedValues[0]['codec'], 'zlib')
+        self.assertTrue(isinstance(storedValues[1], str))
+        vault.rotate()
+        self.assertEqual(vault.getSecrets(["chain", "plain"]), {"chain": chain, "plain": chain})
+        vault.removeSecret("chain")
+        vault.removeSecret("plain")
+        vault.save()
+
+    def testVaultManifest(self):
+        vault = Vault(vaultFile=self.vaultFile)
+        vault.addSecrets({"listed/one": "1", "listed/two": "22"})
+        vault.save()
+        self.assertIn('manifest', vault.vaultContents)
+        self.assertEqual(set(vault.vaultContents['manifest']) - set(['codec']), set(['sealed']))
+
+        vault = Vault(vaultFile=self.vaultFile)
+        described = vault.describeSecrets()
+        self.assertEqual(described["listed/two"]["size"], 2)
+        with open(self.vaultFile) as vaultFileStream:
+            vaultContents = json.load(vaultFileStream)
+        del vaultContents['manifest']
+        with open(self.vaultFile, "w") as vaultFileStream:
+            json.dump(vaultContents, vaultFileStream)
+        vault.reload()
+        self.assertTrue(set(["listed/one", "listed/two"]) <= set(vault.listSecrets()))
+        vault.addSecret("listed/three", "333")
+        vault.save()
+
+        tampered = bytearray(decodeFromBase64(vault.vaultContents['manifest']['sealed']))
+        tampered[-1] ^= 1
+        vault.vaultContents['manifest']['sealed'] = encodeToBase64(bytes(tampered))
+        vault._manifest = None  # pylint: disable=W0212
+        self.assertRaises(ValueError, vault.listSecrets)
+        vault.reload()
+
+        vault.rotate()
+        vault.removeSecret("listed/one")
+        vault.removeSecret("listed/two")
+        vault.removeSecret("listed/three")
+        vault.save()
+        self.assertFalse(set(["listed/one", "listed/two", "listed/three"]) &
+                         set(Vault(vaultFile=self.vaultFile).listSecrets()))
+
+    def testVaultManifestHashedNames(self):
+        hashedVaultFile = '.test-groupenc-hashed.json'
+        hashSecrets = vault_module.HASH_SECRETS
+        vault_module.HASH_SECRETS = '1'
+        try:
+            vault = Vault(vaultFile=hashedVaultFile)
+            vault.addSecrets({"hashed/one": "1", "hashed/two": "2"})
+            vault.save()
+
+            vault = Vault(vaultFile=hashedVaultFile)
+            self.assertEqual(list(vault.listSecrets()), ["hashed/one", "hashed/two"])
+            vault.rotate()
+            vault.save()
+            vault = Vault(vaultFile=hashedVaultFile)
+            self.assertEqual(vault.getSecrets(), {"hashed/one": "1", "hashed/two": "2"})
+        finally:
+            vault_module.HASH_SECRETS = hashSecrets
+            os.unlink(hashedVaultFile)
+            os.unlink(hashedVaultFile + '.lock')
+
+    def testVaultNameIndex(self):
+        vault = Vault(vaultFile=self.vaultFile)
+        vault.addSecrets({"db/prod/password": "1", "db/prod/user": "2", "db/dev/password": "3", "dbx": "4"})
+        self.assertEqual(vault.listSecrets("db/prod/"), ["db/prod/password", "db/prod/user"])
+        vault.save()
+
+        vault = Vault(vaultFile=self.vaultFile)
+        vault.listSecrets()
+        decryptBytes = vault_module._decryptBytes
+        decrypted = []
+
+        def countingDecryptBytes(encryptionKey, message):
+            decrypted.append(message)
+            return decryptBytes(encryptionKey, message)
+
+        vault_module._decryptBytes = countingDecryptBytes
+        try:
+            self.assertEqual(vault.findSecrets("db/*/password"), ["db/dev/password", "db/prod/password"])
+            self.assertEqual(vault.findSecrets("db/**"), ["db/dev/password", "db/prod/password", "db/prod/user"])
+            self.assertEqual(decrypted, [])
+            self.assertEqual(vault.getSecrets(vault.findSecrets("db/prod/*")),
+                             {"db/prod/password": "1", "db/prod/user": "2"})
+            self.assertEqual(len(decrypted), 2)
+        finally:
+            vault_module._decryptBytes = decryptBytes
+
+        vault.removeSecret("db/prod/user")
+        vault.addSecret("db/prod/host", "5")
+        self.assertEqual(vault.listSecrets("db/prod/"), ["db/prod/host", "db/prod/password"])
+        for secretKey in vault.listSecrets("db"):
+            vault.removeSecret(secretKey)
+        vault.save()
+
+    def testVaultNamespaces(self):
+        memberIdentity = Identity(givenKey=ECC.generate(curve='Curve25519').export_key(format='PEM'))
+        vault = Vault(vaultFile=self.vaultFile)
+        vault.addSecret("shared", "Everyone")
+        vault.save()
+        teamVault = Vault(vaultFile=self.vaultFile, namespace="team")
+        self.assertTrue(teamVault.isDirty())
+        teamVault.addSecret("deploy", "Team only")
+        teamVault.induct(memberIdentity.getPublicKey())
+        teamVault.save()
+        self.assertIn("team", teamVault.listNamespaces())
+        self.assertEqual(teamVault.listSecrets(), ["deploy"])
+
+        memberVault = Vault(identity=memberIdentity, vaultFile=self.vaultFile, namespace="team")
+        self.assertFalse(memberVault.isDirty())
+        self.assertEqual(memberVault.getSecret("deploy"), "Team only")
+        memberVault = Vault(identity=memberIdentity, vaultFile=self.vaultFile)
+        self.assertRaises(AssertionError, memberVault.getSecret, "shared")
+
+        vault = Vault(vaultFile=self.vaultFile)
+        secrets = json.dumps(vault.vaultContents["secrets"], sort_keys=True)
+        groupKeys = json.dumps(vault.vaultContents["group_keys"], sort_keys=True)
+        teamVault = Vault(vaultFile=self.vaultFile, namespace="team")
+        rotation = teamVault.rotate()
+        self.assertEqual((rotation['secrets'], rotation['members']), (0, 2))
+        teamVault.save()
+        vault = Vault(vaultFile=self.vaultFile)
+        self.assertEqual(json.dumps(vault.vaultContents["secrets"], sort_keys=True), secrets)
+        self.assertEqual(json.dumps(vault.vaultContents["group_keys"], sort_keys=True), groupKeys)
+        self.assertEqual(vault.getSecret("shared"), "Everyone")
+        self.assertEqual(vault.getSecret("deploy"), None)
+
+        teamVault = Vault(vaultFile=self.vaultFile, namespace="team")
+        self.assertEqual(teamVault.getSecret("deploy"), "Team only")
+        teamVault.disown(memberIdentity.getPublicKey())
+        self.assertNotIn(memberIdentity.getId(), teamVault.vaultContents["public_keys"])
+        self.assertEqual(len(list(teamVault.listKeys())), 1)
+        teamVault.removeSecret("deploy")
+        teamVault.disown()
+        teamVault.save()
+        vault = Vault(vaultFile=self.vaultFile)
+        self.assertNotIn("team", vault.listNamespaces())
+        self.assertIn(vault.identity.getId(), vault.vaultContents["public_keys"])
+        vault.removeSecret("shared")
+        vault.save()
+        self.assertRaises(AssertionError, Vault, vaultFile=self.vaultFile, namespace="a/b")
+
+    def testVaultNamespaceDisownLastMember(self):
+        teamVault = Vault(vaultFile=self.vaultFile, namespace="team")
+        teamVault.addSecret("deploy", "Team only")
+        teamVault.rotate()
+        teamVault.addSecret("release", "Team only too")
+        teamVault.save()
+        teamVault.disown()
+        teamVault.save()
+        vault = Vault(vaultFile=self.vaultFile)
+        self.assertEqual([hiveName for hiveName, hive in vault.vaultContents.items() if '@team' in hiveName and hive],
+                         [])
+
+        teamVault = Vault(vaultFile=self.vaultFile, namespace="team")
+        self.assertEqual(teamVault.listSecrets(), [])
+        teamVault.addSecret("deploy", "Team again")
+        teamVault.save()
+        self.assertEqual(Vault(vaultFile=self.vaultFile, namespace="team").getSecret("deploy"), "Team again")
+        teamVault.disown()
+        teamVault.save()
+
+        vault = Vault(vaultFile=self.vaultFile)
+        vault.vaultContents["secrets@team"] = {"left": "behind"}
+        vault._markDirty("secrets@team")  # pylint: disable=W0212
+        vault.save()
+        self.assertRaises(AssertionError, Vault, vaultFile=self.vaultFile, namespace="team")
+        del vault.vaultContents["secrets@team"]
+        vault.save(force=True)